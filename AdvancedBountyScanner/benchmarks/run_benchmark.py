@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: runs main_scanner.py against the local simulator under several scenarios.
+
+For every scenario a simulator is started with the scenario's latency, error, throttle
+and body-size settings, the scanner scans all of its endpoints, and the run is measured:
+requests/second, server-side p50/p99 latency, scanner CPU time per request, scanner peak
+RSS and detection recall (plus false positives) against the simulator's ground truth.
+
+Example:
+  python benchmarks/run_benchmark.py --json_output bench.json
+  python benchmarks/run_benchmark.py --scenarios baseline large-bodies --compare bench.json -- --analysis_workers 0
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from urllib.parse import urlparse
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCHMARK_DIR)
+SIMULATOR = os.path.join(BENCHMARK_DIR, 'simulator.py')
+SCANNER = os.path.join(PROJECT_ROOT, 'src', 'main_scanner.py')
+
+# Simulator arguments per scenario; everything not listed uses the simulator defaults.
+SCENARIOS = {
+    'baseline': {},
+    'slow': {'latency_ms': 150, 'latency_jitter_ms': 50},
+    'flaky': {'error_rate': 0.05},
+    'throttled': {'throttle_rps': 40, 'throttle_burst': 20},
+    'large-bodies': {'body_size': 512 * 1024},
+}
+
+# Metrics compared by --compare, and whether a higher value is better
+METRICS = (
+    ('requests_per_second', True),
+    ('latency_p50_ms', False),
+    ('latency_p99_ms', False),
+    ('cpu_ms_per_request', False),
+    ('peak_rss_mb', False),
+    ('recall', True),
+)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _fetch(base_url, path, timeout=5):
+    with urllib.request.urlopen(base_url + path, timeout=timeout) as response:
+        return response.read().decode('utf-8')
+
+
+def start_simulator(port, endpoints, seed, options):
+    """Starts simulator.py with a scenario's options and waits until it answers."""
+    command = [sys.executable, SIMULATOR, '--port', str(port), '--endpoints', str(endpoints), '--seed', str(seed)]
+    for name, value in options.items():
+        command += [f"--{name}", str(value)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            _fetch(base_url, '/__stats', timeout=1)
+            return process, base_url
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError(f"simulator did not start on port {port}")
+            time.sleep(0.1)
+
+
+def run_scanner(url_file, output_file, scans, extra_args):
+    """
+    Runs main_scanner.py to completion.
+
+    Returns:
+        tuple: (exit code, wall seconds, CPU seconds, peak RSS in bytes). CPU and RSS are
+               taken from wait4(), so they cover the scanner and the processes it reaped.
+    """
+    command = [sys.executable, SCANNER, '--url_file', url_file, '--scans', *scans,
+               '--output_file', output_file, '--no_progress', '--log_level', 'WARNING', *extra_args]
+    # stderr goes to a file, not a pipe: nothing reads a pipe until wait4() returns, so a
+    # scanner logging more than the pipe buffer would block forever.
+    with tempfile.TemporaryFile() as stderr_file:
+        started = time.monotonic()
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=stderr_file)
+        _, status, usage = os.wait4(process.pid, 0)
+        wall = time.monotonic() - started
+        process.returncode = os.waitstatus_to_exitcode(status)
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode('utf-8', 'replace')
+    if process.returncode:
+        print(f"  [!] Scanner exited with {process.returncode}:\n{stderr[-2000:]}", file=sys.stderr)
+    return process.returncode, wall, usage.ru_utime + usage.ru_stime, usage.ru_maxrss * 1024 # ru_maxrss is KiB on Linux
+
+
+def read_detections(output_file):
+    """Returns the distinct (path, parameter, type) triples in a findings JSONL file, and its summary record."""
+    detections = set()
+    summary = {}
+    if not os.path.exists(output_file):
+        return detections, summary
+    with open(output_file, encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get('record_type') == 'summary':
+                summary = record
+                continue
+            vuln = 'xss' if 'xss' in str(record.get('type', '')) else 'sqli'
+            detections.add((urlparse(record['url']).path, record.get('parameter'), vuln))
+    return detections, summary
+
+
+def _percent(part, whole):
+    return round(100.0 * part / whole, 1) if whole else 100.0
+
+
+def run_scenario(name, options, args, workdir):
+    """Runs one scenario and returns its metrics."""
+    process, base_url = start_simulator(args.port or _free_port(), args.endpoints, args.seed, options)
+    try:
+        url_file = os.path.join(workdir, f"{name}.urls")
+        with open(url_file, 'w', encoding='utf-8') as f:
+            f.write(_fetch(base_url, '/__urls'))
+        truth = {(t['path'], t['parameter'], t['type']) for t in json.loads(_fetch(base_url, '/__truth'))}
+
+        output_file = os.path.join(workdir, f"{name}.jsonl")
+        exit_code, wall, cpu, peak_rss = run_scanner(url_file, output_file, args.scans, args.scanner_args)
+        stats = json.loads(_fetch(base_url, '/__stats'))
+    finally:
+        process.terminate()
+        process.wait()
+
+    detections, summary = read_detections(output_file)
+    scanned_types = {'sqli', 'xss'} if 'all' in args.scans else set(args.scans)
+    truth = {t for t in truth if t[2] in scanned_types}
+    requests_sent = stats['requests']
+    return {
+        'scenario': name,
+        'simulator': options,
+        'exit_code': exit_code,
+        'wall_seconds': round(wall, 3),
+        'requests': requests_sent,
+        'status_counts': stats['status_counts'],
+        'bytes_received': stats['bytes_sent'],
+        'requests_per_second': round(requests_sent / wall, 1) if wall else 0.0,
+        'latency_p50_ms': stats['latency_ms']['p50'],
+        'latency_p99_ms': stats['latency_ms']['p99'],
+        'cpu_ms_per_request': round(1000.0 * cpu / requests_sent, 3) if requests_sent else 0.0,
+        'peak_rss_mb': round(peak_rss / (1024 * 1024), 1),
+        'recall': _percent(len(truth & detections), len(truth)),
+        'missed': len(truth - detections),
+        'false_positives': len(detections - truth),
+        'partial': summary.get('partial', False),
+    }
+
+
+def print_results(results, baseline=None):
+    """Prints one row per scenario; with a baseline, the change of each metric is appended."""
+    header = (f"{'Scenario':<14} {'Req':>6} {'Req/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'CPU ms/req':>10} {'Peak MB':>8} {'Recall %':>9} {'FP':>4}")
+    print(f"\n{header}\n{'-' * len(header)}")
+    for result in results:
+        print(f"{result['scenario']:<14} {result['requests']:>6} {result['requests_per_second']:>8} "
+              f"{result['latency_p50_ms']:>8} {result['latency_p99_ms']:>8} {result['cpu_ms_per_request']:>10} "
+              f"{result['peak_rss_mb']:>8} {result['recall']:>9} {result['false_positives']:>4}")
+        previous = (baseline or {}).get(result['scenario'])
+        if previous:
+            changes = []
+            for metric, higher_is_better in METRICS:
+                old, new = previous.get(metric), result[metric]
+                if not old:
+                    continue
+                delta = 100.0 * (new - old) / old
+                better = delta > 0 if higher_is_better else delta < 0
+                changes.append(f"{metric} {delta:+.1f}%{'' if abs(delta) < 5 else ' (better)' if better else ' (worse)'}")
+            print(f"{'':<14} vs baseline: {', '.join(changes)}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Benchmark main_scanner.py against the local simulator. "
+                    "Arguments after '--' are passed to main_scanner.py."
+    )
+    parser.add_argument("--scenarios", nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS),
+                        help="Scenarios to run (default: all).")
+    parser.add_argument("--scans", nargs='+', choices=['sqli', 'xss', 'all'], default=['all'],
+                        help="Scans the scanner runs (default: all).")
+    parser.add_argument("--endpoints", type=int, default=40, help="Endpoints served by the simulator.")
+    parser.add_argument("--seed", type=int, default=1337, help="Simulator seed; the same seed gives the same targets.")
+    parser.add_argument("--port", type=int, help="Simulator port (default: a free port).")
+    parser.add_argument("--json_output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="JSON file of an earlier --json_output run to compare against.")
+    return parser
+
+
+def main():
+    argv = sys.argv[1:]
+    scanner_args = []
+    if '--' in argv:
+        split = argv.index('--')
+        argv, scanner_args = argv[:split], argv[split + 1:]
+    args = build_parser().parse_args(argv)
+    args.scanner_args = scanner_args
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = {r['scenario']: r for r in json.load(f)['results']}
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='abs-bench-') as workdir:
+        for name in args.scenarios:
+            print(f"[*] Scenario '{name}' ({args.endpoints} endpoints, seed {args.seed})...", flush=True)
+            results.append(run_scenario(name, SCENARIOS[name], args, workdir))
+    print_results(results, baseline)
+
+    if args.json_output:
+        with open(args.json_output, 'w', encoding='utf-8') as f:
+            json.dump({'created_at': time.time(), 'endpoints': args.endpoints, 'seed': args.seed,
+                       'scans': args.scans, 'scanner_args': scanner_args, 'results': results}, f, indent=2)
+        print(f"\n[+] Results written to {args.json_output}")
+
+
+if __name__ == '__main__':
+    main()
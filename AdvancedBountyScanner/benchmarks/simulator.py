@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Local vulnerable-target simulator for benchmarking AdvancedBountyScanner.
+
+Serves a seeded set of endpoints over HTTP: some leak a MySQL error when a quote is
+injected (error-based SQLi), some reflect a parameter unescaped (reflected XSS) and the
+rest are safe (they escape their input). Latency, error rate, throttling and body size
+are configurable, so engine and scanner changes can be measured without touching a
+real target.
+
+Control endpoints:
+  /__urls   one scannable URL per line
+  /__truth  JSON list of the seeded vulnerabilities: {'path', 'parameter', 'type'}
+  /__stats  JSON request counters and server-side latency percentiles
+"""
+import argparse
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+PARAMETER_NAMES = ('id', 'q', 'cat', 'page', 'search', 'item', 'user', 'sort', 'lang', 'ref')
+SQL_ERROR_PAGE = "<b>Warning</b>: You have an error in your SQL syntax; check the manual that corresponds to your MySQL server version near '{}'"
+
+
+def _endpoint_name(index):
+    """Non-numeric, distinct path segments ('ep-aa', 'ep-ab', ...) so URL dedup keeps every endpoint."""
+    letters = ''
+    index += 26 # At least two letters
+    while index:
+        index, rest = divmod(index, 26)
+        letters = chr(ord('a') + rest) + letters
+    return f"ep-{letters}"
+
+
+def build_endpoints(count, sqli_ratio, xss_ratio, seed):
+    """
+    Returns the seeded endpoints: path -> {'parameter', 'vuln'} with vuln in ('sqli', 'xss', None).
+    """
+    rng = random.Random(seed)
+    endpoints = {}
+    for i in range(count):
+        roll = rng.random()
+        vuln = 'sqli' if roll < sqli_ratio else 'xss' if roll < sqli_ratio + xss_ratio else None
+        endpoints[f"/app/{_endpoint_name(i)}/view.php"] = {'parameter': rng.choice(PARAMETER_NAMES), 'vuln': vuln}
+    return endpoints
+
+
+class SimulatorState:
+    """Shared configuration, randomness and counters of one simulator process."""
+
+    def __init__(self, args):
+        self.args = args
+        self.endpoints = build_endpoints(args.endpoints, args.sqli_ratio, args.xss_ratio, args.seed)
+        self.padding = ('<p>' + 'lorem ipsum dolor sit amet ' * (args.body_size // 27 + 1))[:args.body_size]
+        self.rng = random.Random(args.seed + 1)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.status_counts = {}
+        self.bytes_sent = 0
+        self.latencies = [] # Seconds per request, as served (including injected latency)
+        self.started = time.monotonic()
+        self._tokens = float(args.throttle_burst)
+        self._last_refill = time.monotonic()
+
+    def draw(self):
+        """Returns (latency seconds, error kind or None) for one request."""
+        with self.lock:
+            latency = max(0.0, self.rng.gauss(self.args.latency_ms, self.args.latency_jitter_ms)) / 1000.0
+            error = None
+            if self.rng.random() < self.args.error_rate:
+                error = 'reset' if self.rng.random() < 0.5 else '500'
+            return latency, error
+
+    def throttled(self):
+        """Token bucket over all clients; True if the request must get a 429."""
+        if not self.args.throttle_rps:
+            return False
+        with self.lock:
+            now = time.monotonic()
+            self._tokens = min(self.args.throttle_burst, self._tokens + (now - self._last_refill) * self.args.throttle_rps)
+            self._last_refill = now
+            if self._tokens < 1:
+                return True
+            self._tokens -= 1
+            return False
+
+    def record(self, status, size, elapsed):
+        with self.lock:
+            self.requests += 1
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+            self.bytes_sent += size
+            self.latencies.append(elapsed)
+
+    def stats(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+            return {
+                'requests': self.requests,
+                'status_counts': {str(k): v for k, v in sorted(self.status_counts.items(), key=lambda kv: str(kv[0]))},
+                'bytes_sent': self.bytes_sent,
+                'uptime': round(time.monotonic() - self.started, 3),
+                'latency_ms': {
+                    'p50': round(_percentile(latencies, 50) * 1000, 2),
+                    'p99': round(_percentile(latencies, 99) * 1000, 2),
+                },
+            }
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' # Keep-alive, like real targets
+    state = None # SimulatorState, set by serve()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type='text/html; charset=utf-8', headers=None):
+        data = body.encode('utf-8') if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        return len(data)
+
+    def _control(self, path):
+        state = self.state
+        if path == '/__urls':
+            base = f"http://{self.headers.get('Host') or '127.0.0.1'}"
+            lines = [f"{base}{p}?{e['parameter']}=1" for p, e in state.endpoints.items()]
+            return self._send(200, '\n'.join(lines) + '\n', 'text/plain')
+        if path == '/__truth':
+            truth = [{'path': p, 'parameter': e['parameter'], 'type': e['vuln']}
+                     for p, e in state.endpoints.items() if e['vuln']]
+            return self._send(200, json.dumps(truth), 'application/json')
+        return self._send(200, json.dumps(state.stats()), 'application/json')
+
+    def do_GET(self):
+        started = time.monotonic()
+        parsed = urlparse(self.path)
+        if parsed.path.startswith('/__'):
+            self._control(parsed.path)
+            return
+        state = self.state
+
+        latency, error = state.draw()
+        if state.throttled():
+            size = self._send(429, 'Too Many Requests', 'text/plain', {'Retry-After': '1'})
+            state.record(429, size, time.monotonic() - started)
+            return
+        if latency:
+            time.sleep(latency)
+        if error == 'reset':
+            state.record('reset', 0, time.monotonic() - started)
+            self.close_connection = True
+            self.connection.shutdown(2) # Drop the connection without a response
+            return
+        if error == '500':
+            size = self._send(500, '<h1>Internal Server Error</h1>')
+            state.record(500, size, time.monotonic() - started)
+            return
+
+        endpoint = state.endpoints.get(parsed.path)
+        if endpoint is None:
+            size = self._send(404, '<h1>Not Found</h1>')
+            state.record(404, size, time.monotonic() - started)
+            return
+        value = parse_qs(parsed.query, keep_blank_values=True).get(endpoint['parameter'], [''])[0]
+        if endpoint['vuln'] == 'sqli' and ("'" in value or '"' in value):
+            content = SQL_ERROR_PAGE.format(html.escape(value))
+        elif endpoint['vuln'] == 'xss':
+            content = f"<h2>Results for {value}</h2>"
+        else:
+            content = f"<h2>Results for {html.escape(value)}</h2>"
+        body = f"<html><head><title>{parsed.path}</title></head><body>{content}{state.padding}</body></html>"
+        size = self._send(200, body)
+        state.record(200, size, time.monotonic() - started)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Local vulnerable-target simulator for AdvancedBountyScanner benchmarks.")
+    parser.add_argument("--host", default='127.0.0.1')
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--endpoints", type=int, default=50, help="Number of scannable endpoints.")
+    parser.add_argument("--sqli_ratio", type=float, default=0.2, help="Share of endpoints with error-based SQLi.")
+    parser.add_argument("--xss_ratio", type=float, default=0.2, help="Share of endpoints reflecting their parameter unescaped.")
+    parser.add_argument("--seed", type=int, default=1337, help="Seed for endpoint layout, latency and errors.")
+    parser.add_argument("--latency_ms", type=float, default=20.0, help="Mean injected latency per request.")
+    parser.add_argument("--latency_jitter_ms", type=float, default=5.0, help="Standard deviation of the injected latency.")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="Share of requests answered with a 500 or a dropped connection.")
+    parser.add_argument("--throttle_rps", type=float, default=0.0, help="Requests/second over all clients before 429s (0 = off).")
+    parser.add_argument("--throttle_burst", type=float, default=10.0, help="Burst allowed by the throttle.")
+    parser.add_argument("--body_size", type=int, default=2048, help="Bytes of padding in every page.")
+    return parser
+
+
+def serve(args):
+    """Runs the simulator until interrupted."""
+    SimulatorHandler.state = SimulatorState(args)
+    server = ThreadingHTTPServer((args.host, args.port), SimulatorHandler)
+    server.daemon_threads = True
+    print(f"[*] Simulator listening on http://{args.host}:{server.server_address[1]} "
+          f"({args.endpoints} endpoints, seed {args.seed})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    serve(build_parser().parse_args())
@@ -0,0 +1,293 @@
+import codecs
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from html.parser import HTMLParser
+from urllib.parse import urlparse, urljoin, urlencode, urlunparse, parse_qsl
+
+# Attempt to import CoreEngine and ConfigManager for type hinting
+try:
+    from core_engine import CoreEngine
+    from config_manager import ConfigManager
+except ImportError:
+    CoreEngine = None
+    ConfigManager = None
+
+
+logger = logging.getLogger('abs.crawler')
+
+# Links to these resources are never fetched nor reported as injection points
+STATIC_EXTENSIONS = (
+    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.webp', '.bmp', '.css', '.js', '.map',
+    '.woff', '.woff2', '.ttf', '.eot', '.pdf', '.zip', '.gz', '.tar', '.rar', '.7z',
+    '.mp3', '.mp4', '.avi', '.mov', '.webm', '.exe', '.dmg', '.iso',
+)
+
+
+class _LinkFormParser(HTMLParser):
+    """
+    Incremental HTML parser collecting hrefs/srcs and GET forms.
+
+    Fed chunk by chunk while the body is downloaded, so the page never has to be
+    held as one big string.
+    """
+
+    LINK_ATTRS = {'a': 'href', 'area': 'href', 'frame': 'src', 'iframe': 'src', 'link': 'href'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links = []
+        self.forms = [] # list of (method, action, [(name, value), ...])
+        self._current_form = None
+
+    def handle_starttag(self, tag, attrs):
+        attr_map = dict(attrs)
+        if tag in self.LINK_ATTRS:
+            value = attr_map.get(self.LINK_ATTRS[tag])
+            if value:
+                self.links.append(value)
+        elif tag == 'form':
+            self._current_form = ((attr_map.get('method') or 'get').lower(), attr_map.get('action') or '', [])
+            self.forms.append(self._current_form)
+        elif tag in ('input', 'select', 'textarea', 'button') and self._current_form is not None:
+            name = attr_map.get('name')
+            if name and (attr_map.get('type') or '').lower() not in ('submit', 'image', 'reset', 'file'):
+                self._current_form[2].append((name, attr_map.get('value') or 'test'))
+
+    def handle_endtag(self, tag):
+        if tag == 'form':
+            self._current_form = None
+
+
+class Crawler:
+    """
+    Concurrent crawler that discovers parameterized URLs (injection points) for the scanners.
+
+    Pages are fetched through CoreEngine by a thread pool, parsed as they stream in,
+    and every new in-scope URL with a query string (links and GET forms) is yielded
+    as soon as it is found, so scanning can start while the crawl is still running.
+    """
+
+    def __init__(self, core_engine_instance, config_manager_instance):
+        """
+        Initializes the Crawler.
+
+        Args:
+            core_engine_instance (CoreEngine): An instance of the CoreEngine.
+            config_manager_instance (ConfigManager): An instance of the ConfigManager.
+        """
+        if CoreEngine is None or ConfigManager is None:
+            raise ImportError("CoreEngine or ConfigManager not imported. Ensure 'src' is in sys.path.")
+
+        if not isinstance(core_engine_instance, CoreEngine):
+            raise TypeError("core_engine_instance must be an instance of CoreEngine")
+        if not isinstance(config_manager_instance, ConfigManager):
+            raise TypeError("config_manager_instance must be an instance of ConfigManager")
+
+        self.engine = core_engine_instance
+        self.config = config_manager_instance
+        self.max_depth = self.config.get_setting('crawler.max_depth', 2)
+        self.max_pages = self.config.get_setting('crawler.max_pages', 500)
+        self.max_page_bytes = self.config.get_setting('crawler.max_page_bytes', 2 * 1024 * 1024)
+        self.scope_hosts = self.config.get_setting('crawler.scope_hosts') # None -> hosts of the seed URLs
+        self.workers = max(1, self.config.get_setting('max_concurrent_requests', 5))
+        self.stats = {'pages_fetched': 0, 'injection_points': 0, 'post_forms_skipped': 0}
+
+    def _in_scope(self, url, scope):
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https'):
+            return False
+        if (parsed.hostname or '').lower() not in scope:
+            return False
+        return not parsed.path.lower().endswith(STATIC_EXTENSIONS)
+
+    @staticmethod
+    def _normalize(url):
+        """Drops the fragment so '#top' variants are fetched once."""
+        parsed = urlparse(url)
+        return urlunparse((parsed.scheme, parsed.netloc.lower(), parsed.path or '/', parsed.params, parsed.query, ''))
+
+    def _fetch_and_parse(self, url):
+        """
+        Fetches one page and returns (links, get_form_urls, post_form_count).
+
+        The body is streamed and decoded incrementally, capped at max_page_bytes.
+        Non-HTML responses are not parsed.
+        """
+        response = self.engine.make_request(url, method='GET', stream=True, module='crawl')
+        if response is None:
+            return [], [], 0
+        try:
+            content_type = (response.headers.get('Content-Type') or '').lower()
+            if 'html' not in content_type:
+                return [], [], 0
+            parser = _LinkFormParser()
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+            received = 0
+            for chunk in response.iter_content(chunk_size=65536):
+                received += len(chunk)
+                parser.feed(decoder.decode(chunk))
+                if received >= self.max_page_bytes:
+                    break
+            parser.feed(decoder.decode(b'', final=True))
+            parser.close()
+        except Exception as e:
+            logger.warning(f"Error parsing {url}: {e}")
+            return [], [], 0
+        finally:
+            response.close()
+
+        base_url = response.url or url
+        links = []
+        for link in parser.links:
+            try:
+                links.append(urljoin(base_url, link))
+            except ValueError: # Malformed href, e.g. 'http://[oops/'; skip just this link
+                logger.debug(f"Skipping malformed link {link!r} on {url}")
+        form_urls = []
+        post_forms = 0
+        for method, action, fields in parser.forms:
+            if method != 'get':
+                post_forms += 1 # Scanners only test GET parameters for now
+                continue
+            if not fields:
+                continue
+            try:
+                action_url = urlparse(urljoin(base_url, action))
+            except ValueError:
+                logger.debug(f"Skipping form with malformed action {action!r} on {url}")
+                continue
+            query = parse_qsl(action_url.query, keep_blank_values=True) + fields
+            form_urls.append(urlunparse(action_url._replace(query=urlencode(query), fragment='')))
+        return links, form_urls, post_forms
+
+    def crawl(self, seed_urls):
+        """
+        Crawls from the seed URLs and yields injection points as they are discovered.
+
+        Args:
+            seed_urls (iterable): Starting URLs. Seeds that already carry parameters are yielded too.
+
+        Yields:
+            str: Unique in-scope URLs with at least one GET parameter.
+        """
+        normalized_seeds = []
+        for seed in seed_urls:
+            try:
+                normalized_seeds.append(self._normalize(seed))
+            except ValueError:
+                logger.warning(f"Skipping malformed seed URL {seed!r}")
+        seed_urls = normalized_seeds
+        scope = set(h.lower() for h in self.scope_hosts) if self.scope_hosts else \
+            set((urlparse(u).hostname or '').lower() for u in seed_urls)
+
+        seen_pages = set()
+        emitted = set()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='crawler') as executor:
+            in_flight = {}
+
+            def schedule(url, depth):
+                if url in seen_pages or len(seen_pages) >= self.max_pages:
+                    return
+                seen_pages.add(url)
+                self.engine.expect_requests('crawl', 1)
+                in_flight[executor.submit(self._fetch_and_parse, url)] = depth
+
+            for seed in seed_urls:
+                if urlparse(seed).query and seed not in emitted:
+                    emitted.add(seed)
+                    self.stats['injection_points'] += 1
+                    yield seed
+                schedule(seed, 0)
+
+            while in_flight:
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in done:
+                    depth = in_flight.pop(future)
+                    links, form_urls, post_forms = future.result()
+                    self.stats['pages_fetched'] += 1
+                    self.stats['post_forms_skipped'] += post_forms
+
+                    for raw_url in links + form_urls:
+                        try:
+                            url = self._normalize(raw_url)
+                            if not self._in_scope(url, scope):
+                                continue
+                        except ValueError: # e.g. 'Invalid IPv6 URL'; one bad link must not end the crawl
+                            logger.debug(f"Skipping malformed URL {raw_url!r}")
+                            continue
+                        if urlparse(url).query and url not in emitted:
+                            emitted.add(url)
+                            self.stats['injection_points'] += 1
+                            yield url
+                        if depth + 1 <= self.max_depth:
+                            schedule(url, depth + 1)
+
+
+if __name__ == '__main__':
+    # --- Standalone Testing Setup ---
+    current_module_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root_dir = os.path.dirname(current_module_dir)
+    src_dir_path = os.path.join(project_root_dir, 'src')
+    if src_dir_path not in sys.path:
+        sys.path.insert(0, src_dir_path)
+
+    try:
+        from core_engine import CoreEngine
+        from config_manager import ConfigManager
+        from progress import configure_logging
+    except ImportError as e:
+        print(f"[ERROR] Failed to import CoreEngine or ConfigManager for testing: {e}")
+        sys.exit(1)
+
+    configure_logging('DEBUG', stream=sys.stdout, buffer_capacity=1)
+
+    MOCK_SITE = {
+        'http://testserver.com/': "<html><a href='/products.php?cat=1'>Cat</a><a href='/about.html#team'>About</a>"
+                                  "<a href='http://other.com/?x=1'>Off-scope</a><img src='/logo.png'></html>",
+        'http://testserver.com/about.html': "<html><form action='/search' method='get'><input name='q'>"
+                                            "<input type='submit' name='go'></form>"
+                                            "<form action='/login' method='post'><input name='user'></form></html>",
+        'http://testserver.com/products.php?cat=1': "<html><a href='http://[oops/'>Broken</a>"
+                                                    "<a href='/product.php?id=7&cat=1'>Item</a></html>",
+    }
+
+    class MockCrawlerCoreEngine(CoreEngine):
+        """A mock CoreEngine serving a tiny in-memory site."""
+        def make_request(self, url, method='GET', headers=None, params=None, data=None, json_payload=None, allow_redirects=True, **kwargs):
+            logger.debug(f"[Mock Engine] Requesting: {method} {url}")
+
+            class MockResponse:
+                def __init__(self, body, request_url):
+                    self.url = request_url
+                    self.encoding = 'utf-8'
+                    self.status_code = 200 if body is not None else 404
+                    self.headers = {'Content-Type': 'text/html; charset=utf-8'}
+                    self._body = (body or '').encode('utf-8')
+
+                def iter_content(self, chunk_size=1):
+                    for i in range(0, len(self._body), 16): # Small chunks exercise incremental parsing
+                        yield self._body[i:i + 16]
+
+                def close(self):
+                    pass
+
+            return MockResponse(MOCK_SITE.get(url), url)
+
+    print("[*] Crawler Standalone Test Suite")
+    test_config_manager = ConfigManager()
+    crawler_instance = Crawler(MockCrawlerCoreEngine(timeout=5), test_config_manager)
+
+    print("\n--- Crawling mock site ---")
+    points = []
+    for point in crawler_instance.crawl(['http://testserver.com/']):
+        print(f"  [+] Injection point: {point}")
+        points.append(point)
+
+    print(f"\n[*] Crawl stats: {crawler_instance.stats}")
+    expected = {'http://testserver.com/products.php?cat=1', 'http://testserver.com/search?q=test',
+                'http://testserver.com/product.php?id=7&cat=1'}
+    print(f"[*] Expected injection points found: {expected == set(points)}")
+    print("\n[*] Crawler Standalone Test Suite Finished.")
@@ -1,3 +1,4 @@
+import logging
 import sys
 import os
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
@@ -6,12 +7,19 @@ from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 try:
     from core_engine import CoreEngine
     from config_manager import ConfigManager
+    from analysis_pool import AnalysisPool
+    from response_triage import ResponseTriage
 except ImportError:
     # This allows the script to be parsed, but it will fail at runtime
     # if not called from a context where src is in sys.path (e.g. main_scanner.py)
     # or if the __main__ block's path adjustments are not active.
     CoreEngine = None
     ConfigManager = None
+    AnalysisPool = None
+    ResponseTriage = None
+
+
+logger = logging.getLogger('abs.sqli_scanner')
 
 
 class SQLiScanner:
@@ -33,13 +41,18 @@ class SQLiScanner:
         "sqlite3.operationalerror", "include_path" # Common PHP warning that might expose path due to SQLi
     ]
 
-    def __init__(self, core_engine_instance, config_manager_instance):
+    def __init__(self, core_engine_instance, config_manager_instance, finding_sink=None, analysis_pool=None, triage=None):
         """
         Initializes the SQLiScanner.
 
         Args:
             core_engine_instance (CoreEngine): An instance of the CoreEngine.
             config_manager_instance (ConfigManager): An instance of the ConfigManager.
+            finding_sink (callable, optional): Called with each finding as soon as it is found
+                                               (e.g., a StreamingReporter).
+            analysis_pool (AnalysisPool, optional): Where response bodies are matched against the error
+                                                    signatures (default: inline in the scanning thread).
+            triage (ResponseTriage, optional): Drops binary/oversized bodies before analysis.
         """
         if CoreEngine is None or ConfigManager is None:
             # This check helps if the script is imported where src is not yet in path.
@@ -53,8 +66,11 @@ class SQLiScanner:
 
         self.engine = core_engine_instance
         self.config = config_manager_instance
+        self.finding_sink = finding_sink
+        self.analysis = analysis_pool if analysis_pool is not None else AnalysisPool(workers=0)
+        self.triage = triage if triage is not None else ResponseTriage()
+        self.error_signatures = tuple(self.SQL_ERROR_SIGNATURES)
         self.user_agent = self.config.get_setting('user_agent', 'AdvancedBountyScanner/0.1 (SQLiModule)')
-        self.timeout = self.config.get_setting('timeout', 10)
 
 
     def scan_url(self, target_url):
@@ -76,7 +92,9 @@ class SQLiScanner:
             # print(f"[*] No GET parameters found in {target_url}. Skipping SQLi parameter scan.")
             return potential_findings
 
-        print(f"[*] Scanning URL for SQLi: {target_url}")
+        logger.debug(f"Scanning URL for SQLi: {target_url}")
+        self.engine.expect_requests('sqli', len(original_query_params) * len(self.SQLI_PAYLOADS))
+        pending = [] # (test_url, param, payload, status, analysis future); matched after all requests are sent
 
         for param_name, param_values in original_query_params.items():
             original_value = param_values[0] if param_values else "" # Take the first value if multiple exist
@@ -101,30 +119,37 @@ class SQLiScanner:
                     test_url,
                     method='GET',
                     headers={'User-Agent': self.user_agent},
-                    timeout=self.timeout,
-                    allow_redirects=False # Usually better to see direct response for error-based
+                    allow_redirects=False, # Usually better to see direct response for error-based
+                    module='sqli',
+                    stream=True # Headers are triaged before any of the body is downloaded
                 )
-
-                if response and response.content: # response.text can be slow if content is large
-                    try:
-                        response_text = response.content.decode('utf-8', errors='ignore').lower()
-                    except AttributeError: # If response.content is None
-                        response_text = ""
-
-                    for error_sig in self.SQL_ERROR_SIGNATURES:
-                        if error_sig.lower() in response_text:
-                            finding = {
-                                'url': test_url,
-                                'parameter': param_name,
-                                'payload': payload,
-                                'type': 'error-based',
-                                'evidence': error_sig,
-                                'response_status': response.status_code,
-                                # 'response_excerpt': response_text[:200] # Optional: for more context
-                            }
-                            potential_findings.append(finding)
-                            print(f"  [+] Potential SQLi: Param='{param_name}', Payload='{payload}', Error='{error_sig}'")
-                            break # Found one error for this payload, move to next payload
+                body = self.triage.read(response, 'sqli')
+
+                if body: # Matched on the raw bytes; no decoding of the body
+                    future = self.analysis.submit(body, self.error_signatures, ignore_case=True)
+                    pending.append((test_url, param_name, payload, response.status_code, future))
+
+        for test_url, param_name, payload, status_code, future in pending:
+            try:
+                matched = future.result()
+            except Exception as e:
+                logger.warning(f"Analysis of {test_url} failed: {e}")
+                continue
+            if not matched:
+                continue
+            error_sig = self.error_signatures[matched[0]] # First signature in list order, one finding per payload
+            finding = {
+                'url': test_url,
+                'parameter': param_name,
+                'payload': payload,
+                'type': 'error-based',
+                'evidence': error_sig,
+                'response_status': status_code,
+            }
+            potential_findings.append(finding)
+            if self.finding_sink:
+                self.finding_sink(finding)
+            logger.info(f"Potential SQLi: Param='{param_name}', Payload='{payload}', Error='{error_sig}'")
 
         return potential_findings
 
@@ -142,15 +167,20 @@ if __name__ == '__main__':
     try:
         from core_engine import CoreEngine
         from config_manager import ConfigManager
+        from analysis_pool import AnalysisPool
+        from response_triage import ResponseTriage
+        from progress import configure_logging
     except ImportError as e:
         print(f"[ERROR] Failed to import CoreEngine or ConfigManager for testing: {e}")
         print("Ensure that 'src' directory is correctly added to sys.path if running standalone.")
         sys.exit(1)
 
+    configure_logging('INFO', stream=sys.stdout, buffer_capacity=1)
+
     class MockSQLiCoreEngine(CoreEngine):
         """A mock CoreEngine for testing the SQLiScanner without making real HTTP requests."""
         def make_request(self, url, method='GET', headers=None, params=None, data=None, json_payload=None, allow_redirects=True, **kwargs):
-            print(f"  [Mock Engine] Requesting: {method} {url}")
+            logger.debug(f"[Mock Engine] Requesting: {method} {url}")
             parsed_url_for_mock = urlparse(url)
             query_params_for_mock = parse_qs(parsed_url_for_mock.query)
 
@@ -162,13 +192,19 @@ if __name__ == '__main__':
                     self.ok = ok_val
                     self.headers = {'Content-Type': 'text/html'}
 
+                def iter_content(self, chunk_size=1):
+                    yield self.content
+
+                def close(self):
+                    pass
+
             # Check if the 'vulnerable_param' contains a payload that triggers a mock SQL error
             if 'vulnerable_param' in query_params_for_mock:
                 param_value = query_params_for_mock['vulnerable_param'][0]
                 # Simple check for any of the known payloads that might cause an error
                 # This mock is simplified; a real server would react to specific parts of the payload.
                 if "' OR '1'='1" in param_value or "admin'" in param_value or "'" in param_value:
-                    print("  [Mock Engine] Simulated SQL error response for vulnerable_param.")
+                    logger.debug("[Mock Engine] Simulated SQL error response for vulnerable_param.")
                     return MockResponse("Syntax error: You have an error in your SQL syntax near ''1'='1'", 200, True)
 
             # print("  [Mock Engine] Simulated benign response.")
@@ -1,3 +1,5 @@
+import codecs
+import logging
 import sys
 import os
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
@@ -6,9 +8,16 @@ from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 try:
     from core_engine import CoreEngine
     from config_manager import ConfigManager
+    from analysis_pool import AnalysisPool
+    from response_triage import ResponseTriage
 except ImportError:
     CoreEngine = None
     ConfigManager = None
+    AnalysisPool = None
+    ResponseTriage = None
+
+
+logger = logging.getLogger('abs.xss_scanner')
 
 
 class XSSScanner:
@@ -30,13 +39,18 @@ class XSSScanner:
         "<plaintext>"
     ]
 
-    def __init__(self, core_engine_instance, config_manager_instance):
+    def __init__(self, core_engine_instance, config_manager_instance, finding_sink=None, analysis_pool=None, triage=None):
         """
         Initializes the XSSScanner.
 
         Args:
             core_engine_instance (CoreEngine): An instance of the CoreEngine.
             config_manager_instance (ConfigManager): An instance of the ConfigManager.
+            finding_sink (callable, optional): Called with each finding as soon as it is found
+                                               (e.g., a StreamingReporter).
+            analysis_pool (AnalysisPool, optional): Where response bodies are searched for reflected
+                                                    payloads (default: inline in the scanning thread).
+            triage (ResponseTriage, optional): Drops binary/oversized bodies before analysis.
         """
         if CoreEngine is None or ConfigManager is None:
             raise ImportError("CoreEngine or ConfigManager not imported. Ensure 'src' is in sys.path.")
@@ -48,8 +62,20 @@ class XSSScanner:
 
         self.engine = core_engine_instance
         self.config = config_manager_instance
+        self.finding_sink = finding_sink
+        self.analysis = analysis_pool if analysis_pool is not None else AnalysisPool(workers=0)
+        self.triage = triage if triage is not None else ResponseTriage()
         self.user_agent = self.config.get_setting('user_agent', 'AdvancedBountyScanner/0.1 (XSSModule)')
-        self.timeout = self.config.get_setting('timeout', 10)
+
+    @staticmethod
+    def _as_utf8(body, encoding):
+        """Returns body re-encoded from the response's charset to UTF-8 (the encoding the payloads are searched in)."""
+        try:
+            if not encoding or codecs.lookup(encoding).name == 'utf-8':
+                return body
+        except LookupError: # Unknown charset label; search the bytes as they are
+            return body
+        return body.decode(encoding, 'replace').encode('utf-8')
 
     def scan_url(self, target_url):
         """
@@ -70,7 +96,9 @@ class XSSScanner:
             # print(f"[*] No GET parameters found in {target_url}. Skipping XSS parameter scan.")
             return potential_findings
 
-        print(f"[*] Scanning URL for XSS: {target_url}")
+        logger.debug(f"Scanning URL for XSS: {target_url}")
+        self.engine.expect_requests('xss', len(original_query_params) * len(self.XSS_PAYLOADS))
+        pending = [] # (test_url, param, payload, search term, status, analysis future)
 
         for param_name, param_values in original_query_params.items():
             original_value = param_values[0] if param_values else ""
@@ -91,27 +119,41 @@ class XSSScanner:
                     test_url,
                     method='GET',
                     headers={'User-Agent': self.user_agent},
-                    timeout=self.timeout,
-                    allow_redirects=False # Important to see direct reflection
+                    allow_redirects=False, # Important to see direct reflection
+                    module='xss',
+                    stream=True # Headers are triaged before any of the body is downloaded
                 )
+                body = self.triage.read(response, 'xss')
 
-                if response and response.text:
+                if body:
                     # Check if the exact payload (or its unique marker part) is reflected
                     # This is a simple check for reflected XSS. Real XSS can be more complex.
                     search_term = self.UNIQUE_MARKER if self.UNIQUE_MARKER in payload else payload
-
-                    if search_term in response.text:
-                        finding = {
-                            'url': test_url,
-                            'parameter': param_name,
-                            'payload': payload,
-                            'type': 'reflected-xss',
-                            'evidence': f"Payload found in response. Search term: '{search_term}'",
-                            'response_status': response.status_code
-                        }
-                        potential_findings.append(finding)
-                        print(f"  [+] Potential XSS: Param='{param_name}', Payload='{payload[:50]}...', Evidence='{finding['evidence']}'")
-                        # No break here, a parameter might be vulnerable to multiple payloads / reflections
+                    # The triaged prefix is already decompressed and de-chunked; it is searched as bytes,
+                    # re-encoded to UTF-8 first when the page declares another charset (UTF-16, Shift_JIS, ...).
+                    future = self.analysis.submit(self._as_utf8(body, response.encoding), (search_term,))
+                    pending.append((test_url, param_name, payload, search_term, response.status_code, future))
+
+        for test_url, param_name, payload, search_term, status_code, future in pending:
+            try:
+                if not future.result():
+                    continue
+            except Exception as e:
+                logger.warning(f"Analysis of {test_url} failed: {e}")
+                continue
+            finding = {
+                'url': test_url,
+                'parameter': param_name,
+                'payload': payload,
+                'type': 'reflected-xss',
+                'evidence': f"Payload found in response. Search term: '{search_term}'",
+                'response_status': status_code
+            }
+            potential_findings.append(finding)
+            if self.finding_sink:
+                self.finding_sink(finding)
+            logger.info(f"Potential XSS: Param='{param_name}', Payload='{payload[:50]}...', Evidence='{finding['evidence']}'")
+            # No break here, a parameter might be vulnerable to multiple payloads / reflections
 
         return potential_findings
 
@@ -127,18 +169,24 @@ if __name__ == '__main__':
     try:
         from core_engine import CoreEngine
         from config_manager import ConfigManager
+        from analysis_pool import AnalysisPool
+        from response_triage import ResponseTriage
+        from progress import configure_logging
     except ImportError as e:
         print(f"[ERROR] Failed to import CoreEngine or ConfigManager for testing: {e}")
         sys.exit(1)
 
+    configure_logging('INFO', stream=sys.stdout, buffer_capacity=1)
+
     class MockXSSCoreEngine(CoreEngine):
         """A mock CoreEngine for testing the XSSScanner."""
         def make_request(self, url, method='GET', headers=None, params=None, data=None, json_payload=None, allow_redirects=True, **kwargs):
-            print(f"  [Mock Engine] Requesting: {method} {url}")
+            logger.debug(f"[Mock Engine] Requesting: {method} {url}")
             parsed_url_for_mock = urlparse(url)
             query_params_for_mock = parse_qs(parsed_url_for_mock.query)
 
             response_text_content = "<html><body>Standard page content.</body></html>"
+            response_encoding = 'utf-8'
 
             # Simulate reflection for 'query' parameter
             if 'query' in query_params_for_mock:
@@ -146,25 +194,33 @@ if __name__ == '__main__':
                 # Check if any of our XSS payloads (or their markers) are in the query_val
                 if XSSScanner.UNIQUE_MARKER in query_val or "<ScRipT>" in query_val or "<h1>test</h1>" in query_val:
                     response_text_content = f"<html><body>Search results for: {query_val}</body></html>"
-                    print(f"  [Mock Engine] Simulated XSS reflection for query parameter with value: {query_val[:60]}...")
+                    logger.debug(f"[Mock Engine] Simulated XSS reflection for query parameter with value: {query_val[:60]}...")
 
             # Simulate reflection for 'name' parameter with a specific payload
             if 'name' in query_params_for_mock:
                 name_val = query_params_for_mock['name'][0]
                 if XSSScanner.UNIQUE_MARKER in name_val:
+                     response_encoding = 'utf-16' # Reflected in a page that is not ASCII-compatible
                      response_text_content = f"<html><head><title>User: {name_val}</title></head><body>Hello, {name_val}!</body></html>"
-                     print(f"  [Mock Engine] Simulated XSS reflection for name parameter with value: {name_val[:60]}...")
+                     logger.debug(f"[Mock Engine] Simulated XSS reflection for name parameter with value: {name_val[:60]}...")
 
 
             class MockResponse:
-                def __init__(self, text_val, status_code_val=200, ok_val=True):
+                def __init__(self, text_val, status_code_val=200, ok_val=True, encoding='utf-8'):
                     self.text = text_val
-                    self.content = text_val.encode('utf-8')
+                    self.encoding = encoding
+                    self.content = text_val.encode(encoding)
                     self.status_code = status_code_val
                     self.ok = ok_val
-                    self.headers = {'Content-Type': 'text/html'}
+                    self.headers = {'Content-Type': f'text/html; charset={encoding}'}
+
+                def iter_content(self, chunk_size=1):
+                    yield self.content
+
+                def close(self):
+                    pass
 
-            return MockResponse(response_text_content)
+            return MockResponse(response_text_content, encoding=response_encoding)
 
     print("[*] XSSScanner Standalone Test Suite")
 
@@ -0,0 +1,186 @@
+import functools
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from progress import get_logger
+
+logger = get_logger('analysis_pool')
+
+
+@functools.lru_cache(maxsize=64)
+def _compile(patterns, ignore_case):
+    """One alternation over all patterns, so a body is scanned once instead of once per pattern."""
+    regex = re.compile(b'|'.join(re.escape(p.encode('utf-8')) for p in patterns), re.IGNORECASE if ignore_case else 0)
+    index = {}
+    for i, pattern in enumerate(patterns):
+        key = pattern.encode('utf-8')
+        index.setdefault(key.lower() if ignore_case else key, i)
+    return regex, index
+
+
+def search_patterns(body, patterns, ignore_case=False):
+    """
+    Finds which of `patterns` occur in a response body without decoding it.
+
+    Args:
+        body (bytes-like): Raw response body (bytes, or a memoryview of shared memory).
+        patterns (tuple): Strings to look for (encoded as UTF-8; ASCII patterns match any ASCII-compatible page).
+        ignore_case (bool, optional): ASCII case-insensitive matching.
+
+    Returns:
+        tuple: Indices into `patterns` that were found, in pattern order.
+    """
+    regex, index = _compile(patterns, ignore_case)
+    found = set()
+    for match in regex.finditer(body):
+        key = match.group(0)
+        found.add(index[key.lower() if ignore_case else key])
+        if len(found) == len(index):
+            break
+    return tuple(sorted(found))
+
+
+def _search_shared(name, size, patterns, ignore_case):
+    """Worker side of a shared-memory job: matches directly on the mapped buffer, without copying it."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        view = shm.buf[:size]
+        try:
+            return search_patterns(view, patterns, ignore_case)
+        finally:
+            view.release()
+    finally:
+        shm.close()
+
+
+class AnalysisPool:
+    """
+    Runs response body analysis (signature and marker matching) off the scan threads.
+
+    Small bodies are matched inline, since handing them to another process costs more
+    than the match. Larger bodies go to a process pool, so CPU-heavy matching neither
+    holds the GIL needed by the threads doing network I/O nor serializes on one core;
+    bodies above `shared_memory_threshold` are copied once into shared memory and only
+    its name is sent to the worker instead of pickling the body.
+
+    submit() always returns a Future, so scanners can keep sending requests and collect
+    the (compact) results afterwards regardless of where the match ran.
+    """
+
+    def __init__(self, workers=None, inline_threshold=64 * 1024, shared_memory_threshold=1024 * 1024):
+        """
+        Args:
+            workers (int, optional): Analysis processes. None -> CPU count - 1; 0 -> analyze everything inline.
+            inline_threshold (int, optional): Bodies up to this many bytes are analyzed in the calling thread.
+            shared_memory_threshold (int, optional): Bodies above this many bytes are passed via shared memory.
+        """
+        if workers is None:
+            workers = (os.cpu_count() or 1) - 1
+        self.workers = max(0, workers)
+        self.inline_threshold = inline_threshold
+        self.shared_memory_threshold = shared_memory_threshold
+        self.stats = {'inline': 0, 'pooled': 0, 'shared_memory': 0}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Creates an AnalysisPool from the 'analysis' settings."""
+        return cls(
+            workers=config_manager.get_setting('analysis.workers'),
+            inline_threshold=config_manager.get_setting('analysis.inline_threshold', 64 * 1024),
+            shared_memory_threshold=config_manager.get_setting('analysis.shared_memory_threshold', 1024 * 1024)
+        )
+
+    def _count(self, path):
+        with self._lock:
+            self.stats[path] += 1
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # 'spawn': forking a process that runs many threads can copy held locks into the child.
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                         mp_context=multiprocessing.get_context('spawn'))
+                    logger.debug(f"Started {self.workers} analysis process(es).")
+        return self._executor
+
+    def submit(self, body, patterns, ignore_case=False):
+        """
+        Schedules search_patterns() for a response body.
+
+        Args:
+            body (bytes): Raw response body.
+            patterns (tuple): Strings to look for (a tuple, so compiled patterns can be cached).
+            ignore_case (bool, optional): ASCII case-insensitive matching.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the tuple of matched pattern indices.
+        """
+        size = len(body)
+        if not self.workers or size <= self.inline_threshold:
+            self._count('inline')
+            future = Future()
+            try:
+                future.set_result(search_patterns(body, patterns, ignore_case))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        executor = self._get_executor()
+        if size <= self.shared_memory_threshold:
+            self._count('pooled')
+            return executor.submit(search_patterns, body, patterns, ignore_case)
+
+        self._count('shared_memory')
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        shm.buf[:size] = body
+        try:
+            future = executor.submit(_search_shared, shm.name, size, patterns, ignore_case)
+        except Exception:
+            shm.close()
+            shm.unlink()
+            raise
+
+        def release(_):
+            shm.close()
+            shm.unlink()
+        future.add_done_callback(release)
+        return future
+
+    def close(self):
+        """Waits for pending analysis and stops the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+if __name__ == '__main__':
+    import time
+
+    print("[*] AnalysisPool Test Suite")
+    signatures = ("you have an error in your sql syntax", "warning: mysql", "unclosed quotation mark")
+    page = b"<html>" + b"<p>lorem ipsum dolor sit amet</p>" * 20000 + b"Warning: MySQL ... You have an error in your SQL syntax</html>"
+    print(f"  Page size: {len(page)} bytes")
+
+    pool = AnalysisPool(workers=2, inline_threshold=64 * 1024, shared_memory_threshold=256 * 1024)
+    small = pool.submit(b"<b>Unclosed quotation mark</b>", signatures, ignore_case=True).result()
+    print(f"  Inline match: {[signatures[i] for i in small]}")
+
+    started = time.monotonic()
+    futures = [pool.submit(page, signatures, ignore_case=True) for _ in range(8)]
+    results = {f.result() for f in futures}
+    print(f"  Shared-memory matches: {[[signatures[i] for i in r] for r in results]} "
+          f"({len(futures)} bodies in {time.monotonic() - started:.2f}s)")
+    medium = pool.submit(page[:100000], ("lorem ipsum", "not present"), ignore_case=False).result()
+    print(f"  Pooled match (pickled body): {medium}")
+    print(f"  Stats: {pool.stats}")
+    pool.close()
+
+    print(f"  workers=0 analyzes inline: {AnalysisPool(workers=0).submit(page, signatures, True).result()}")
+    print("\n[*] AnalysisPool Test Suite Finished.")
@@ -0,0 +1,230 @@
+import threading
+import time
+
+BUDGET_KEYS = ('seconds', 'requests', 'bytes')
+
+
+class _Usage:
+    __slots__ = ('started', 'requests', 'bytes', 'skipped', 'exhausted')
+
+    def __init__(self, started=None):
+        self.started = started
+        self.requests = 0
+        self.bytes = 0
+        self.skipped = 0 # Requests refused after the budget ran out
+        self.exhausted = None # Name of the first limit that ran out
+
+    def as_dict(self, limits, now):
+        return {
+            'elapsed': round(now - self.started, 1) if self.started is not None else 0.0,
+            'requests': self.requests,
+            'bytes': self.bytes,
+            'skipped': self.skipped,
+            'exhausted': self.exhausted,
+            'limits': {k: v for k, v in limits.items() if v},
+        }
+
+
+class ScanBudget:
+    """
+    Wall-clock, request and byte budgets for a run, for every host and per module.
+
+    CoreEngine asks allow() before each request; once any budget covering the
+    request is spent the request is refused (and counted as skipped), so in-flight
+    requests finish while no new work starts. The scan pipeline checks
+    run_exhausted() to stop taking URLs, and report() describes what ran out and
+    how much work was left undone.
+
+    With `shared_run`, the run budget is the one of a distributed run, shared by every
+    worker (see work_queue.SQLiteRunBudget): requests are reserved from it in blocks of
+    SHARED_BLOCK and received bytes are added every SHARED_FLUSH_BYTES, so the shared
+    store is not touched per request; a request cap can therefore be declared spent while
+    other workers still hold up to SHARED_BLOCK unsent reservations each. Per-host and
+    per-module budgets stay local.
+    """
+
+    SHARED_BLOCK = 16
+    SHARED_FLUSH_BYTES = 65536
+
+    def __init__(self, run=None, per_host=None, per_module=None, shared_run=None):
+        """
+        Args:
+            run (dict, optional): Limits for the whole run: 'seconds', 'requests', 'bytes' (None/0 = unlimited).
+                                  Ignored with shared_run, which holds the run's limits.
+            per_host (dict, optional): The same limits, applied to every host separately.
+            per_module (dict, optional): module name ('crawl', 'sqli', 'xss') -> limits.
+            shared_run (SQLiteRunBudget, optional): Run budget shared with other processes.
+        """
+        self.shared_run = shared_run
+        self.run_limits = self._clean(None if shared_run is not None else run)
+        self.host_limits = self._clean(per_host)
+        self.module_limits = {module: self._clean(limits) for module, limits in (per_module or {}).items()}
+        self._run = _Usage(time.monotonic())
+        self._hosts = {}
+        self._modules = {}
+        self._reserved = 0 # Requests reserved from shared_run and not sent yet
+        self._unflushed_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _clean(limits):
+        return {k: (limits or {}).get(k) or None for k in BUDGET_KEYS}
+
+    @classmethod
+    def from_config(cls, config_manager, shared_run=None):
+        """Creates a ScanBudget from the 'budgets' settings, or returns None when no budget is set."""
+        budget = cls(
+            run=config_manager.get_setting('budgets.run'),
+            per_host=config_manager.get_setting('budgets.per_host'),
+            per_module=config_manager.get_setting('budgets.per_module'),
+            shared_run=shared_run
+        )
+        return budget if budget.enabled else None
+
+    @property
+    def enabled(self):
+        return self.shared_run is not None or any(self.run_limits.values()) or any(self.host_limits.values()) or \
+            any(any(limits.values()) for limits in self.module_limits.values())
+
+    @staticmethod
+    def _spent(usage, limits, now):
+        """Returns the name of the first exhausted limit, or None."""
+        if usage.exhausted:
+            return usage.exhausted
+        if limits['seconds'] and usage.started is not None and now - usage.started >= limits['seconds']:
+            usage.exhausted = 'seconds'
+        elif limits['requests'] and usage.requests >= limits['requests']:
+            usage.exhausted = 'requests'
+        elif limits['bytes'] and usage.bytes >= limits['bytes']:
+            usage.exhausted = 'bytes'
+        return usage.exhausted
+
+    def _scopes(self, host, module, now):
+        """(usage, limits) pairs covering a request; per-host/module usage is created on first use."""
+        scopes = [(self._run, self.run_limits)]
+        if any(self.host_limits.values()):
+            usage = self._hosts.get(host)
+            if usage is None:
+                usage = self._hosts[host] = _Usage(now)
+            scopes.append((usage, self.host_limits))
+        module_limits = self.module_limits.get(module)
+        if module_limits and any(module_limits.values()):
+            usage = self._modules.get(module)
+            if usage is None:
+                usage = self._modules[module] = _Usage(now)
+            scopes.append((usage, module_limits))
+        return scopes
+
+    def allow(self, host, module=None):
+        """
+        Reserves one request against every budget covering it.
+
+        Returns:
+            bool: False if a budget is spent; the request must not be sent.
+        """
+        now = time.monotonic()
+        with self._lock:
+            scopes = self._scopes(host, module, now)
+            for usage, limits in scopes:
+                if self._spent(usage, limits, now):
+                    usage.skipped += 1
+                    return False
+            if self.shared_run is not None and not self._reserve_shared():
+                self._run.skipped += 1
+                return False
+            for usage, _ in scopes:
+                usage.requests += 1
+            return True
+
+    def _reserve_shared(self):
+        if not self._reserved:
+            self._flush_shared()
+            self._reserved = self.shared_run.reserve(self.SHARED_BLOCK)
+            if not self._reserved:
+                self._run.exhausted = self.shared_run.exhausted() or 'requests'
+                return False
+        self._reserved -= 1
+        return True
+
+    def _flush_shared(self):
+        if self._unflushed_bytes:
+            self.shared_run.add_bytes(self._unflushed_bytes)
+            self._unflushed_bytes = 0
+
+    def record_bytes(self, host, module, count):
+        """Adds received body bytes to the budgets of a request."""
+        with self._lock:
+            for usage, _ in self._scopes(host, module, time.monotonic()):
+                usage.bytes += count
+            if self.shared_run is not None:
+                self._unflushed_bytes += count
+                if self._unflushed_bytes >= self.SHARED_FLUSH_BYTES:
+                    self._flush_shared()
+
+    def run_exhausted(self):
+        with self._lock:
+            if self.shared_run is not None and self._run.exhausted is None:
+                self._flush_shared()
+                self._run.exhausted = self.shared_run.exhausted()
+            return self._spent(self._run, self.run_limits, time.monotonic()) is not None
+
+    def close(self):
+        """Hands unsent reservations, bytes and refused requests back to shared_run (no-op without it)."""
+        with self._lock:
+            if self.shared_run is not None:
+                self._flush_shared()
+                self.shared_run.release(self._reserved, self._run.skipped)
+                self._reserved = 0
+
+    def host_exhausted(self, host):
+        with self._lock:
+            usage = self._hosts.get(host)
+            return usage is not None and self._spent(usage, self.host_limits, time.monotonic()) is not None
+
+    def module_exhausted(self, module):
+        with self._lock:
+            usage = self._modules.get(module)
+            return usage is not None and self._spent(usage, self.module_limits[module], time.monotonic()) is not None
+
+    def report(self):
+        """
+        Returns budget usage for the run report.
+
+        Returns:
+            dict: {'run': usage, 'hosts': {host: usage}, 'modules': {module: usage}}. Only hosts whose
+                  budget ran out are listed, to keep the report small on wide scans.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._spent(self._run, self.run_limits, now)
+            return {
+                'run': self._run.as_dict(self.run_limits, now),
+                'hosts': {host: usage.as_dict(self.host_limits, now) for host, usage in self._hosts.items()
+                          if self._spent(usage, self.host_limits, now)},
+                'modules': {module: usage.as_dict(self.module_limits[module], now)
+                            for module, usage in self._modules.items()},
+            }
+
+
+if __name__ == '__main__':
+    print("[*] ScanBudget Test Suite")
+
+    budget = ScanBudget(run={'seconds': 0.5}, per_host={'requests': 3}, per_module={'xss': {'bytes': 1000}})
+    print(f"\n--- Per-host request budget (3) ---")
+    print(f"  a.test: {[budget.allow('a.test', 'sqli') for _ in range(5)]}")
+    print(f"  b.test: {[budget.allow('b.test', 'sqli') for _ in range(2)]}")
+    print(f"  a.test exhausted: {budget.host_exhausted('a.test')}, b.test exhausted: {budget.host_exhausted('b.test')}")
+
+    print(f"\n--- Per-module byte budget (xss: 1000) ---")
+    print(f"  first xss request: {budget.allow('c.test', 'xss')}")
+    budget.record_bytes('c.test', 'xss', 1500)
+    print(f"  after 1500 bytes: {budget.allow('d.test', 'xss')}, sqli still allowed: {budget.allow('d.test', 'sqli')}")
+
+    print(f"\n--- Run deadline (0.5s) ---")
+    print(f"  run exhausted now: {budget.run_exhausted()}")
+    time.sleep(0.6)
+    print(f"  run exhausted after 0.6s: {budget.run_exhausted()}, new request allowed: {budget.allow('e.test', 'sqli')}")
+
+    print(f"\n[*] Report: {budget.report()}")
+    print(f"[*] No limits configured -> enabled={ScanBudget().enabled}")
+    print("\n[*] ScanBudget Test Suite Finished.")
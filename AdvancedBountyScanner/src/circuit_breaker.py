@@ -0,0 +1,174 @@
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class _HostCircuit:
+    __slots__ = ('state', 'failures', 'opened_at', 'recovery_timeout', 'times_opened', 'probe_in_flight', 'skipped')
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0 # Consecutive connection errors/timeouts
+        self.opened_at = 0.0
+        self.recovery_timeout = 0.0
+        self.times_opened = 0
+        self.probe_in_flight = False
+        self.skipped = {} # module -> requests failed fast while open
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker for CoreEngine.
+
+    After `failure_threshold` consecutive connection errors or timeouts the host's
+    circuit opens and its requests fail immediately instead of each waiting for the
+    full timeout. Once `recovery_timeout` has passed, a single half-open probe is
+    let through: success closes the circuit, failure reopens it with the recovery
+    time doubled (up to `max_recovery_timeout`). Requests refused while open are
+    counted per host and module so the skipped work can be reported.
+    """
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30.0, max_recovery_timeout=300.0):
+        """
+        Args:
+            failure_threshold (int, optional): Consecutive failures that open a host's circuit.
+            recovery_timeout (float, optional): Seconds before the first half-open probe.
+            max_recovery_timeout (float, optional): Upper bound for the doubled recovery time.
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.max_recovery_timeout = max(recovery_timeout, max_recovery_timeout)
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Creates a CircuitBreaker from the 'circuit_breaker' settings, or returns None when disabled."""
+        if not config_manager.get_setting('circuit_breaker.enabled', True):
+            return None
+        return cls(
+            failure_threshold=config_manager.get_setting('circuit_breaker.failure_threshold', 5),
+            recovery_timeout=config_manager.get_setting('circuit_breaker.recovery_timeout', 30.0),
+            max_recovery_timeout=config_manager.get_setting('circuit_breaker.max_recovery_timeout', 300.0)
+        )
+
+    def _circuit(self, host):
+        circuit = self._hosts.get(host)
+        if circuit is None:
+            circuit = self._hosts[host] = _HostCircuit()
+        return circuit
+
+    def allow(self, host, module=None):
+        """
+        Decides whether a request to host may be sent.
+
+        Returns:
+            bool: False if the request must fail fast (it is then counted as skipped).
+        """
+        with self._lock:
+            circuit = self._circuit(host)
+            if circuit.state == CLOSED:
+                return True
+            if circuit.state == OPEN and time.monotonic() - circuit.opened_at >= circuit.recovery_timeout:
+                circuit.state = HALF_OPEN
+            if circuit.state == HALF_OPEN and not circuit.probe_in_flight:
+                circuit.probe_in_flight = True # This request is the health probe
+                return True
+            circuit.skipped[module] = circuit.skipped.get(module, 0) + 1
+            return False
+
+    def record_success(self, host):
+        """Any response (including HTTP errors) proves the host is reachable."""
+        with self._lock:
+            circuit = self._circuit(host)
+            circuit.failures = 0
+            if circuit.state != CLOSED:
+                circuit.state = CLOSED
+                circuit.probe_in_flight = False
+                circuit.recovery_timeout = 0.0
+                return True # Recovered
+            return False
+
+    def record_failure(self, host):
+        """
+        Records a connection error or timeout.
+
+        Returns:
+            bool: True if this failure (re)opened the circuit.
+        """
+        with self._lock:
+            circuit = self._circuit(host)
+            circuit.failures += 1
+            if circuit.state == HALF_OPEN:
+                circuit.recovery_timeout = min(circuit.recovery_timeout * 2, self.max_recovery_timeout)
+            elif circuit.state == CLOSED and circuit.failures >= self.failure_threshold:
+                circuit.recovery_timeout = self.recovery_timeout
+            else:
+                return False
+            circuit.state = OPEN
+            circuit.opened_at = time.monotonic()
+            circuit.probe_in_flight = False
+            circuit.times_opened += 1
+            return True
+
+    def release_probe(self, host):
+        """Lets another half-open probe through when a request ended without telling whether the host is up."""
+        with self._lock:
+            circuit = self._hosts.get(host)
+            if circuit is not None:
+                circuit.probe_in_flight = False
+
+    def state(self, host):
+        with self._lock:
+            circuit = self._hosts.get(host)
+            return circuit.state if circuit else CLOSED
+
+    def report(self):
+        """
+        Summarizes every host whose circuit opened at least once.
+
+        Returns:
+            dict: host -> {'state', 'times_opened', 'skipped', 'skipped_by_module'}
+        """
+        with self._lock:
+            return {
+                host: {
+                    'state': circuit.state,
+                    'times_opened': circuit.times_opened,
+                    'skipped': sum(circuit.skipped.values()),
+                    'skipped_by_module': {str(module): count for module, count in circuit.skipped.items()},
+                }
+                for host, circuit in self._hosts.items() if circuit.times_opened
+            }
+
+
+if __name__ == '__main__':
+    print("[*] CircuitBreaker Test Suite")
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=0.2, max_recovery_timeout=1.0)
+
+    print("\n--- Host goes down ---")
+    for i in range(3):
+        allowed = breaker.allow('down.test', 'sqli')
+        opened = breaker.record_failure('down.test')
+        print(f"  probe {i}: allowed={allowed} opened={opened} state={breaker.state('down.test')}")
+    print(f"  Queued probes while open: {[breaker.allow('down.test', 'sqli') for _ in range(5)]}")
+
+    print("\n--- Half-open probe fails, backoff doubles ---")
+    time.sleep(0.25)
+    print(f"  Probe allowed: {breaker.allow('down.test', 'xss')}, concurrent request allowed: {breaker.allow('down.test', 'xss')}")
+    breaker.record_failure('down.test')
+    print(f"  State: {breaker.state('down.test')}, allowed after 0.25s: ", end='')
+    time.sleep(0.25)
+    print(breaker.allow('down.test', 'xss')) # Recovery timeout is now 0.4s
+
+    print("\n--- Host recovers ---")
+    time.sleep(0.2)
+    print(f"  Probe allowed: {breaker.allow('down.test', 'xss')}")
+    print(f"  Recovered: {breaker.record_success('down.test')}, state: {breaker.state('down.test')}")
+    print(f"  Other hosts unaffected: {breaker.allow('up.test', 'sqli')}")
+
+    print(f"\n[*] Report: {breaker.report()}")
+    print("\n[*] CircuitBreaker Test Suite Finished.")
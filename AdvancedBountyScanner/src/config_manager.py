@@ -1,7 +1,77 @@
 import yaml
 import os
+import signal
+import threading
 import json # For json.dump in example, though main lib is YAML
 
+from progress import get_logger
+
+logger = get_logger('config_manager')
+
+# Settings that can be changed while a scan is running (see ConfigManager.watch()).
+# name -> (accepted types, minimum value)
+RELOADABLE_SCHEMA = {
+    'rate_limit': ((int, float), 0),
+    'max_concurrent_requests': (int, 1),
+    'timeout': ((int, float), 0.1),
+}
+PROFILE_LAYERS = ('modules', 'hosts') # profiles.<layer>.<module name | host or host pattern>
+
+
+def _check_value(name, value, types, minimum):
+    # bool is an int subclass, but 'timeout: yes' is a typo, not a number
+    if isinstance(value, bool) or not isinstance(value, types):
+        return f"{name}: expected a number, got {value!r}"
+    if value < minimum:
+        return f"{name}: must be >= {minimum}, got {value!r}"
+    return None
+
+
+def validate_reloadable_settings(settings):
+    """
+    Checks the hot-reloadable part of a configuration dictionary.
+
+    Args:
+        settings (dict): Parsed configuration (only the reloadable keys are inspected).
+
+    Returns:
+        list: Error messages; empty if the settings are valid.
+    """
+    errors = []
+    for name, (types, minimum) in RELOADABLE_SCHEMA.items():
+        if name in settings:
+            error = _check_value(name, settings[name], types, minimum)
+            if error:
+                errors.append(error)
+
+    profiles = settings.get('profiles')
+    if profiles is not None:
+        if not isinstance(profiles, dict):
+            errors.append(f"profiles: expected a mapping, got {profiles!r}")
+            profiles = {}
+        for layer, entries in profiles.items():
+            if layer not in PROFILE_LAYERS:
+                errors.append(f"profiles.{layer}: unknown layer (expected one of {', '.join(PROFILE_LAYERS)})")
+                continue
+            if entries is None:
+                continue
+            if not isinstance(entries, dict):
+                errors.append(f"profiles.{layer}: expected a mapping of name -> limits, got {entries!r}")
+                continue
+            for name, limits in entries.items():
+                if not isinstance(limits, dict):
+                    errors.append(f"profiles.{layer}.{name}: expected a mapping, got {limits!r}")
+                    continue
+                for key, value in limits.items():
+                    if key not in RELOADABLE_SCHEMA:
+                        errors.append(f"profiles.{layer}.{name}.{key}: unknown setting")
+                        continue
+                    error = _check_value(f"profiles.{layer}.{name}.{key}", value, *RELOADABLE_SCHEMA[key])
+                    if error:
+                        errors.append(error)
+    return errors
+
+
 class ConfigManager:
     """
     Manages configuration settings for the Advanced Bounty Scanner.
@@ -15,6 +85,13 @@ class ConfigManager:
             default_config_path (str, optional): Path to a default YAML configuration file.
         """
         self.settings = {}
+        self.config_path = None
+        self._reload_listeners = []
+        self._reload_lock = threading.Lock()
+        self._file_reloadable = {} # Reloadable values as last read from the file
+        self._watch_thread = None
+        self._reload_requested = threading.Event()
+        self._stop_watching = threading.Event()
         self._load_default_settings()
 
         if default_config_path:
@@ -35,16 +112,106 @@ class ConfigManager:
             },
             'rate_limit': 0,  # requests per second (0 = no limit)
             'max_concurrent_requests': 5,
+            'profiles': { # Layered limits: global < module < host; see ProfileResolver
+                'modules': {}, # module name ('crawl', 'sqli', 'xss') -> {'rate_limit', 'max_concurrent_requests', 'timeout'}
+                'hosts': {}, # hostname or pattern ('*.cdn.example.com') -> same keys
+            },
             'wordlists': { # Default paths for various wordlists, relative to a base 'wordlists' dir
                 'subdomains': 'subdomains_default.txt',
                 'directories': 'directories_default.txt',
                 'passwords': 'passwords_default.txt',
             },
-            'output_directory': 'results' # Default directory for saving scan results
+            'output_directory': 'results', # Default directory for saving scan results
+            'url_dedup': { # Collapse URLs sharing scheme, host, path template and parameter names before scanning
+                'per_pattern': 1, # Representatives kept per pattern (0 disables dedup)
+                'backend': 'hashset', # 'hashset' (exact) or 'bloom' (fixed memory)
+                'capacity': 1000000, # Expected distinct patterns (bloom); patterns kept exactly, ~100 bytes each (hashset)
+                'error_rate': 0.001, # False-positive rate at capacity (bloom, and hashset beyond capacity)
+            },
+            'crawler': { # Used with --crawl to discover parameterized URLs from the targets
+                'max_depth': 2,
+                'max_pages': 500,
+                'max_page_bytes': 2 * 1024 * 1024, # Bytes of each page fed to the HTML parser
+                'scope_hosts': None, # None -> only the hosts of the seed URLs
+            },
+            'reporting': { # Streaming JSONL output (--output_file)
+                'flush_every': 50, # Flush after this many findings...
+                'flush_interval': 1.0, # ...or at least this often (seconds)
+                'fsync': 'interval', # 'never', 'interval' or 'always'
+                'fsync_interval': 5.0, # Seconds between fsyncs with the 'interval' policy
+                'compress': None, # True/False, or None to gzip only when the file name ends in .gz
+                'append': False, # Add to an existing --output_file instead of replacing it
+            },
+            'aggregation': { # Collapses findings per (host, path template, parameter, type) for reports
+                'max_payload_samples': 5,
+                'spill_threshold': 10000, # Distinct issues kept in memory before spilling to disk
+                'spill_directory': None, # None -> system temp directory
+            },
+            'analysis': { # Response body matching (SQL error signatures, reflected XSS markers)
+                'workers': None, # Analysis processes; None -> CPU count - 1, 0 -> match in the scan threads
+                'inline_threshold': 64 * 1024, # Bodies up to this size are matched in the scan thread
+                'shared_memory_threshold': 1024 * 1024, # Larger bodies reach the workers via shared memory
+            },
+            'triage': { # Checks before a scanner reads a response body
+                'max_body_bytes': 2 * 1024 * 1024, # Bytes of a body analyzed at most
+                'oversized': 'truncate', # 'truncate' to max_body_bytes or 'skip' larger bodies
+                'skip_content_types': None, # Content-Type prefixes never analyzed; None -> images, media, fonts, archives, ...
+                'check_magic': True, # Drop bodies starting with a binary file signature despite their Content-Type
+            },
+            'circuit_breaker': { # Stops probing hosts that no longer answer
+                'enabled': True,
+                'failure_threshold': 5, # Consecutive connection errors/timeouts that open a host's circuit
+                'recovery_timeout': 30.0, # Seconds before a half-open health probe is sent
+                'max_recovery_timeout': 300.0, # Upper bound while failed probes keep doubling the wait
+            },
+            'dns_cache': { # Host lookups of every connection; see DNSCache
+                'enabled': True,
+                'path': None, # SQLite file shared across runs (--dns_cache_db); None -> in memory for this run
+                'min_ttl': 30, # Seconds positive answers are kept at least...
+                'max_ttl': 86400, # ...and at most
+                'negative_ttl': 300, # Seconds names that do not resolve are kept at most
+                'default_ttl': 300, # Seconds answers of the system resolver (which reports no TTL) are kept
+            },
+            'budgets': { # Time-boxed runs: 'seconds', 'requests' and 'bytes' (None = unlimited); see ScanBudget
+                'run': {'seconds': None, 'requests': None, 'bytes': None}, # Whole run (--max_time/--max_requests/--max_bytes)
+                'per_host': {'seconds': None, 'requests': None, 'bytes': None}, # Applied to every host separately
+                'per_module': {}, # module name ('crawl', 'sqli', 'xss') -> same keys
+            },
+            'hot_reload': { # --watch_config: apply edits of the config file while scanning
+                'poll_interval': 2.0, # Seconds between config file mtime checks (SIGHUP reloads immediately)
+                'max_workers': None, # Scan threads started; max_concurrent_requests can be raised up to this (None -> 2x)
+            },
+            'profiling': { # --profile: per-phase (sqli, xss) profiles written below the output directory
+                'mode': 'cprofile', # 'cprofile' (deterministic) or 'sample' (stack sampling, lower overhead)
+                'top_n': 25, # Entries per phase in summary.txt
+                'sample_interval': 0.005, # Seconds between stack samples in 'sample' mode
+                'trace_memory': True, # tracemalloc snapshots at phase boundaries
+                'memory_frames': 1, # Frames stored per traced allocation
+            },
+            'progress': { # Live status output while scanning
+                'enabled': True,
+                'refresh_interval': 1.0, # Seconds between status line redraws on a terminal
+                'machine_interval': 10.0, # Seconds between JSON progress lines when output is not a terminal
+                'log_level': 'INFO', # DEBUG also logs every scanned URL and HTTP error
+                'log_buffer': 500, # Log records buffered before they are written out
+            }
         }
         # Ensure internal structure is copied if it's a mutable type like dict
         self.settings['headers'] = self.settings['headers'].copy()
+        self.settings['profiles'] = {layer: dict(entries) for layer, entries in self.settings['profiles'].items()}
+        self.settings['budgets'] = {scope: dict(limits) for scope, limits in self.settings['budgets'].items()}
+        self.settings['hot_reload'] = self.settings['hot_reload'].copy()
+        self.settings['circuit_breaker'] = self.settings['circuit_breaker'].copy()
+        self.settings['dns_cache'] = self.settings['dns_cache'].copy()
+        self.settings['analysis'] = self.settings['analysis'].copy()
+        self.settings['triage'] = self.settings['triage'].copy()
         self.settings['wordlists'] = self.settings['wordlists'].copy()
+        self.settings['url_dedup'] = self.settings['url_dedup'].copy()
+        self.settings['crawler'] = self.settings['crawler'].copy()
+        self.settings['reporting'] = self.settings['reporting'].copy()
+        self.settings['aggregation'] = self.settings['aggregation'].copy()
+        self.settings['profiling'] = self.settings['profiling'].copy()
+        self.settings['progress'] = self.settings['progress'].copy()
 
 
     def load_from_file(self, file_path):
@@ -69,10 +236,13 @@ class ConfigManager:
                 # Deep merge file_config into self.settings
                 # A simple self.settings.update(file_config) would overwrite nested dicts entirely.
                 self._deep_update(self.settings, file_config)
+                self.config_path = file_path
+                self._file_reloadable = {k: file_config[k] for k in self.RELOADABLE_KEYS if k in file_config}
                 print(f"[ConfigManager] Configuration loaded successfully from {file_path}")
                 return True
             else:
                 print(f"[ConfigManager] Warning: Configuration file {file_path} is empty.")
+                self.config_path = file_path
                 return True # Technically successful load of an empty file
         except yaml.YAMLError as e:
             print(f"[ConfigManager] Error parsing YAML configuration file {file_path}: {e}")
@@ -81,6 +251,103 @@ class ConfigManager:
             print(f"[ConfigManager] An unexpected error occurred while loading {file_path}: {e}")
             return False
 
+    RELOADABLE_KEYS = tuple(RELOADABLE_SCHEMA) + ('profiles',)
+
+    def add_reload_listener(self, callback):
+        """
+        Registers a callback for hot reloads.
+
+        Args:
+            callback (callable): Called with a dict of the changed reloadable settings
+                                 after they have been applied to this ConfigManager.
+        """
+        self._reload_listeners.append(callback)
+
+    def reload(self):
+        """
+        Re-reads the configuration file and applies changed reloadable settings.
+
+        Only RELOADABLE_KEYS are considered, and only those whose value in the file
+        changed since it was last read, so CLI overrides of untouched keys survive.
+        The new values are validated first; an unreadable or invalid file is
+        reported and the running configuration is kept unchanged.
+
+        Returns:
+            dict or None: The applied changes, or None if the file was rejected.
+        """
+        if not self.config_path:
+            return None
+        try:
+            with open(self.config_path, 'r') as f:
+                file_config = yaml.safe_load(f) or {}
+        except (OSError, yaml.YAMLError) as e:
+            logger.warning(f"Config reload skipped, cannot read {self.config_path}: {e}")
+            return None
+        if not isinstance(file_config, dict):
+            logger.warning(f"Config reload skipped, {self.config_path} is not a mapping.")
+            return None
+
+        errors = validate_reloadable_settings(file_config)
+        if errors:
+            logger.warning(f"Config reload rejected ({self.config_path}): {'; '.join(errors)}")
+            return None
+
+        with self._reload_lock:
+            changes = {k: file_config[k] for k in self.RELOADABLE_KEYS
+                       if k in file_config and file_config[k] != self._file_reloadable.get(k)}
+            if not changes:
+                return changes
+            for key, value in changes.items():
+                self.settings[key] = value if key != 'profiles' else {layer: dict(value.get(layer) or {}) for layer in PROFILE_LAYERS}
+            self._file_reloadable.update(changes)
+            for callback in self._reload_listeners:
+                try:
+                    callback(changes)
+                except Exception as e:
+                    logger.error(f"Config reload listener failed: {e}")
+        logger.warning(f"Configuration reloaded from {self.config_path}: {', '.join(f'{k}={v}' for k, v in changes.items())}")
+        return changes
+
+    def watch(self, poll_interval=2.0):
+        """
+        Reloads the configuration file whenever its mtime changes or SIGHUP is received.
+
+        Runs in a daemon thread; the SIGHUP handler only wakes that thread up, so no
+        file I/O happens inside the signal handler.
+        """
+        if not self.config_path or self._watch_thread is not None:
+            return
+        if hasattr(signal, 'SIGHUP') and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGHUP, lambda signum, frame: self._reload_requested.set())
+
+        def watch_loop():
+            try:
+                last_mtime = os.stat(self.config_path).st_mtime
+            except OSError:
+                last_mtime = None
+            while not self._stop_watching.is_set():
+                requested = self._reload_requested.wait(poll_interval)
+                self._reload_requested.clear()
+                if self._stop_watching.is_set():
+                    break
+                try:
+                    mtime = os.stat(self.config_path).st_mtime
+                except OSError:
+                    continue # File is being replaced; try again on the next poll
+                if requested or mtime != last_mtime:
+                    last_mtime = mtime
+                    self.reload()
+
+        self._watch_thread = threading.Thread(target=watch_loop, name='config-watch', daemon=True)
+        self._watch_thread.start()
+
+    def stop_watching(self):
+        if self._watch_thread is not None:
+            self._stop_watching.set()
+            self._reload_requested.set()
+            self._watch_thread.join()
+            self._watch_thread = None
+
     def _deep_update(self, base_dict, update_dict):
         """Helper function to recursively update a dictionary."""
         for key, value in update_dict.items():
@@ -282,6 +549,29 @@ if __name__ == '__main__':
     print(f"User-Agent after loading malformed file: {cm_malformed_file.get_setting('user_agent')}") # Should be default
     os.remove(malformed_yaml_path)
 
+    # --- Test 10: Hot reload of runtime limits ---
+    print("\n--- Test 10: Hot Reload ---")
+    cm_reload = ConfigManager(default_config_path=temp_config_file_path)
+    cm_reload.update_setting('rate_limit', 3) # CLI-style override, not in the file
+    cm_reload.add_reload_listener(lambda changes: print(f"  Listener received: {changes}"))
+
+    dummy_config_data['timeout'] = 45
+    dummy_config_data['profiles'] = {'hosts': {'fragile.test': {'max_concurrent_requests': 1}}}
+    with open(temp_config_file_path, 'w') as f:
+        yaml.dump(dummy_config_data, f)
+    print(f"Applied changes: {cm_reload.reload()}")
+    print(f"Timeout after reload: {cm_reload.get_setting('timeout')}") # 45
+    print(f"Rate limit after reload (CLI override kept): {cm_reload.get_setting('rate_limit')}") # 3
+    print(f"Profile for fragile.test: {cm_reload.get_setting('profiles.hosts').get('fragile.test')}")
+
+    dummy_config_data['timeout'] = 'fast' # Typo: must be rejected
+    dummy_config_data['max_concurrent_requests'] = 0
+    with open(temp_config_file_path, 'w') as f:
+        yaml.dump(dummy_config_data, f)
+    print(f"Validation errors: {validate_reloadable_settings(dummy_config_data)}")
+    print(f"Applied changes for invalid file: {cm_reload.reload()}") # None
+    print(f"Timeout after rejected reload: {cm_reload.get_setting('timeout')}") # still 45
+
     # --- Clean up dummy config file ---
     if os.path.exists(temp_config_file_path):
         os.remove(temp_config_file_path)
@@ -1,11 +1,17 @@
+import contextlib
 import requests
 import json # For example usage
+from urllib.parse import urlparse
+
+from progress import get_logger
+
+logger = get_logger('core_engine')
 
 class CoreEngine:
     """
     Core engine for making HTTP requests with persistent sessions and default configurations.
     """
-    def __init__(self, default_headers=None, proxy=None, timeout=10):
+    def __init__(self, default_headers=None, proxy=None, timeout=10, rate_limiter=None, pool_size=None, progress=None, throttle=None, circuit_breaker=None, budget=None):
         """
         Initializes the CoreEngine.
 
@@ -13,11 +19,32 @@ class CoreEngine:
             default_headers (dict, optional): Default headers to be sent with every request.
             proxy (dict, optional): Proxy configuration (e.g., {'http': '...', 'https': '...'}).
             timeout (int, optional): Default timeout in seconds for requests.
+            rate_limiter (object, optional): Any object with a wait(host) method. Called before
+                                             every request so limits can be enforced outside this process.
+            pool_size (int, optional): Connections kept per host. Should be at least the number of
+                                       threads sharing this engine (requests defaults to 10).
+            progress (ProgressTracker, optional): Receives per-module counts of queued, in-flight,
+                                                  completed and failed requests.
+            throttle (Throttle, optional): Local rate/concurrency limits and timeouts per host and
+                                           module profile. Its limits can be changed while requests are running.
+            circuit_breaker (CircuitBreaker, optional): Fails requests to hosts that stopped answering
+                                                        fast instead of waiting for each timeout.
+            budget (ScanBudget, optional): Time/request/byte budgets; requests are refused once one is spent.
         """
         self.session = requests.Session()
         self.default_headers = default_headers if default_headers else {}
         self.proxies = proxy # requests uses 'proxies' argument
         self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.progress = progress
+        self.throttle = throttle
+        self.circuit_breaker = circuit_breaker
+        self.budget = budget
+
+        if pool_size:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
 
         # Apply default headers to the session
         if self.default_headers:
@@ -27,7 +54,12 @@ class CoreEngine:
         if self.proxies:
             self.session.proxies.update(self.proxies)
 
-    def make_request(self, url, method='GET', headers=None, params=None, data=None, json_payload=None, allow_redirects=True, **kwargs):
+    def expect_requests(self, module, count):
+        """Announces `count` upcoming requests of a module to the progress tracker (if any)."""
+        if self.progress is not None:
+            self.progress.add_queued(module, count)
+
+    def make_request(self, url, method='GET', headers=None, params=None, data=None, json_payload=None, allow_redirects=True, module=None, **kwargs):
         """
         Makes an HTTP request.
 
@@ -39,49 +71,120 @@ class CoreEngine:
             data (dict or bytes, optional): Data to send in the body (form-encoded for dicts).
             json_payload (dict, optional): JSON data to send in the body. 'data' will be ignored if this is set.
             allow_redirects (bool, optional): Whether to follow redirects. Defaults to True.
+            module (str, optional): Name of the calling module, used for progress accounting.
             **kwargs: Other keyword arguments supported by requests.request (e.g., files, auth).
 
         Returns:
             requests.Response: The Response object if the request is successful.
-            None: If a request exception occurs.
+            None: If a request exception occurs, the host's circuit breaker is open or a budget is spent.
         """
         # Prepare headers: start with session defaults, then update with method-specific defaults, then request-specific
         request_headers = self.session.headers.copy() # Start with session's base headers
         if headers:
             request_headers.update(headers)
 
+        hostname = urlparse(url).hostname
+        breaker = self.circuit_breaker
+        if breaker is not None and not breaker.allow(hostname, module):
+            logger.debug(f"Circuit open for {hostname}, skipping {method} {url}")
+            if self.progress is not None and module is not None:
+                self.progress.skip(module)
+            return None
+        budget = self.budget
+        if budget is not None and not budget.allow(hostname, module):
+            logger.debug(f"Budget spent, skipping {method} {url}")
+            if breaker is not None:
+                breaker.release_probe(hostname)
+            if self.progress is not None and module is not None:
+                self.progress.skip(module)
+            return None
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(hostname)
+
+        timeout = kwargs.pop('timeout', None) # Request-specific timeout, else the host/module profile
+        tracked = self.progress is not None and module is not None
+        started = False # progress.finish() only balances a progress.start() that happened
+        response = None
         try:
-            response = self.session.request(
-                method=method.upper(),
-                url=url,
-                headers=request_headers,
-                params=params,
-                data=data,
-                json=json_payload, # requests uses 'json' argument for json_payload
-                timeout=kwargs.pop('timeout', self.timeout), # Use request-specific timeout or default
-                proxies=kwargs.pop('proxies', self.session.proxies), # Use request-specific proxies or default
-                allow_redirects=allow_redirects,
-                **kwargs
-            )
+            if self.throttle is not None:
+                limits = self.throttle.limits(hostname, module)
+                if timeout is None:
+                    timeout = limits.timeout
+                slot = self.throttle.slot(hostname, module, limits)
+            else:
+                slot = contextlib.nullcontext()
+            if timeout is None:
+                timeout = self.timeout
+            with slot:
+                if tracked:
+                    self.progress.start(module)
+                    started = True
+                response = self.session.request(
+                    method=method.upper(),
+                    url=url,
+                    headers=request_headers,
+                    params=params,
+                    data=data,
+                    json=json_payload, # requests uses 'json' argument for json_payload
+                    timeout=timeout,
+                    proxies=kwargs.pop('proxies', self.session.proxies), # Use request-specific proxies or default
+                    allow_redirects=allow_redirects,
+                    **kwargs
+                )
+            if budget is not None:
+                if kwargs.get('stream'): # Not read yet: count the bytes as the caller reads them
+                    self._count_streamed_bytes(response, hostname, module)
+                else:
+                    budget.record_bytes(hostname, module, len(response.content))
+            if breaker is not None and breaker.record_success(hostname):
+                logger.warning(f"Host {hostname} is answering again, circuit closed.")
             response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
             return response
         except requests.exceptions.HTTPError as e:
             # This is for 4xx/5xx responses. We still return the response object
             # as it might contain useful information (e.g. error messages in JSON).
-            print(f"[CoreEngine] HTTP Error for {method} {url}: {e}")
-            return e.response
-        except requests.exceptions.Timeout:
-            print(f"[CoreEngine] Timeout for {method} {url}")
-            return None
-        except requests.exceptions.ConnectionError:
-            print(f"[CoreEngine] Connection error for {method} {url}")
+            logger.debug(f"HTTP Error for {method} {url}: {e}")
+            response = e.response
+            return response
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            kind = 'Timeout' if isinstance(e, requests.exceptions.Timeout) else 'Connection error'
+            logger.debug(f"{kind} for {method} {url}")
+            if breaker is not None and breaker.record_failure(hostname):
+                logger.warning(f"Host {hostname} stopped answering ({kind.lower()}), circuit opened; "
+                               f"its requests fail fast until a health probe succeeds.")
             return None
         except requests.exceptions.RequestException as e:
-            print(f"[CoreEngine] Request exception for {method} {url}: {e}")
+            logger.warning(f"Request exception for {method} {url}: {e}")
+            if breaker is not None:
+                breaker.release_probe(hostname)
             return None
         except Exception as e:
-            print(f"[CoreEngine] An unexpected error occurred for {method} {url}: {e}")
+            logger.error(f"An unexpected error occurred for {method} {url}: {e}")
+            if breaker is not None:
+                breaker.release_probe(hostname)
             return None
+        finally:
+            if started:
+                self.progress.finish(module, error=response is None)
+            elif tracked: # Never sent (no throttle slot)
+                self.progress.skip(module)
+
+    def _count_streamed_bytes(self, response, hostname, module):
+        """
+        Records the body bytes of a streamed response in the budget as they are read.
+
+        Content-Length is not used: it is missing for chunked bodies and the body may not
+        match it. iter_content is wrapped on the instance, so reads through .content and
+        .text are counted too; bytes the caller never reads are not.
+        """
+        budget = self.budget
+        iter_content = response.iter_content
+
+        def counted_iter_content(*args, **kwargs):
+            for chunk in iter_content(*args, **kwargs):
+                budget.record_bytes(hostname, module, len(chunk))
+                yield chunk
+        response.iter_content = counted_iter_content
 
     def is_successful_response(self, response, success_codes=None):
         """
@@ -118,6 +221,9 @@ class CoreEngine:
 
 
 if __name__ == '__main__':
+    from progress import configure_logging
+    configure_logging('DEBUG', buffer_capacity=1)
+
     print("[*] CoreEngine Test Suite")
 
     # Initialize engine with default User-Agent
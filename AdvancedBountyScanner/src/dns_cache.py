@@ -0,0 +1,327 @@
+import collections
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from progress import get_logger
+
+logger = get_logger('dns_cache')
+
+# The resolver functions of the socket module at import time; install() replaces the module attributes.
+_system_getaddrinfo = socket.getaddrinfo
+_system_gethostbyname = socket.gethostbyname
+
+_NEGATIVE_ERRNOS = (socket.EAI_NONAME, getattr(socket, 'EAI_NODATA', socket.EAI_NONAME))
+
+NOERROR, NXDOMAIN = 0, 3
+
+
+class CachedAnswer(collections.namedtuple('CachedAnswer', 'name rcode addresses cnames ttl')):
+    """A cached lookup; ttl is the number of seconds it stays cached. No addresses = negative answer."""
+    __slots__ = ()
+
+
+def _is_ip(host):
+    for family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            socket.inet_pton(family, host.split('%', 1)[0])
+            return True
+        except OSError:
+            pass
+    return False
+
+
+# The dns_cache table is shared with bug_bounty_hunter/modules/dns_cache.py, which reads and
+# writes the same database file: keep SCHEMA identical in both modules, and bump SCHEMA_VERSION
+# in both when the table changes. The version is stored as the database's user_version.
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dns_cache (
+    name TEXT NOT NULL,
+    rdtype TEXT NOT NULL,
+    rcode INTEGER NOT NULL,
+    addresses TEXT NOT NULL,
+    cnames TEXT NOT NULL,
+    expires REAL NOT NULL,
+    PRIMARY KEY (name, rdtype)
+) WITHOUT ROWID
+"""
+_COLUMNS = ('name', 'rdtype', 'rcode', 'addresses', 'cnames', 'expires')
+
+
+def open_database(path):
+    """
+    Opens a DNS cache database, creating the table if needed, and checks its schema version.
+
+    Raises:
+        ValueError: The file holds a dns_cache table of another schema version or layout.
+    """
+    db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    try:
+        if path != ':memory:':
+            db.execute('PRAGMA journal_mode=WAL') # Concurrent runs and workers read while one writes
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute('PRAGMA busy_timeout=5000')
+        version = db.execute('PRAGMA user_version').fetchone()[0]
+        columns = tuple(row[1] for row in db.execute('PRAGMA table_info(dns_cache)'))
+        if version not in (0, SCHEMA_VERSION) or (columns and columns != _COLUMNS):
+            raise ValueError(f"{path}: dns_cache table has schema version {version} and columns {columns}; "
+                             f"this version of the cache needs version {SCHEMA_VERSION} with {_COLUMNS}")
+        db.execute(SCHEMA)
+        if version == 0: # A new file, or one written before versioning (same layout, checked above)
+            db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    except Exception:
+        db.close()
+        raise
+    return db
+
+
+class DNSCache:
+    """
+    TTL-aware DNS cache for CoreEngine's connections, optionally persisted in SQLite.
+
+    install() routes socket.getaddrinfo and socket.gethostbyname through the cache, so
+    every connection requests/urllib3 opens looks its host up here first: a name is
+    resolved once per TTL window rather than per connection, per engine or (with a
+    database file) per run. Negative answers are cached for `negative_ttl` seconds, so
+    dead hosts found by the crawler are not looked up again for every URL.
+
+    The system resolver reports no TTLs, so its answers are kept for `default_ttl`
+    seconds. Answers stored with a TTL (put()), such as those of bug_bounty_hunter's
+    subdomain scan sharing the same database file, keep theirs, clamped to
+    [min_ttl, max_ttl]. Transient failures (EAI_AGAIN) are never cached.
+    """
+
+    def __init__(self, path=':memory:', min_ttl=30, max_ttl=86400, negative_ttl=300, default_ttl=300):
+        """
+        Args:
+            path (str, optional): SQLite database file shared across runs; ':memory:' caches for this process only.
+            min_ttl (int, optional): Positive answers are kept at least this many seconds.
+            max_ttl (int, optional): ...and at most this many seconds.
+            negative_ttl (int, optional): Upper bound for keeping NXDOMAIN/no-data answers.
+            default_ttl (int, optional): Seconds answers of the system resolver are kept.
+        """
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.default_ttl = default_ttl
+        self.stats = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'stored': 0}
+        self._lock = threading.Lock()
+        self._memory = {} # (name, rdtype) -> (expires, rcode, addresses, cnames)
+        self._resolving = {} # name -> Event; concurrent misses of one name resolve it once
+        self._installed = False
+        self._db = open_database(path)
+        self.purge()
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Creates a DNSCache from the 'dns_cache' settings, or returns None when it is disabled."""
+        if not config_manager.get_setting('dns_cache.enabled', True):
+            return None
+        return cls(
+            path=config_manager.get_setting('dns_cache.path') or ':memory:',
+            min_ttl=config_manager.get_setting('dns_cache.min_ttl', 30),
+            max_ttl=config_manager.get_setting('dns_cache.max_ttl', 86400),
+            negative_ttl=config_manager.get_setting('dns_cache.negative_ttl', 300),
+            default_ttl=config_manager.get_setting('dns_cache.default_ttl', 300)
+        )
+
+    def close(self):
+        self.uninstall()
+        with self._lock:
+            self._db.close()
+
+    def purge(self):
+        """Deletes expired answers from the database; returns how many were deleted."""
+        with self._lock:
+            return self._db.execute('DELETE FROM dns_cache WHERE expires <= ?', (time.time(),)).rowcount
+
+    def get(self, name, rdtype='A'):
+        """Returns the CachedAnswer for a name, or None when it is not cached or expired."""
+        key = (name.rstrip('.').lower(), rdtype)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._db.execute(
+                    'SELECT expires, rcode, addresses, cnames FROM dns_cache WHERE name = ? AND rdtype = ? AND expires > ?',
+                    (key[0], rdtype, now)
+                ).fetchone()
+                if row is not None:
+                    entry = self._memory[key] = (row[0], row[1], tuple(json.loads(row[2])), tuple(json.loads(row[3])))
+            if entry is None or entry[0] <= now:
+                self._memory.pop(key, None)
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits' if entry[2] else 'negative_hits'] += 1
+        expires, rcode, addresses, cnames = entry
+        return CachedAnswer(key[0], rcode, addresses, cnames, int(expires - now))
+
+    def put(self, name, addresses, rdtype='A', ttl=None, rcode=None, cnames=()):
+        """
+        Caches an answer. An empty `addresses` is a negative answer (rcode NXDOMAIN unless given).
+
+        ttl None means the default_ttl (positive) or negative_ttl (negative) is used.
+        """
+        addresses = tuple(addresses)
+        if addresses:
+            ttl = max(self.min_ttl, min(self.default_ttl if ttl is None else ttl, self.max_ttl))
+        else:
+            ttl = max(0, min(self.negative_ttl if ttl is None else ttl, self.negative_ttl))
+        if rcode is None:
+            rcode = NOERROR if addresses else NXDOMAIN
+        key = (name.rstrip('.').lower(), rdtype)
+        expires = time.time() + ttl
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO dns_cache (name, rdtype, rcode, addresses, cnames, expires) VALUES (?, ?, ?, ?, ?, ?)',
+                (key[0], rdtype, rcode, json.dumps(addresses), json.dumps(tuple(cnames)), expires)
+            )
+            self._memory[key] = (expires, rcode, addresses, tuple(cnames))
+            self.stats['stored'] += 1
+
+    def resolve(self, name):
+        """
+        Returns the IPv4 and IPv6 addresses of a name, from the cache or the system resolver.
+
+        Raises:
+            socket.gaierror: The name does not exist (cached as well) or resolution failed.
+        """
+        name = name.rstrip('.').lower()
+        while True:
+            addresses = self._cached_addresses(name)
+            if addresses is not None:
+                break
+            with self._lock:
+                pending = self._resolving.get(name)
+                if pending is None:
+                    self._resolving[name] = threading.Event()
+            if pending is not None:
+                pending.wait() # Another thread is resolving this name; use its answer
+                continue
+            try:
+                addresses = self._resolve_system(name)
+            finally:
+                with self._lock:
+                    self._resolving.pop(name).set()
+            break
+        if not addresses:
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        return addresses
+
+    def _cached_addresses(self, name):
+        a, aaaa = self.get(name, 'A'), self.get(name, 'AAAA')
+        if a is not None and (a.addresses or a.rcode == NXDOMAIN or aaaa is not None):
+            return a.addresses + (aaaa.addresses if aaaa is not None else ())
+        if aaaa is not None and aaaa.addresses:
+            return aaaa.addresses
+        return None
+
+    def _resolve_system(self, name):
+        try:
+            infos = _system_getaddrinfo(name, None, 0, socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            if e.errno in _NEGATIVE_ERRNOS:
+                rcode = NXDOMAIN if e.errno == socket.EAI_NONAME else NOERROR
+                self.put(name, (), 'A', rcode=rcode)
+                self.put(name, (), 'AAAA', rcode=rcode)
+                logger.debug(f"{name} does not resolve; cached for {self.negative_ttl}s")
+            raise
+        ipv4 = tuple(dict.fromkeys(info[4][0] for info in infos if info[0] == socket.AF_INET))
+        ipv6 = tuple(dict.fromkeys(info[4][0] for info in infos if info[0] == socket.AF_INET6))
+        self.put(name, ipv4, 'A', rcode=NOERROR)
+        self.put(name, ipv6, 'AAAA', rcode=NOERROR)
+        return ipv4 + ipv6
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        """Drop-in replacement for socket.getaddrinfo that resolves host names through the cache."""
+        name = host.decode('idna') if isinstance(host, bytes) else host
+        if not name or flags & socket.AI_NUMERICHOST or _is_ip(name):
+            return _system_getaddrinfo(host, port, family, type, proto, flags)
+        addresses = self.resolve(name)
+        if family == socket.AF_INET:
+            addresses = [address for address in addresses if ':' not in address]
+        elif family == socket.AF_INET6:
+            addresses = [address for address in addresses if ':' in address]
+        if not addresses:
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        results = []
+        for address in addresses:
+            results.extend(_system_getaddrinfo(address, port, family, type, proto, flags | socket.AI_NUMERICHOST))
+        return results
+
+    def gethostbyname(self, host):
+        """Drop-in replacement for socket.gethostbyname that resolves through the cache."""
+        if _is_ip(host):
+            return _system_gethostbyname(host)
+        ipv4 = [address for address in self.resolve(host) if ':' not in address]
+        if not ipv4:
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        return ipv4[0]
+
+    def install(self):
+        """Routes socket.getaddrinfo and socket.gethostbyname through this cache (process-wide, idempotent)."""
+        socket.getaddrinfo = self.getaddrinfo
+        socket.gethostbyname = self.gethostbyname
+        self._installed = True
+        return self
+
+    def uninstall(self):
+        """Restores the system resolver functions if this cache installed itself."""
+        if self._installed:
+            socket.getaddrinfo = _system_getaddrinfo
+            socket.gethostbyname = _system_gethostbyname
+            self._installed = False
+
+    def report(self):
+        """Returns the hit/miss counters and the number of cached entries."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = self._db.execute('SELECT COUNT(*) FROM dns_cache').fetchone()[0]
+        return stats
+
+
+if __name__ == '__main__':
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("[*] DNSCache Test Suite")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'dns.sqlite')
+        cache = DNSCache(path, min_ttl=1, negative_ttl=60)
+        cache.put('www.example.test', ['10.0.0.1'], ttl=300)
+        cache.put('short.example.test', ['10.0.0.2'], ttl=1)
+        cache.put('gone.example.test', [], ttl=3600) # Negative TTL capped at 60s
+        cache.close()
+
+        cache = DNSCache(path, min_ttl=1).install() # A later run
+        for name in ('www.example.test', 'gone.example.test', 'unknown.example.test'):
+            print(f"  get({name}) -> {cache.get(name)}")
+        time.sleep(1.1)
+        print(f"  get(short.example.test) after its TTL -> {cache.get('short.example.test')}")
+        print(f"  socket.getaddrinfo('www.example.test', 80)[0] -> {socket.getaddrinfo('www.example.test', 80)[0]}")
+        try:
+            socket.gethostbyname('gone.example.test')
+        except socket.gaierror as e:
+            print(f"  socket.gethostbyname('gone.example.test') -> gaierror {e}")
+
+        with ThreadPoolExecutor(8) as pool: # One system lookup for 8 concurrent misses
+            results = set(pool.map(lambda _: socket.gethostbyname('localhost'), range(8)))
+        print(f"  8 threads resolving localhost -> {results}, {cache.get('localhost', 'A')}")
+        cache.close()
+        print(f"  socket.getaddrinfo restored: {socket.getaddrinfo is _system_getaddrinfo}")
+        print(f"  Report: {cache.stats}")
+
+        with sqlite3.connect(path) as db: # As if written by a later, incompatible version
+            db.execute(f'PRAGMA user_version = {SCHEMA_VERSION + 1}')
+        try:
+            DNSCache(path)
+        except ValueError as e:
+            print(f"  Newer schema -> ValueError: {e}")
+    print("\n[*] DNSCache Test Suite Finished.")
@@ -0,0 +1,212 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from urllib.parse import urlparse
+
+from url_dedup import path_template
+
+
+def evidence_score(finding):
+    """
+    Ranks how convincing a single finding is; the highest-scoring hit of a group is kept as 'best'.
+
+    Order of preference: a 2xx response, a payload carrying markup/quotes that survived
+    (stronger proof than a bare marker), then the more specific (longer) evidence string.
+    """
+    status = finding.get('response_status')
+    status_ok = 1 if isinstance(status, int) and 200 <= status < 300 else 0
+    payload = str(finding.get('payload', ''))
+    has_markup = 1 if any(c in payload for c in '<>"\'') else 0
+    return (status_ok, has_markup, len(str(finding.get('evidence', ''))))
+
+
+def _compact(finding):
+    """The fields of a finding worth keeping as first/best evidence."""
+    return {k: finding.get(k) for k in ('url', 'payload', 'evidence', 'response_status') if k in finding}
+
+
+class FindingAggregator:
+    """
+    Collapses raw findings into one record per distinct issue.
+
+    Findings are grouped on (host, path template, parameter, type). Each group keeps the
+    hit count, the first and best evidence and a bounded sample of payloads. Once more
+    than `spill_threshold` groups are held in memory they are merged into an on-disk
+    SQLite index, so memory stays bounded on very wide scans.
+    """
+
+    def __init__(self, max_payload_samples=5, spill_threshold=10000, spill_directory=None):
+        """
+        Args:
+            max_payload_samples (int, optional): Distinct payloads kept per group.
+            spill_threshold (int, optional): Groups kept in memory before spilling to disk.
+            spill_directory (str, optional): Where the spill database is created (default: system temp dir).
+        """
+        self.max_payload_samples = max_payload_samples
+        self.spill_threshold = spill_threshold
+        self.spill_directory = spill_directory
+        self.total_findings = 0
+        self._groups = {}
+        self._seq = 0 # Arrival order, so 'first' stays correct across spills
+        self._lock = threading.Lock()
+        self._spill_conn = None
+        self._spill_path = None
+
+    @staticmethod
+    def group_key(finding):
+        parsed = urlparse(finding.get('url', ''))
+        return (
+            (parsed.hostname or '').lower(),
+            path_template(parsed.path),
+            finding.get('parameter', ''),
+            finding.get('type', 'unknown'),
+        )
+
+    def add(self, finding):
+        """Adds a raw finding. Safe to call from several scanner threads."""
+        key = self.group_key(finding)
+        with self._lock:
+            self.total_findings += 1
+            self._seq += 1
+            group = self._groups.get(key)
+            if group is None:
+                self._groups[key] = {
+                    'count': 1,
+                    'first_seq': self._seq,
+                    'first': _compact(finding),
+                    'best': _compact(finding),
+                    'best_score': evidence_score(finding),
+                    'payload_samples': [finding.get('payload')],
+                }
+                if len(self._groups) > self.spill_threshold:
+                    self._spill()
+                return
+
+            group['count'] += 1
+            score = evidence_score(finding)
+            if score > group['best_score']:
+                group['best'] = _compact(finding)
+                group['best_score'] = score
+            payload = finding.get('payload')
+            if len(group['payload_samples']) < self.max_payload_samples and payload not in group['payload_samples']:
+                group['payload_samples'].append(payload)
+
+    # Scanners accept any callable as finding sink
+    __call__ = add
+
+    def _merge(self, older, newer):
+        """Merges two partial groups of the same key (older has the smaller first_seq)."""
+        merged = dict(older)
+        merged['count'] = older['count'] + newer['count']
+        if tuple(newer['best_score']) > tuple(older['best_score']):
+            merged['best'] = newer['best']
+            merged['best_score'] = newer['best_score']
+        samples = list(older['payload_samples'])
+        for payload in newer['payload_samples']:
+            if len(samples) >= self.max_payload_samples:
+                break
+            if payload not in samples:
+                samples.append(payload)
+        merged['payload_samples'] = samples
+        return merged
+
+    def _open_spill(self):
+        if self._spill_conn is None:
+            fd, self._spill_path = tempfile.mkstemp(prefix='abs_aggregates_', suffix='.db', dir=self.spill_directory)
+            os.close(fd)
+            self._spill_conn = sqlite3.connect(self._spill_path, check_same_thread=False)
+            self._spill_conn.execute("PRAGMA journal_mode=OFF")
+            self._spill_conn.execute("PRAGMA synchronous=OFF")
+            self._spill_conn.execute(
+                "CREATE TABLE groups (gkey TEXT PRIMARY KEY, first_seq INTEGER NOT NULL, data TEXT NOT NULL)"
+            )
+        return self._spill_conn
+
+    def _spill(self):
+        """Moves every in-memory group into the spill database, merging with what is already there."""
+        if not self._groups:
+            return
+        conn = self._open_spill()
+        for key, group in self._groups.items():
+            gkey = json.dumps(key)
+            row = conn.execute("SELECT data FROM groups WHERE gkey = ?", (gkey,)).fetchone()
+            if row:
+                on_disk = json.loads(row[0])
+                group = self._merge(on_disk, group) if on_disk['first_seq'] < group['first_seq'] else self._merge(group, on_disk)
+            conn.execute(
+                "INSERT OR REPLACE INTO groups (gkey, first_seq, data) VALUES (?, ?, ?)",
+                (gkey, group['first_seq'], json.dumps(group))
+            )
+        conn.commit()
+        self._groups = {}
+
+    def __len__(self):
+        with self._lock:
+            if self._spill_conn is not None:
+                self._spill()
+                return self._spill_conn.execute("SELECT COUNT(*) FROM groups").fetchone()[0]
+            return len(self._groups)
+
+    def aggregates(self):
+        """
+        Yields one report record per distinct issue, in order of first appearance.
+
+        Record fields: host, path_template, parameter, type, count, first, best, payload_samples.
+        """
+        with self._lock:
+            if self._spill_conn is not None:
+                self._spill()
+                items = ((tuple(json.loads(gkey)), json.loads(data)) for gkey, data in
+                         self._spill_conn.execute("SELECT gkey, data FROM groups ORDER BY first_seq"))
+            else:
+                items = sorted(self._groups.items(), key=lambda kv: kv[1]['first_seq'])
+
+            for (host, template, parameter, finding_type), group in items:
+                yield {
+                    'host': host,
+                    'path_template': template,
+                    'parameter': parameter,
+                    'type': finding_type,
+                    'count': group['count'],
+                    'first': group['first'],
+                    'best': group['best'],
+                    'payload_samples': group['payload_samples'],
+                }
+
+    def close(self):
+        """Removes the spill database, if one was created."""
+        if self._spill_conn is not None:
+            self._spill_conn.close()
+            self._spill_conn = None
+            os.remove(self._spill_path)
+
+
+if __name__ == '__main__':
+    print("[*] FindingAggregator Test Suite")
+
+    raw_findings = []
+    for item_id in range(1, 6):
+        for payload, status in (("'", 200), ("' OR '1'='1", 500), ("admin' --", 200)):
+            raw_findings.append({
+                'url': f"http://shop.test/item/{item_id}?id={item_id}{payload}",
+                'parameter': 'id', 'payload': payload, 'type': 'error-based',
+                'evidence': 'you have an error in your sql syntax', 'response_status': status,
+            })
+    raw_findings.append({
+        'url': "http://shop.test/search?q=JULES", 'parameter': 'q', 'payload': 'JULES',
+        'type': 'reflected-xss', 'evidence': "Payload found in response.", 'response_status': 200,
+    })
+
+    for threshold in (10000, 1):
+        aggregator = FindingAggregator(max_payload_samples=2, spill_threshold=threshold)
+        for finding in raw_findings:
+            aggregator.add(finding)
+        print(f"\n--- spill_threshold={threshold}: {aggregator.total_findings} raw findings -> {len(aggregator)} issues ---")
+        for record in aggregator.aggregates():
+            print(f"  {record['type']} {record['host']}{record['path_template']} [{record['parameter']}] "
+                  f"x{record['count']} samples={record['payload_samples']} best={record['best']['payload']!r}")
+        aggregator.close()
+
+    print("\n[*] FindingAggregator Test Suite Finished.")
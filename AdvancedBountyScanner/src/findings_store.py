@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Persistent, indexed findings database with cross-run diffing.
+
+Stores results of AdvancedBountyScanner (JSON Lines, raw or aggregated) and of
+bug_bounty_hunter's bug_bounty_tool.py (one JSON document per run). Every stored
+row carries a fingerprint that identifies the issue independently of payloads and
+timestamps, so two runs can be compared with indexed set operations.
+
+Usage:
+    python3 src/findings_store.py findings.db ingest-scan results/raw.jsonl --label weekly
+    python3 src/findings_store.py findings.db ingest-recon ../bug_bounty_hunter/reports/run.json
+    python3 src/findings_store.py findings.db runs
+    python3 src/findings_store.py findings.db diff 3 7 --show 20
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from urllib.parse import urlparse
+
+from url_dedup import path_template
+
+
+BATCH_SIZE = 10000
+
+
+def fingerprint(*parts):
+    """Stable fingerprint of an issue from its identifying parts."""
+    return hashlib.sha1('\x1f'.join(str(p) for p in parts).encode('utf-8')).hexdigest()
+
+
+def scan_finding_row(record):
+    """
+    Converts an AdvancedBountyScanner finding (raw or aggregated) into (target, type, fingerprint, data).
+
+    Raw findings and aggregate records of the same issue get the same fingerprint.
+    """
+    if 'path_template' in record: # Aggregate record from FindingAggregator
+        host, template = record.get('host', ''), record.get('path_template', '')
+    else:
+        parsed = urlparse(record.get('url', ''))
+        host, template = (parsed.hostname or '').lower(), path_template(parsed.path)
+    finding_type = record.get('type', 'unknown')
+    return host, finding_type, fingerprint('scan', finding_type, host, template, record.get('parameter', '')), record
+
+
+def _subdomain_results(results):
+    """
+    Subdomain scan results as dicts. --compact_report writes them as parallel columns
+    (SubdomainTable.compact(): 'subdomain', 'ip', and 'status'/'source' when needed).
+    """
+    if not isinstance(results, dict):
+        return results or []
+    names = results.get('subdomain') or []
+    ips = results.get('ip') or [None] * len(names)
+    statuses = results.get('status') or ['found'] * len(names)
+    sources = results.get('source') or [None] * len(names)
+    rows = []
+    for subdomain, ip, status, source in zip(names, ips, statuses, sources):
+        row = {'subdomain': subdomain, 'ip': ip, 'status': status}
+        if source:
+            row['source'] = source
+        rows.append(row)
+    return rows
+
+
+def _port_results(results):
+    """
+    Port scan results as dicts. --compact_report writes PortTable.compact() instead: the
+    open ports, and 'errors', 'services' and 'banners' keyed by port; the IANA service
+    name of the full report is not part of it.
+    """
+    if not isinstance(results, dict):
+        return results or []
+    rows = []
+    for port in results.get('open') or ():
+        row = {'port': port, 'status': 'open'}
+        for key, field in (('services', 'service'), ('banners', 'banner')):
+            if str(port) in (results.get(key) or {}):
+                row[field] = results[key][str(port)]
+        rows.append(row)
+    for port, message in (results.get('errors') or {}).items():
+        rows.append({'port': int(port), 'status': 'error', 'error_message': message})
+    return rows
+
+
+def recon_rows(report):
+    """
+    Yields (target, type, fingerprint, data) rows from a bug_bounty_tool.py JSON report,
+    written with or without --compact_report.
+    """
+    sub = report.get('subdomain_scan') or {}
+    for res in _subdomain_results(sub.get('results')):
+        if res.get('status') == 'found':
+            yield sub.get('domain', ''), 'subdomain', fingerprint('subdomain', res['subdomain']), res
+
+    ports = report.get('port_scan') or {}
+    if 'hosts' in ports: # Several targets (--port_targets, --port_subdomains): results per host
+        port_tables = [(name or host.get('address', ''), host.get('results')) for name, host in ports['hosts'].items()]
+    else:
+        port_tables = [(ports.get('target', ''), ports.get('results'))]
+    for target, results in port_tables:
+        for res in _port_results(results):
+            if res.get('status') == 'open':
+                yield target, 'open-port', fingerprint('open-port', target, res.get('port')), res
+
+    dirs = report.get('directory_bruteforce') or {}
+    for res in dirs.get('results') or []:
+        if res.get('status_code') is not None:
+            target = urlparse(res.get('url', '')).hostname or dirs.get('target_url', '')
+            yield target, 'path', fingerprint('path', res['url'], res['status_code']), res
+
+    wayback = report.get('wayback_urls_scan') or {}
+    for url in wayback.get('urls') or []:
+        yield wayback.get('domain', ''), 'wayback-url', fingerprint('wayback-url', url), {'url': url}
+
+    headers = report.get('header_analysis') or {}
+    header_target = urlparse(headers.get('url') or headers.get('final_url') or '').hostname or ''
+    for name, status in (headers.get('security_headers_status') or {}).items():
+        if status == "Not Present":
+            yield header_target, 'missing-header', fingerprint('missing-header', header_target, name), {'header': name}
+
+    robots = report.get('robots_sitemap_analysis') or {}
+    robots_target = urlparse(robots.get('robots_txt_url') or '').hostname or ''
+    for agent, rules in (robots.get('directives') or {}).items():
+        for path in rules.get('Disallow', []):
+            yield robots_target, 'robots-disallow', fingerprint('robots-disallow', robots_target, path), {'user_agent': agent, 'path': path}
+    for url in robots.get('sitemap_urls_parsed') or []:
+        yield robots_target, 'sitemap-url', fingerprint('sitemap-url', url), {'url': url}
+
+
+class FindingsStore:
+    """
+    SQLite findings database shared by both tools.
+
+    Tables:
+        runs(id, tool, source, label, created_at)
+        findings(run_id, target, type, fingerprint, hits, data)
+    Findings are unique per (run_id, fingerprint); repeated hits add to 'hits'.
+    """
+
+    def __init__(self, db_path):
+        """
+        Args:
+            db_path (str): Path to the database file (created if missing).
+        """
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id         INTEGER PRIMARY KEY AUTOINCREMENT,
+                tool       TEXT NOT NULL,
+                source     TEXT,
+                label      TEXT,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS findings (
+                run_id      INTEGER NOT NULL REFERENCES runs(id),
+                target      TEXT NOT NULL,
+                type        TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                hits        INTEGER NOT NULL DEFAULT 1,
+                data        TEXT NOT NULL,
+                PRIMARY KEY (run_id, fingerprint)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_findings_target ON findings (target, type);
+            CREATE INDEX IF NOT EXISTS idx_findings_type ON findings (type);
+            CREATE INDEX IF NOT EXISTS idx_findings_fingerprint ON findings (fingerprint);
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def create_run(self, tool, source=None, label=None):
+        """
+        Registers a new run.
+
+        Returns:
+            int: The run id.
+        """
+        cursor = self.conn.execute(
+            "INSERT INTO runs (tool, source, label, created_at) VALUES (?, ?, ?, ?)",
+            (tool, source, label, time.time())
+        )
+        self.conn.commit()
+        return cursor.lastrowid
+
+    def bulk_insert(self, run_id, rows):
+        """
+        Inserts (target, type, fingerprint, data[, hits]) rows in large transactions.
+
+        Args:
+            run_id (int): Run the rows belong to.
+            rows (iterable): Rows, consumed lazily. hits defaults to 1 (e.g., the 'count' of an aggregate record).
+
+        Returns:
+            int: Number of rows processed.
+        """
+        sql = ("INSERT INTO findings (run_id, target, type, fingerprint, hits, data) VALUES (?, ?, ?, ?, ?, ?) "
+               "ON CONFLICT (run_id, fingerprint) DO UPDATE SET hits = hits + excluded.hits")
+        total = 0
+        batch = []
+        for row in rows:
+            target, finding_type, fp, data = row[:4]
+            hits = row[4] if len(row) > 4 else 1
+            batch.append((run_id, target, finding_type, fp, hits, json.dumps(data, default=str)))
+            if len(batch) >= BATCH_SIZE:
+                self.conn.executemany(sql, batch)
+                self.conn.commit()
+                total += len(batch)
+                batch = []
+        if batch:
+            self.conn.executemany(sql, batch)
+            self.conn.commit()
+            total += len(batch)
+        return total
+
+    def ingest_scan_records(self, records, source=None, label=None):
+        """
+        Stores AdvancedBountyScanner findings (raw or aggregated) as a new run.
+
+        Returns:
+            tuple: (run_id, rows processed)
+        """
+        run_id = self.create_run('advanced_bounty_scanner', source, label)
+        rows = ((*scan_finding_row(r), r.get('count', 1)) for r in records if r.get('record_type') != 'summary')
+        return run_id, self.bulk_insert(run_id, rows)
+
+    def ingest_scan_file(self, path, label=None):
+        """Ingests a JSON Lines file written by main_scanner.py (.gz supported)."""
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt') as f:
+            records = (json.loads(line) for line in f if line.strip())
+            return self.ingest_scan_records(records, source=os.path.abspath(path), label=label)
+
+    def ingest_recon_file(self, path, label=None):
+        """Ingests a JSON report written by bug_bounty_tool.py --json_output."""
+        with open(path, 'r') as f:
+            report = json.load(f)
+        run_id = self.create_run('bug_bounty_hunter', os.path.abspath(path), label)
+        return run_id, self.bulk_insert(run_id, recon_rows(report))
+
+    def list_runs(self):
+        """Returns all runs with their finding counts, newest first."""
+        return self.conn.execute("""
+            SELECT r.id, r.tool, r.label, r.source, r.created_at, COUNT(f.fingerprint) AS findings
+            FROM runs r LEFT JOIN findings f ON f.run_id = r.id
+            GROUP BY r.id ORDER BY r.id DESC
+        """).fetchall()
+
+    def query(self, run_id=None, target=None, finding_type=None, limit=100):
+        """Returns findings filtered by run, target and/or type."""
+        clauses, params = [], []
+        for column, value in (('run_id', run_id), ('target', target), ('type', finding_type)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self.conn.execute(
+            f"SELECT run_id, target, type, fingerprint, hits, data FROM findings {where} LIMIT ?",
+            params + [limit]
+        ).fetchall()
+
+    def _only_in(self, run_id, other_run_id, target=None, limit=None):
+        # Anti-join on the (run_id, fingerprint) primary key: one index probe per row of run_id.
+        sql = """
+            SELECT f.target, f.type, f.fingerprint, f.data FROM findings f
+            WHERE f.run_id = ? AND NOT EXISTS (
+                SELECT 1 FROM findings o WHERE o.run_id = ? AND o.fingerprint = f.fingerprint)
+        """
+        params = [run_id, other_run_id]
+        if target is not None:
+            sql += " AND f.target = ?"
+            params.append(target)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.conn.execute(sql, params)
+
+    def diff(self, old_run_id, new_run_id, target=None, show=20):
+        """
+        Compares two runs.
+
+        Returns:
+            dict: {'new': count, 'fixed': count, 'unchanged': count,
+                   'new_sample': [...], 'fixed_sample': [...]}
+
+        Raises:
+            ValueError: If either run does not exist.
+        """
+        for run_id in (old_run_id, new_run_id):
+            if self.conn.execute("SELECT 1 FROM runs WHERE id = ?", (run_id,)).fetchone() is None:
+                raise ValueError(f"run {run_id} does not exist")
+
+        def count_only_in(a, b):
+            sql = """SELECT COUNT(*) FROM findings f WHERE f.run_id = ? AND NOT EXISTS (
+                         SELECT 1 FROM findings o WHERE o.run_id = ? AND o.fingerprint = f.fingerprint)"""
+            params = [a, b]
+            if target is not None:
+                sql += " AND f.target = ?"
+                params.append(target)
+            return self.conn.execute(sql, params).fetchone()[0]
+
+        total_new_sql = "SELECT COUNT(*) FROM findings WHERE run_id = ?" + (" AND target = ?" if target else "")
+        total_new = self.conn.execute(total_new_sql, [new_run_id] + ([target] if target else [])).fetchone()[0]
+        new_count = count_only_in(new_run_id, old_run_id)
+        return {
+            'new': new_count,
+            'fixed': count_only_in(old_run_id, new_run_id),
+            'unchanged': total_new - new_count,
+            'new_sample': [dict(r) for r in self._only_in(new_run_id, old_run_id, target, show)],
+            'fixed_sample': [dict(r) for r in self._only_in(old_run_id, new_run_id, target, show)],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Findings database: ingest results of both tools and diff runs.")
+    parser.add_argument("db", help="Path to the findings SQLite database.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_scan = sub.add_parser('ingest-scan', help="Ingest a main_scanner.py JSON Lines file (raw or --aggregate_file).")
+    p_scan.add_argument("path")
+    p_scan.add_argument("--label")
+
+    p_recon = sub.add_parser('ingest-recon', help="Ingest a bug_bounty_tool.py --json_output report.")
+    p_recon.add_argument("path")
+    p_recon.add_argument("--label")
+
+    sub.add_parser('runs', help="List stored runs.")
+
+    p_query = sub.add_parser('query', help="List findings.")
+    p_query.add_argument("--run", type=int)
+    p_query.add_argument("--target")
+    p_query.add_argument("--type")
+    p_query.add_argument("--limit", type=int, default=100)
+
+    p_diff = sub.add_parser('diff', help="Report new, fixed and unchanged findings between two runs.")
+    p_diff.add_argument("old_run", type=int)
+    p_diff.add_argument("new_run", type=int)
+    p_diff.add_argument("--target")
+    p_diff.add_argument("--show", type=int, default=20, help="Examples listed per category.")
+    p_diff.add_argument("--json", action='store_true', help="Print the diff as JSON.")
+
+    args = parser.parse_args()
+    store = FindingsStore(args.db)
+
+    if args.command == 'ingest-scan':
+        run_id, count = store.ingest_scan_file(args.path, label=args.label)
+        print(f"[+] Run {run_id}: {count} finding(s) ingested from {args.path}")
+    elif args.command == 'ingest-recon':
+        run_id, count = store.ingest_recon_file(args.path, label=args.label)
+        print(f"[+] Run {run_id}: {count} finding(s) ingested from {args.path}")
+    elif args.command == 'runs':
+        for row in store.list_runs():
+            created = time.strftime('%Y-%m-%d %H:%M', time.localtime(row['created_at']))
+            print(f"  #{row['id']:<5} {created}  {row['tool']:<24} {row['findings']:>8} finding(s)  "
+                  f"{row['label'] or ''}  {row['source'] or ''}")
+    elif args.command == 'query':
+        for row in store.query(args.run, args.target, args.type, args.limit):
+            print(f"  run={row['run_id']} {row['type']:<16} {row['target']:<30} hits={row['hits']} {row['data'][:120]}")
+    elif args.command == 'diff':
+        try:
+            result = store.diff(args.old_run, args.new_run, target=args.target, show=args.show)
+        except ValueError as e:
+            store.close()
+            parser.error(str(e))
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print(f"[*] Run {args.old_run} -> {args.new_run}: {result['new']} new, "
+                  f"{result['fixed']} fixed, {result['unchanged']} unchanged")
+            for label, key in (('New', 'new_sample'), ('Fixed', 'fixed_sample')):
+                if result[key]:
+                    print(f"\n  --- {label} ---")
+                    for row in result[key]:
+                        print(f"  [{row['type']}] {row['target']}: {row['data'][:150]}")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
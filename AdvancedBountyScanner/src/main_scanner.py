@@ -4,6 +4,10 @@ import argparse
 import os
 import sys
 import json # For pretty printing results
+import queue
+import threading
+import time
+from urllib.parse import urlparse
 
 # --- Path Setup ---
 def setup_module_paths():
@@ -28,10 +32,23 @@ setup_module_paths()
 # --- Imports after path setup ---
 try:
     from core_engine import CoreEngine
-    from config_manager import ConfigManager
-    from reporter import Reporter # Import the new Reporter class
+    from config_manager import ConfigManager, validate_reloadable_settings
+    from reporter import Reporter, StreamingReporter
+    from work_queue import SQLiteTaskQueue, SQLiteHostRateLimiter, SQLiteRunBudget, new_worker_id
+    from url_dedup import URLDeduplicator
+    from finding_aggregator import FindingAggregator
+    from findings_store import FindingsStore
+    from throttle import Throttle
+    from circuit_breaker import CircuitBreaker
+    from dns_cache import DNSCache
+    from budget import ScanBudget
+    from analysis_pool import AnalysisPool
+    from response_triage import ResponseTriage
+    from profiling import ScanProfiler, PROFILE_MODES, profile_phase
+    from progress import ProgressTracker, configure_logging, flush_logs, get_logger
     from modules.sqli_scanner import SQLiScanner
     from modules.xss_scanner import XSSScanner
+    from modules.crawler import Crawler
     # Import other scanner modules here as they are created
 except ImportError as e:
     print(f"[!] Critical Error: Failed to import necessary modules: {e}", file=sys.stderr)
@@ -41,17 +58,460 @@ except ImportError as e:
     sys.exit(1)
 
 
+AVAILABLE_SCANS = ['sqli', 'xss'] # Expansion of 'all'
+
+logger = get_logger('main_scanner')
+
+
+def build_core_engine(config_manager, rate_limiter=None, progress=None, throttle=None, num_workers=None, circuit_breaker=None,
+                      budget=None):
+    """Creates a CoreEngine from the effective configuration."""
+    if num_workers is None:
+        num_workers = max(1, config_manager.get_setting('max_concurrent_requests', 5))
+    return CoreEngine(
+        default_headers={'User-Agent': config_manager.get_setting('user_agent')},
+        proxy=config_manager.get_setting('proxy'),
+        timeout=config_manager.get_setting('timeout'),
+        rate_limiter=rate_limiter,
+        progress=progress,
+        throttle=throttle,
+        circuit_breaker=circuit_breaker,
+        budget=budget,
+        # Crawler and scan threads share one engine; size the pool for both.
+        pool_size=2 * num_workers
+    )
+
+
+def build_scanners(core_engine, config_manager, finding_sink=None, analysis_pool=None, triage=None):
+    """
+    Initializes every available scanner.
+
+    Args:
+        finding_sink (callable, optional): Receives each finding as soon as a scanner reports it.
+        analysis_pool (AnalysisPool, optional): Shared by the scanners for response body matching.
+        triage (ResponseTriage, optional): Shared by the scanners to skip bodies that need no analysis.
+
+    Returns:
+        dict: Scan type name -> scanner instance.
+    """
+    # (Consider making this more dynamic if many scanners are added)
+    return {
+        'sqli': SQLiScanner(core_engine, config_manager, finding_sink=finding_sink, analysis_pool=analysis_pool, triage=triage),
+        'xss': XSSScanner(core_engine, config_manager, finding_sink=finding_sink, analysis_pool=analysis_pool, triage=triage),
+        # ... initialize other scanners
+    }
+
+
+def run_scans_on_url(target_url, scans_to_run, scanners, profiler=None):
+    """
+    Runs the selected scanners against a single URL.
+
+    Args:
+        profiler (ScanProfiler, optional): Profiles each scan as the phase of its scan type.
+
+    Returns:
+        list: All findings produced for the URL.
+    """
+    findings = []
+    if 'sqli' in scans_to_run:
+        logger.debug(f"Starting SQLi scan of {target_url}")
+        with profile_phase(profiler, 'sqli'):
+            sqli_findings = scanners['sqli'].scan_url(target_url)
+        if sqli_findings:
+            findings.extend(sqli_findings)
+
+    if 'xss' in scans_to_run:
+        logger.debug(f"Starting XSS scan of {target_url}")
+        with profile_phase(profiler, 'xss'):
+            xss_findings = scanners['xss'].scan_url(target_url)
+        if xss_findings:
+            findings.extend(xss_findings)
+
+    # Add other scans here
+    return findings
+
+
+def run_scan_pipeline(url_source, scans_to_run, scanners, num_workers, budget=None, profiler=None):
+    """
+    Scans URLs from a (possibly still growing) iterable with a pool of scan threads.
+
+    A feeder thread pulls URLs from url_source (e.g., a running crawl) into a bounded
+    queue, so scanning starts with the first URL found and the source is throttled
+    instead of being materialized up front. Findings reach the reports through the
+    scanners' finding sink, so they are not accumulated here.
+
+    Once the run budget is spent the feeder stops pulling URLs and queued URLs are
+    cancelled (as are queued URLs of hosts whose own budget is spent); scans already
+    running finish, with their remaining requests refused by the engine.
+
+    Returns:
+        tuple: (number of findings, number of queued URLs cancelled by the budget)
+    """
+    url_queue = queue.Queue(maxsize=num_workers * 2)
+    findings_count = [0]
+    cancelled = [0]
+    findings_lock = threading.Lock()
+    _DONE = object()
+
+    def feeder():
+        try:
+            for url in url_source:
+                if budget is not None and budget.run_exhausted():
+                    logger.warning("Run budget spent, no further URLs are taken.")
+                    break
+                url_queue.put(url)
+        except Exception as e:
+            logger.error(f"Error while producing URLs: {e}")
+        finally:
+            if hasattr(url_source, 'close'):
+                url_source.close() # Lets a running crawl shut down its fetch threads
+            for _ in range(num_workers):
+                url_queue.put(_DONE)
+
+    def scan_worker():
+        while True:
+            url = url_queue.get()
+            if url is _DONE:
+                return
+            if budget is not None and (budget.run_exhausted() or budget.host_exhausted(urlparse(url).hostname)):
+                with findings_lock:
+                    cancelled[0] += 1
+                continue
+            try:
+                url_findings = run_scans_on_url(url, scans_to_run, scanners, profiler=profiler)
+            except Exception as e:
+                logger.error(f"Error scanning {url}: {e}")
+                continue
+            with findings_lock:
+                findings_count[0] += len(url_findings)
+
+    threads = [threading.Thread(target=feeder, name='url-feeder', daemon=True)]
+    threads += [threading.Thread(target=scan_worker, name=f'scan-{i}', daemon=True) for i in range(num_workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return findings_count[0], cancelled[0]
+
+
+def iter_target_urls(target_url, url_file):
+    """
+    Lazily yields the URLs to scan from the positional target and/or a file (one URL per line).
+    """
+    if target_url:
+        yield target_url
+    if url_file:
+        try:
+            with open(url_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        yield line
+        except IOError as e:
+            logger.error(f"Error reading URL file {url_file}: {e}")
+
+
+def build_url_deduplicator(config_manager):
+    """
+    Creates the URL pattern deduplicator from the 'url_dedup' settings.
+
+    Returns:
+        URLDeduplicator or None: None when dedup is disabled (per_pattern = 0).
+    """
+    per_pattern = config_manager.get_setting('url_dedup.per_pattern', 1)
+    if not per_pattern:
+        return None
+    return URLDeduplicator(
+        per_pattern=per_pattern,
+        backend=config_manager.get_setting('url_dedup.backend', 'hashset'),
+        capacity=config_manager.get_setting('url_dedup.capacity', 1000000),
+        error_rate=config_manager.get_setting('url_dedup.error_rate', 0.001)
+    )
+
+
+def run_coordinator(args, config_manager, scans_to_run, urls, finding_sink=None):
+    """
+    Enqueues one task per URL and waits for workers to drain the queue.
+
+    Findings are passed to finding_sink as soon as workers report them. The run budget
+    ('budgets.run': --max_time, --max_requests, --max_bytes) is kept in the queue database
+    and shared by all workers; once it is spent, tasks not started yet are cancelled and
+    the coordinator returns when the running ones have finished.
+
+    Returns:
+        tuple: (number of findings reported back by the workers, number of cancelled tasks,
+                SQLiteRunBudget or None when the run has no budget).
+    """
+    queue = SQLiteTaskQueue(args.queue_db, visibility_timeout=args.visibility_timeout)
+    config_hash = queue.register_config(config_manager.settings)
+    run_budget = SQLiteRunBudget(args.queue_db, config_hash)
+    if not run_budget.start(config_manager.get_setting('budgets.run')):
+        run_budget.close()
+        run_budget = None
+    enqueued = queue.enqueue_many(urls, scans_to_run, config_hash)
+    print(f"[*] Coordinator: enqueued {enqueued} task(s) into {args.queue_db} (config {config_hash})")
+    print(f"[*] Start workers with: main_scanner.py --mode worker --queue_db {args.queue_db}\n")
+
+    findings_count = 0
+    cancelled = 0
+    last_finding_id = 0
+    while True:
+        for finding_id, finding in queue.iter_findings(after_id=last_finding_id):
+            findings_count += 1
+            if finding_sink:
+                finding_sink(finding)
+            last_finding_id = finding_id
+        if run_budget is not None and run_budget.exhausted():
+            newly_cancelled = queue.cancel_pending() # Expired leases included, so a dead worker cannot stall the run
+            if newly_cancelled:
+                logger.warning(f"Coordinator: run budget ({run_budget.exhausted()}) spent, "
+                               f"{newly_cancelled} task(s) cancelled.")
+            cancelled += newly_cancelled
+        counts = queue.counts()
+        logger.info(f"Coordinator: pending={counts['pending']} leased={counts['leased']} "
+                    f"done={counts['done']} failed={counts['failed']} cancelled={counts['cancelled']} "
+                    f"findings={findings_count}")
+        flush_logs()
+        if counts['pending'] == 0 and counts['leased'] == 0:
+            break
+        time.sleep(args.poll_interval)
+
+    queue.close()
+    return findings_count, cancelled, run_budget
+
+
+def count_skipped_probes(circuit_breaker):
+    if circuit_breaker is None:
+        return 0
+    return sum(info['skipped'] for info in circuit_breaker.report().values())
+
+
+def print_circuit_breaker_report(circuit_breaker):
+    """Lists the hosts that stopped answering and the probes that were never sent to them."""
+    report = circuit_breaker.report() if circuit_breaker else {}
+    if not report:
+        return report
+    print(f"[!] Circuit breaker: {len(report)} host(s) stopped answering during the scan. "
+          f"Skipped probes were NOT tested and need a re-run:")
+    for host, info in report.items():
+        modules = ', '.join(f"{module}: {count}" for module, count in info['skipped_by_module'].items())
+        print(f"    {host}: {info['skipped']} probe(s) skipped ({modules or 'none'}), "
+              f"circuit opened {info['times_opened']}x, now {info['state']}")
+    return report
+
+
+def print_budget_report(budget, cancelled_urls=0):
+    """
+    Prints which budgets ran out and how much work was left undone.
+
+    Returns:
+        dict or None: The budget report (with 'cancelled_urls' and 'partial'), or None without budgets.
+    """
+    if budget is None:
+        return None
+    report = budget.report()
+    report['cancelled_urls'] = cancelled_urls
+    run = report['run']
+    report['partial'] = bool(run['exhausted'] or report['hosts'] or cancelled_urls or
+                             any(usage['exhausted'] for usage in report['modules'].values()))
+    if not report['partial']:
+        print(f"[*] Budget: {run['requests']} request(s), {run['bytes']} byte(s) in {run['elapsed']}s, within limits.")
+        return report
+    print(f"[!] Budget: results are PARTIAL. {run['requests']} request(s), {run['bytes']} byte(s) in {run['elapsed']}s.")
+    if run['exhausted']:
+        print(f"    Run budget ({run['exhausted']}) spent: {run['skipped']} request(s) refused, "
+              f"{cancelled_urls} queued URL(s) cancelled.")
+    for module, usage in report['modules'].items():
+        if usage['exhausted']:
+            print(f"    Module {module} budget ({usage['exhausted']}) spent: {usage['skipped']} request(s) refused.")
+    for host, usage in report['hosts'].items():
+        print(f"    Host {host} budget ({usage['exhausted']}) spent: {usage['skipped']} request(s) refused.")
+    return report
+
+
+def print_triage_report(triage):
+    """Prints per module how many response bodies were analyzed, truncated or skipped."""
+    report = triage.report() if triage else {}
+    for module, counts in report.items():
+        skipped = counts['skipped_content_type'] + counts['skipped_magic'] + counts['skipped_oversized']
+        print(f"[*] Response triage ({module}): {counts['analyzed']} analyzed, {counts['truncated']} truncated, "
+              f"{skipped} skipped (content type: {counts['skipped_content_type']}, binary signature: "
+              f"{counts['skipped_magic']}, oversized: {counts['skipped_oversized']})")
+    return report
+
+
+def print_dns_cache_report(dns_cache):
+    """Prints the DNS cache hit rate and closes the cache."""
+    if dns_cache is None:
+        return
+    stats = dns_cache.report()
+    lookups = stats['hits'] + stats['negative_hits'] + stats['misses']
+    if lookups:
+        print(f"[*] DNS cache: {stats['hits'] + stats['negative_hits']} of {lookups} lookup(s) answered from the cache, "
+              f"{stats['entries']} name entr{'y' if stats['entries'] == 1 else 'ies'} cached.")
+    dns_cache.close()
+
+
+def build_profiler(args, config_manager):
+    """Creates and starts the profiler for --profile, or returns None."""
+    if not args.profile:
+        return None
+    if args.profile_mode:
+        config_manager.update_setting('profiling.mode', args.profile_mode)
+    output_dir = args.profile_dir
+    if not output_dir:
+        output_dir = os.path.dirname(os.path.abspath(args.output_file)) if args.output_file else os.getcwd()
+    return ScanProfiler.from_config(config_manager, output_dir).start()
+
+
+def write_profile(profiler):
+    """Stops the profiler, writes its files and prints where they are."""
+    if profiler is None:
+        return None
+    directory = profiler.close()
+    for name, stats in sorted(profiler.phase_stats.items()):
+        print(f"[*] Profile phase {name}: {stats['entries']} scan(s), {stats['seconds']:.1f}s")
+    print(f"[+] Profile written to {directory} (see summary.txt)")
+    return directory
+
+
+def build_progress_tracker(config_manager):
+    """Creates the live progress display from the 'progress' settings, or None when disabled."""
+    if not config_manager.get_setting('progress.enabled', True):
+        return None
+    return ProgressTracker(
+        refresh_interval=config_manager.get_setting('progress.refresh_interval', 1.0),
+        machine_interval=config_manager.get_setting('progress.machine_interval', 10.0)
+    )
+
+
+def run_worker(args):
+    """
+    Leases tasks from the queue until it stays empty for --idle_timeout seconds.
+
+    Each task carries the hash of the coordinator's configuration; the worker loads
+    that configuration from the queue so every machine scans with identical settings.
+    Per-host rate limits are reserved centrally in the queue database.
+    """
+    queue = SQLiteTaskQueue(args.queue_db, visibility_timeout=args.visibility_timeout)
+    worker_id = args.worker_id or new_worker_id()
+    print(f"[*] Worker {worker_id} attached to {args.queue_db}")
+    progress = None if args.no_progress else ProgressTracker()
+    if progress:
+        progress.start_rendering()
+
+    profiler = None
+    dns_cache = None
+    runtimes = {} # config_hash -> (scanners, rate_limiter, circuit_breaker, budget, analysis_pool)
+    idle_since = time.time()
+    tasks_done = 0
+
+    while True:
+        task = queue.lease(worker_id)
+        if task is None:
+            if time.time() - idle_since >= args.idle_timeout:
+                break
+            time.sleep(args.poll_interval)
+            continue
+
+        if task['config_hash'] not in runtimes:
+            settings = queue.get_config(task['config_hash'])
+            if settings is None:
+                queue.fail(task['id'], worker_id, f"unknown config hash {task['config_hash']}")
+                continue
+            config_manager = ConfigManager()
+            config_manager.override_config(settings)
+            if profiler is None:
+                profiler = build_profiler(args, config_manager)
+            if dns_cache is None and not args.no_dns_cache:
+                if args.dns_cache_db: # The cache file is local to each worker machine
+                    config_manager.update_setting('dns_cache.path', args.dns_cache_db)
+                dns_cache = DNSCache.from_config(config_manager)
+                if dns_cache is not None: # Once per process; every engine's connections resolve through it
+                    dns_cache.install()
+            rate_limiter = SQLiteHostRateLimiter(args.queue_db, config_manager.get_setting('rate_limit', 0))
+            circuit_breaker = CircuitBreaker.from_config(config_manager)
+            # The run budget is shared with the other workers; per-host and per-module budgets apply to this worker.
+            run_budget = SQLiteRunBudget(args.queue_db, task['config_hash'])
+            if not run_budget.enabled:
+                run_budget.close()
+                run_budget = None
+            budget = ScanBudget.from_config(config_manager, shared_run=run_budget)
+            analysis_pool = AnalysisPool.from_config(config_manager)
+            scanners = build_scanners(
+                build_core_engine(config_manager, rate_limiter=rate_limiter, progress=progress,
+                                  circuit_breaker=circuit_breaker, budget=budget),
+                config_manager,
+                analysis_pool=analysis_pool,
+                triage=ResponseTriage.from_config(config_manager)
+            )
+            runtimes[task['config_hash']] = (scanners, rate_limiter, circuit_breaker, budget, analysis_pool)
+        scanners, _, circuit_breaker, budget, _ = runtimes[task['config_hash']]
+        if budget is not None and budget.run_exhausted():
+            queue.cancel(task['id'], worker_id) # Not scanned; the coordinator reports it as cancelled
+            logger.warning(f"Worker {worker_id}: run budget spent, task #{task['id']} cancelled.")
+            break
+        skipped_before = count_skipped_probes(circuit_breaker)
+
+        logger.info(f"Worker {worker_id}: task #{task['id']} {task['url']} (attempt {task['attempts']})")
+        try:
+            findings = run_scans_on_url(task['url'], task['scans'], scanners, profiler=profiler)
+        except Exception as e:
+            logger.error(f"Worker {worker_id}: task #{task['id']} failed: {e}")
+            queue.fail(task['id'], worker_id, e)
+        else:
+            if not queue.complete(task['id'], worker_id, findings):
+                logger.warning(f"Worker {worker_id}: lease on task #{task['id']} expired, result discarded.")
+            skipped = count_skipped_probes(circuit_breaker) - skipped_before
+            if skipped:
+                logger.warning(f"Worker {worker_id}: task #{task['id']} {task['url']} is incomplete, "
+                               f"{skipped} probe(s) skipped because the host stopped answering.")
+            tasks_done += 1
+        idle_since = time.time()
+        if budget is not None and budget.run_exhausted():
+            # Leased tasks are done; the coordinator cancels the pending ones.
+            logger.warning(f"Worker {worker_id}: run budget spent, no further tasks are leased.")
+            break
+
+    if progress:
+        progress.stop()
+    for runtime_scanners, rate_limiter, circuit_breaker, budget, analysis_pool in runtimes.values():
+        analysis_pool.close()
+        rate_limiter.close()
+        print_circuit_breaker_report(circuit_breaker)
+        if budget is not None:
+            budget.close()
+        print_budget_report(budget)
+        if budget is not None and budget.shared_run is not None:
+            budget.shared_run.close()
+        print_triage_report(runtime_scanners['sqli'].triage)
+    print_dns_cache_report(dns_cache)
+    if profiler:
+        profiler.snapshot('scan')
+        write_profile(profiler)
+    queue.close()
+    print(f"[*] Worker {worker_id} finished after {tasks_done} task(s); queue idle for {args.idle_timeout}s.")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Advanced Bounty Scanner - A modular web vulnerability scanner.")
 
     # Target and Scan Types
-    parser.add_argument("target_url", help="The base URL to scan (e.g., http://example.com/page.php?id=1).")
+    parser.add_argument("target_url", nargs='?', help="The base URL to scan (e.g., http://example.com/page.php?id=1).")
+    parser.add_argument(
+        "--url_file",
+        help="File with additional URLs to scan, one per line."
+    )
+    parser.add_argument(
+        "--crawl",
+        action='store_true',
+        help="Crawl from the target URL(s) and scan every parameterized URL discovered (see 'crawler' settings)."
+    )
     parser.add_argument(
         "--scans",
         nargs='+',
-        required=True,
         choices=['sqli', 'xss', 'all'], # Add more choices as scanners are added
-        help="Types of scans to perform (e.g., sqli xss). 'all' runs all available scans."
+        help="Types of scans to perform (e.g., sqli xss). 'all' runs all available scans. Required unless --mode worker."
     )
 
     # Configuration File
@@ -61,8 +521,17 @@ def main():
     )
     parser.add_argument(
         "--output_file",
-        help="Path to save the scan results (e.g., results.json). (Currently prints to console)"
+        help="Path of the JSON Lines file findings are streamed to while scanning (a '.gz' suffix enables gzip)."
+    )
+    parser.add_argument(
+        "--aggregate_file",
+        help="Path of the JSON Lines report with one record per distinct issue (host, path template, parameter, type)."
+    )
+    parser.add_argument(
+        "--findings_db",
+        help="SQLite findings database to record this run in (compare runs with src/findings_store.py diff)."
     )
+    parser.add_argument("--run_label", help="Label stored with the run in --findings_db.")
 
     # Common Config Overrides (mirroring some ConfigManager defaults)
     parser.add_argument("--user_agent", help="Override the default User-Agent.")
@@ -71,9 +540,56 @@ def main():
     parser.add_argument("--proxy_https", help="HTTPS Proxy (e.g., http://127.0.0.1:8080 or socks5://127.0.0.1:1080).")
     parser.add_argument("--rate_limit", type=float, help="Set requests per second (0 for no limit).")
     parser.add_argument("--max_concurrent_requests", type=int, help="Set max concurrent requests.")
+    parser.add_argument("--dedup_per_pattern", type=int, help="URLs kept per host/path-template/parameter pattern (0 disables dedup).")
+    parser.add_argument("--watch_config", action="store_true",
+                        help="Apply edits of --config_file (rate_limit, max_concurrent_requests, timeout, profiles) "
+                             "while scanning; SIGHUP forces a reload.")
+    parser.add_argument("--max_time", type=float, help="Wall-clock budget of the run in seconds; then in-flight scans finish and partial reports are written.")
+    parser.add_argument("--max_requests", type=int, help="Request budget of the run (see 'budgets' settings for per-host/module budgets).")
+    parser.add_argument("--max_bytes", type=int, help="Budget of response bytes received during the run.")
+    parser.add_argument("--analysis_workers", type=int, help="Processes matching response bodies (0 = match in the scan threads; default: CPU count - 1).")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile every scan phase (sqli, xss) and write the profiles and a summary to --profile_dir.")
+    parser.add_argument("--profile_mode", choices=PROFILE_MODES,
+                        help="'cprofile' (default) or 'sample' (stack sampling, lower overhead on concurrent scans).")
+    parser.add_argument("--profile_dir", help="Directory for --profile output (default: directory of --output_file, else the current directory).")
+    parser.add_argument("--dns_cache_db", help="SQLite file caching DNS answers across runs until their TTL expires (default: in memory for this run).")
+    parser.add_argument("--no_dns_cache", action="store_true", help="Let every connection resolve its host again.")
+    parser.add_argument("--dedup_backend", choices=['hashset', 'bloom'], help="Dedup index: exact 'hashset' or fixed-memory 'bloom'.")
+
+    # Distributed mode
+    parser.add_argument(
+        "--mode",
+        choices=['scan', 'coordinator', 'worker'],
+        default='scan',
+        help="'scan' runs locally (default). 'coordinator' enqueues tasks into --queue_db and collects findings; "
+             "'worker' leases and executes tasks from --queue_db."
+    )
+    parser.add_argument("--queue_db", help="Path to the SQLite task queue shared by coordinator and workers.")
+    parser.add_argument("--worker_id", help="Worker identifier (default: hostname-pid-random).")
+    parser.add_argument("--visibility_timeout", type=int, default=300, help="Seconds a leased task stays invisible to other workers.")
+    parser.add_argument("--idle_timeout", type=int, default=30, help="Worker exits after the queue has been empty this many seconds.")
+    parser.add_argument("--poll_interval", type=float, default=2.0, help="Seconds between queue polls.")
+
+    # Console output
+    parser.add_argument("--log_level", choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help="Log verbosity (default: progress.log_level from config, INFO).")
+    parser.add_argument("--no_progress", action="store_true", help="Disable the live progress display.")
 
     args = parser.parse_args()
 
+    if args.mode in ('coordinator', 'worker') and not args.queue_db:
+        parser.error(f"--queue_db is required with --mode {args.mode}")
+    if args.mode == 'worker':
+        configure_logging(args.log_level or 'INFO')
+        run_worker(args)
+        flush_logs()
+        return
+    if not args.scans:
+        parser.error("--scans is required unless --mode worker is used")
+    if not args.target_url and not args.url_file:
+        parser.error("a target_url or --url_file is required")
+
     # --- Initialize ConfigManager ---
     config_manager = ConfigManager(default_config_path=args.config_file if args.config_file else None)
 
@@ -100,6 +616,31 @@ def main():
         config_manager.update_setting('rate_limit', args.rate_limit)
     if args.max_concurrent_requests is not None:
         config_manager.update_setting('max_concurrent_requests', args.max_concurrent_requests)
+    if args.dedup_per_pattern is not None:
+        config_manager.update_setting('url_dedup.per_pattern', args.dedup_per_pattern)
+    if args.dedup_backend:
+        config_manager.update_setting('url_dedup.backend', args.dedup_backend)
+    if args.analysis_workers is not None:
+        config_manager.update_setting('analysis.workers', args.analysis_workers)
+    if args.max_time is not None:
+        config_manager.update_setting('budgets.run.seconds', args.max_time)
+    if args.max_requests is not None:
+        config_manager.update_setting('budgets.run.requests', args.max_requests)
+    if args.max_bytes is not None:
+        config_manager.update_setting('budgets.run.bytes', args.max_bytes)
+    if args.dns_cache_db:
+        config_manager.update_setting('dns_cache.path', args.dns_cache_db)
+    if args.no_dns_cache:
+        config_manager.update_setting('dns_cache.enabled', False)
+    if args.log_level:
+        config_manager.update_setting('progress.log_level', args.log_level)
+    if args.no_progress:
+        config_manager.update_setting('progress.enabled', False)
+
+    configure_logging(
+        config_manager.get_setting('progress.log_level', 'INFO'),
+        buffer_capacity=config_manager.get_setting('progress.log_buffer', 500)
+    )
 
     print("[*] Effective Configuration:")
     print(f"  User-Agent: {config_manager.get_setting('user_agent')}")
@@ -108,56 +649,161 @@ def main():
     print(f"  Rate Limit: {config_manager.get_setting('rate_limit')}")
     print(f"  Max Concurrent Requests: {config_manager.get_setting('max_concurrent_requests')}")
 
+    scans_to_run = args.scans
+    if 'all' in scans_to_run:
+        scans_to_run = list(AVAILABLE_SCANS) # Expand 'all' to all known scan types
 
-    # --- Initialize CoreEngine ---
-    core_engine = CoreEngine(
-        default_headers={'User-Agent': config_manager.get_setting('user_agent')},
-        proxy=config_manager.get_setting('proxy'),
-        timeout=config_manager.get_setting('timeout')
-    )
+    limit_errors = validate_reloadable_settings(config_manager.settings)
+    if limit_errors:
+        parser.error("invalid limits in configuration: " + "; ".join(limit_errors))
 
-    # --- Initialize Scanners ---
-    # (Consider making this more dynamic if many scanners are added)
-    sqli_scanner = SQLiScanner(core_engine, config_manager)
-    xss_scanner = XSSScanner(core_engine, config_manager)
-    # ... initialize other scanners
+    # One throttle for every local engine, so per-host limits cover crawl and scan traffic together.
+    throttle = Throttle.from_config(config_manager)
+    circuit_breaker = CircuitBreaker.from_config(config_manager)
+    budget = ScanBudget.from_config(config_manager) if args.mode == 'scan' else None # The coordinator shares its own
+    num_workers = max(1, config_manager.get_setting('max_concurrent_requests', 5))
+    if args.watch_config:
+        if not args.config_file:
+            parser.error("--watch_config requires --config_file")
+        # Threads are started up front; the throttle decides how many of them may send at once.
+        num_workers = max(num_workers, config_manager.get_setting('hot_reload.max_workers') or 2 * num_workers)
+        config_manager.add_reload_listener(lambda changes: throttle.configure_from(config_manager))
+        config_manager.watch(poll_interval=config_manager.get_setting('hot_reload.poll_interval', 2.0))
 
-    all_findings = []
-    scans_to_run = args.scans
-    if 'all' in scans_to_run:
-        scans_to_run = ['sqli', 'xss'] # Expand 'all' to all known scan types
+    progress = build_progress_tracker(config_manager)
+    profiler = build_profiler(args, config_manager)
+    try:
+        dns_cache = DNSCache.from_config(config_manager)
+    except ValueError as e: # A cache file of another schema version
+        parser.error(f"--dns_cache_db: {e}")
+    if dns_cache is not None: # Once per process; every engine's connections resolve through it
+        dns_cache.install()
+    target_urls = iter_target_urls(args.target_url, args.url_file)
+    crawler = None
+    if args.crawl:
+        # The crawler runs on its own engine so crawling is never starved by scan traffic.
+        crawler = Crawler(
+            build_core_engine(config_manager, progress=progress, throttle=throttle, circuit_breaker=circuit_breaker,
+                              budget=budget),
+            config_manager
+        )
+        target_urls = crawler.crawl(target_urls)
+    url_deduplicator = build_url_deduplicator(config_manager)
+    if url_deduplicator:
+        target_urls = url_deduplicator.filter(target_urls)
 
-    print(f"\n[*] Target URL: {args.target_url}")
+    print(f"\n[*] Target: {args.target_url or ''}{' + ' if args.target_url and args.url_file else ''}{args.url_file or ''}")
     print(f"[*] Scans to perform: {', '.join(scans_to_run)}\n")
 
+    # Findings are written to the output file as they are found, so a crash keeps everything found so far.
+    stream_reporter = StreamingReporter.from_config(config_manager, args.output_file) if args.output_file else None
+    aggregator = FindingAggregator(
+        max_payload_samples=config_manager.get_setting('aggregation.max_payload_samples', 5),
+        spill_threshold=config_manager.get_setting('aggregation.spill_threshold', 10000),
+        spill_directory=config_manager.get_setting('aggregation.spill_directory')
+    )
+
+    def finding_sink(finding):
+        aggregator.add(finding)
+        if stream_reporter:
+            stream_reporter.submit(finding)
+
     # --- Run Scans ---
-    if 'sqli' in scans_to_run:
-        print("--- Starting SQLi Scan ---")
-        sqli_findings = sqli_scanner.scan_url(args.target_url)
-        if sqli_findings:
-            all_findings.extend(sqli_findings)
-        print("--- SQLi Scan Finished ---\n")
+    if progress:
+        progress.start_rendering()
+    cancelled_urls = 0
+    analysis_pool = None
+    triage = ResponseTriage.from_config(config_manager)
+    try:
+        if args.mode == 'coordinator':
+            findings_count, cancelled_urls, budget = run_coordinator(args, config_manager, scans_to_run, target_urls,
+                                                                     finding_sink=finding_sink)
+        else:
+            # --- Initialize CoreEngine and Scanners ---
+            core_engine = build_core_engine(config_manager, progress=progress, throttle=throttle,
+                                            num_workers=num_workers, circuit_breaker=circuit_breaker, budget=budget)
+            analysis_pool = AnalysisPool.from_config(config_manager)
+            scanners = build_scanners(core_engine, config_manager, finding_sink=finding_sink,
+                                      analysis_pool=analysis_pool, triage=triage)
 
-    if 'xss' in scans_to_run:
-        print("--- Starting XSS Scan ---")
-        xss_findings = xss_scanner.scan_url(args.target_url)
-        if xss_findings:
-            all_findings.extend(xss_findings)
-        print("--- XSS Scan Finished ---\n")
+            findings_count, cancelled_urls = run_scan_pipeline(
+                target_urls, scans_to_run, scanners,
+                num_workers=num_workers, budget=budget, profiler=profiler
+            )
+    except KeyboardInterrupt:
+        if analysis_pool:
+            analysis_pool.close()
+        if progress:
+            progress.stop()
+        flush_logs()
+        print("\n[!] Interrupted, findings streamed so far are kept.", file=sys.stderr)
+        write_profile(profiler) # The profile of an interrupted slow scan is the interesting one
+        if stream_reporter:
+            stream_reporter.close({'aborted': True})
+        aggregator.close()
+        sys.exit(130)
+    config_manager.stop_watching()
+    if analysis_pool:
+        analysis_pool.close()
+    if progress:
+        progress.stop()
+    flush_logs()
+    if profiler:
+        profiler.snapshot('scan')
 
-    # Add other scans here
+    if crawler:
+        print(f"[*] Crawl: {crawler.stats['pages_fetched']} page(s) fetched, "
+              f"{crawler.stats['injection_points']} injection point(s) found, "
+              f"{crawler.stats['post_forms_skipped']} POST form(s) skipped.")
+
+    if url_deduplicator:
+        print(f"[*] URL dedup: {url_deduplicator.kept} of {url_deduplicator.seen} URL(s) scanned, "
+              f"{url_deduplicator.dropped} skipped as duplicate patterns.")
+
+    unreachable_hosts = print_circuit_breaker_report(circuit_breaker)
+    print_dns_cache_report(dns_cache)
+    budget_report = print_budget_report(budget, cancelled_urls)
+    if budget is not None:
+        budget.close()
+    triage_report = print_triage_report(triage)
 
     # --- Initialize Reporter ---
     reporter = Reporter(config_manager)
 
     # --- Reporting ---
-    if all_findings:
-        reporter.print_console(all_findings)
-        if args.output_file:
-            reporter.save_to_file(all_findings, args.output_file)
+    # Reports render from the aggregates: one entry per distinct issue instead of one per hit.
+    if findings_count:
+        issues = reporter.print_console_aggregated(aggregator.aggregates())
+        print(f"\n[*] {findings_count} raw finding(s) collapsed into {issues} distinct issue(s).")
+        if args.aggregate_file:
+            reporter.save_aggregates_to_file(aggregator.aggregates(), args.aggregate_file)
     else:
         print("\n[*] No vulnerabilities found with the selected scans.")
 
+    if args.findings_db:
+        store = FindingsStore(args.findings_db)
+        run_id, stored = store.ingest_scan_records(aggregator.aggregates(), source=args.output_file, label=args.run_label)
+        store.close()
+        print(f"[+] Run {run_id}: {stored} issue(s) recorded in {args.findings_db}")
+
+    if stream_reporter:
+        summary = {'scans': scans_to_run, 'mode': args.mode, 'distinct_issues': len(aggregator)}
+        if url_deduplicator:
+            summary['urls_seen'] = url_deduplicator.seen
+            summary['urls_scanned'] = url_deduplicator.kept
+        if unreachable_hosts:
+            summary['unreachable_hosts'] = unreachable_hosts
+        if triage_report:
+            summary['response_triage'] = triage_report
+        if budget_report:
+            summary['budget'] = budget_report
+            summary['partial'] = budget_report['partial']
+        stream_reporter.close(summary)
+    aggregator.close()
+    if profiler:
+        profiler.snapshot('report')
+        write_profile(profiler)
+
     print("\n[*] Advanced Bounty Scanner finished.")
 
 
@@ -0,0 +1,122 @@
+import fnmatch
+import re
+from collections import namedtuple
+
+PROFILE_KEYS = ('rate_limit', 'max_concurrent_requests', 'timeout')
+
+# Effective limits for one (host, module) pair.
+#   rate_limit:     requests/second (0 = unlimited)
+#   max_concurrent: simultaneous requests of this pair (0 = only the global limit applies)
+#   timeout:        request timeout in seconds
+#   key:            throttle state the pair shares; (host, None) unless its module profile sets its own limits
+Limits = namedtuple('Limits', ['rate_limit', 'max_concurrent', 'timeout', 'key'])
+
+
+class ProfileResolver:
+    """
+    Resolves layered performance profiles into effective limits.
+
+    Layers, from least to most specific:
+      1. global:  'rate_limit', 'max_concurrent_requests', 'timeout'
+      2. module:  profiles.modules.<name> (e.g., 'sqli', 'xss', 'crawl')
+      3. host:    profiles.hosts.<hostname or pattern> (e.g., 'api.example.com', '*.cdn.example.net')
+
+    Exact host names win over patterns; among patterns the most specific (most
+    literal characters) wins. Combinations of modules and exact hosts are resolved
+    when the resolver is built; other hosts are resolved on first use and memoized,
+    so every later lookup is a single dictionary access.
+    """
+
+    def __init__(self, global_profile, module_profiles=None, host_profiles=None):
+        """
+        Args:
+            global_profile (dict): Global 'rate_limit', 'max_concurrent_requests' and 'timeout'.
+            module_profiles (dict, optional): module name -> partial profile.
+            host_profiles (dict, optional): hostname or fnmatch pattern -> partial profile.
+        """
+        self.global_profile = {k: global_profile.get(k) for k in PROFILE_KEYS}
+        self.max_concurrent = self.global_profile['max_concurrent_requests'] or 0 # Cap over all requests
+        self._modules = {name: dict(profile or {}) for name, profile in (module_profiles or {}).items()}
+
+        self._exact_hosts = {}
+        patterns = []
+        for host, profile in (host_profiles or {}).items():
+            host = host.lower()
+            if any(c in host for c in '*?['):
+                literal_chars = len(host) - sum(host.count(c) for c in '*?[]')
+                patterns.append((literal_chars, re.compile(fnmatch.translate(host)), dict(profile or {})))
+            else:
+                self._exact_hosts[host] = dict(profile or {})
+        patterns.sort(key=lambda p: -p[0])
+        self._patterns = [(regex, profile) for _, regex, profile in patterns]
+
+        self._cache = {}
+        for host in self._exact_hosts:
+            for module in [None] + list(self._modules):
+                self._cache[(host, module)] = self._resolve(host, module)
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Builds a resolver from the global limits and the 'profiles' section of a ConfigManager."""
+        settings = config_manager.settings
+        profiles = settings.get('profiles') or {}
+        return cls(settings, profiles.get('modules'), profiles.get('hosts'))
+
+    def _host_profile(self, host):
+        profile = self._exact_hosts.get(host)
+        if profile is not None:
+            return profile
+        for regex, pattern_profile in self._patterns:
+            if regex.match(host):
+                return pattern_profile
+        return None
+
+    def _resolve(self, host, module):
+        module_profile = self._modules.get(module) or {}
+        host_profile = self._host_profile(host) or {}
+        merged = dict(self.global_profile)
+        merged.update(module_profile)
+        merged.update(host_profile)
+
+        own_module_limits = any(k in module_profile for k in ('rate_limit', 'max_concurrent_requests'))
+        own_concurrency = 'max_concurrent_requests' in module_profile or 'max_concurrent_requests' in host_profile
+        return Limits(
+            rate_limit=merged['rate_limit'] or 0,
+            max_concurrent=(merged['max_concurrent_requests'] or 0) if own_concurrency else 0,
+            timeout=merged['timeout'],
+            key=(host, module if own_module_limits else None)
+        )
+
+    def resolve(self, host, module=None):
+        """
+        Returns the effective Limits for a request.
+
+        Args:
+            host (str): Lower-case hostname (as returned by urlparse().hostname).
+            module (str, optional): Name of the requesting module.
+        """
+        key = (host, module)
+        limits = self._cache.get(key)
+        if limits is None:
+            limits = self._cache[key] = self._resolve(host or '', module)
+        return limits
+
+
+if __name__ == '__main__':
+    print("[*] ProfileResolver Test Suite")
+
+    resolver = ProfileResolver(
+        {'rate_limit': 10, 'max_concurrent_requests': 8, 'timeout': 10},
+        module_profiles={'crawl': {'max_concurrent_requests': 2}, 'sqli': {'timeout': 20}},
+        host_profiles={
+            'legacy.shop.test': {'rate_limit': 1, 'max_concurrent_requests': 1, 'timeout': 30},
+            '*.cdn.test': {'rate_limit': 0, 'max_concurrent_requests': 8},
+            '*.test': {'rate_limit': 5},
+        }
+    )
+    for host, module in (('www.example.com', None), ('www.example.com', 'crawl'), ('www.example.com', 'sqli'),
+                         ('legacy.shop.test', 'sqli'), ('img.cdn.test', 'xss'), ('other.test', 'crawl')):
+        print(f"  {host:<18} {str(module):<6} -> {resolver.resolve(host, module)}")
+    print(f"  Precomputed entries: {len(resolver._cache)}")
+
+    print("\n[*] ProfileResolver Test Suite Finished.")
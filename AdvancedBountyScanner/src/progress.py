@@ -0,0 +1,247 @@
+import json
+import logging
+import logging.handlers
+import sys
+import threading
+import time
+from collections import deque
+
+LOGGER_NAMESPACE = 'abs' # Every scanner component logs below this name, e.g. 'abs.core_engine'
+
+_log_handler = None
+
+
+def get_logger(component):
+    """Returns the logger of a scanner component (e.g., 'core_engine', 'sqli_scanner')."""
+    return logging.getLogger(f"{LOGGER_NAMESPACE}.{component}")
+
+
+def configure_logging(level='INFO', stream=None, buffer_capacity=500):
+    """
+    Routes all scanner logs through one buffered handler.
+
+    Records are kept in memory and written in batches: when the buffer is full, when a
+    record of level ERROR or above arrives, or when flush_logs() is called (the progress
+    renderer does so on every refresh). This keeps console I/O off the request hot path.
+
+    Args:
+        level (str or int, optional): Minimum level, e.g. 'DEBUG', 'INFO', 'WARNING'.
+        stream (file, optional): Destination stream (default: sys.stderr).
+        buffer_capacity (int, optional): Records buffered before a forced flush.
+
+    Returns:
+        logging.Handler: The installed buffering handler.
+    """
+    global _log_handler
+    target = logging.StreamHandler(stream or sys.stderr)
+    target.setFormatter(logging.Formatter('%(asctime)s %(levelname)-7s [%(name)s] %(message)s', '%H:%M:%S'))
+
+    logger = logging.getLogger(LOGGER_NAMESPACE)
+    if _log_handler is not None:
+        _log_handler.close()
+        logger.removeHandler(_log_handler)
+    _log_handler = logging.handlers.MemoryHandler(buffer_capacity, flushLevel=logging.ERROR, target=target)
+    logger.addHandler(_log_handler)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.propagate = False
+    return _log_handler
+
+
+def flush_logs():
+    """Writes out any buffered log records."""
+    if _log_handler is not None:
+        _log_handler.flush()
+
+
+class _ModuleStats:
+    __slots__ = ('queued', 'in_flight', 'completed', 'errors', 'skipped', 'recent')
+
+    def __init__(self):
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.errors = 0
+        self.skipped = 0 # Never sent (e.g., refused by an open circuit breaker)
+        self.recent = deque() # Completion timestamps inside the rate window
+
+
+class ProgressTracker:
+    """
+    Tracks probe counts per module and renders them periodically.
+
+    For every module it keeps queued, in-flight, completed and failed probes, and derives
+    requests/second (over a sliding window), the error rate and an ETA for the work that is
+    currently queued. On a TTY a single status line is redrawn every `refresh_interval`
+    seconds; otherwise a JSON line is emitted every `machine_interval` seconds so the run
+    can be followed by other tools.
+    """
+
+    def __init__(self, refresh_interval=1.0, machine_interval=10.0, rate_window=10.0, stream=None, tty=None):
+        """
+        Args:
+            refresh_interval (float, optional): Seconds between redraws on a TTY.
+            machine_interval (float, optional): Seconds between JSON lines when not on a TTY.
+            rate_window (float, optional): Seconds of history used for requests/second.
+            stream (file, optional): Output stream (default: sys.stderr).
+            tty (bool, optional): Force TTY/non-TTY rendering (default: detected from stream).
+        """
+        self.stream = stream or sys.stderr
+        self.tty = self.stream.isatty() if tty is None else tty
+        self.refresh_interval = refresh_interval
+        self.machine_interval = machine_interval
+        self.rate_window = rate_window
+        self.started_at = time.monotonic()
+        self._modules = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_line_len = 0
+
+    def _stats(self, module):
+        stats = self._modules.get(module)
+        if stats is None:
+            stats = self._modules[module] = _ModuleStats()
+        return stats
+
+    def add_queued(self, module, count=1):
+        """Announces `count` probes that a module is about to send."""
+        with self._lock:
+            self._stats(module).queued += count
+
+    def start(self, module):
+        """Marks one probe of module as in flight."""
+        with self._lock:
+            stats = self._stats(module)
+            if stats.queued > 0:
+                stats.queued -= 1
+            stats.in_flight += 1
+
+    def finish(self, module, error=False):
+        """Marks one in-flight probe of module as completed (or failed)."""
+        now = time.monotonic()
+        with self._lock:
+            stats = self._stats(module)
+            stats.in_flight = max(0, stats.in_flight - 1)
+            stats.completed += 1
+            if error:
+                stats.errors += 1
+            stats.recent.append(now)
+
+    def skip(self, module):
+        """Marks one queued probe of module as skipped without being sent."""
+        with self._lock:
+            stats = self._stats(module)
+            if stats.queued > 0:
+                stats.queued -= 1
+            stats.skipped += 1
+
+    def snapshot(self):
+        """
+        Returns the current counters.
+
+        Returns:
+            dict: module -> {'queued', 'in_flight', 'completed', 'errors', 'skipped', 'rps', 'error_rate', 'eta_seconds'}
+        """
+        now = time.monotonic()
+        window = min(self.rate_window, max(now - self.started_at, 1e-6))
+        result = {}
+        with self._lock:
+            for module, stats in self._modules.items():
+                while stats.recent and stats.recent[0] < now - self.rate_window:
+                    stats.recent.popleft()
+                rps = len(stats.recent) / window
+                remaining = stats.queued + stats.in_flight
+                result[module] = {
+                    'queued': stats.queued,
+                    'in_flight': stats.in_flight,
+                    'completed': stats.completed,
+                    'errors': stats.errors,
+                    'skipped': stats.skipped,
+                    'rps': round(rps, 2),
+                    'error_rate': round(stats.errors / stats.completed, 4) if stats.completed else 0.0,
+                    'eta_seconds': round(remaining / rps, 1) if rps > 0 and remaining else None,
+                }
+        return result
+
+    @staticmethod
+    def _format_eta(seconds):
+        if seconds is None:
+            return '--:--'
+        minutes, secs = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+    def render_line(self, snapshot=None):
+        """Formats the one-line human-readable status."""
+        snapshot = snapshot if snapshot is not None else self.snapshot()
+        elapsed = self._format_eta(time.monotonic() - self.started_at)
+        parts = []
+        for module, s in snapshot.items():
+            parts.append(f"{module}: {s['completed']} done, {s['in_flight']} active, {s['queued']} queued, "
+                         f"{s['rps']:.1f}/s, err {s['error_rate'] * 100:.1f}%, eta {self._format_eta(s['eta_seconds'])}"
+                         + (f", {s['skipped']} skipped" if s['skipped'] else ''))
+        return f"[{elapsed}] " + (' | '.join(parts) if parts else 'waiting for work...')
+
+    def _clear_tty_line(self):
+        if self.tty and self._last_line_len:
+            self.stream.write('\r' + ' ' * self._last_line_len + '\r')
+            self._last_line_len = 0
+
+    def render(self, final=False):
+        """Draws one update: buffered logs first, then the status line or JSON record."""
+        self._clear_tty_line()
+        flush_logs()
+        snapshot = self.snapshot()
+        if self.tty:
+            line = self.render_line(snapshot)
+            self.stream.write(line + ('\n' if final else ''))
+            self._last_line_len = 0 if final else len(line)
+        else:
+            record = {'event': 'progress', 'final': final, 'elapsed': round(time.monotonic() - self.started_at, 1),
+                      'modules': snapshot}
+            self.stream.write(json.dumps(record) + '\n')
+        self.stream.flush()
+
+    def _render_loop(self):
+        interval = self.refresh_interval if self.tty else self.machine_interval
+        while not self._stop.wait(interval):
+            try:
+                self.render()
+            except Exception: # Progress output must never break a scan
+                pass
+
+    def start_rendering(self):
+        """Starts the background renderer thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._render_loop, name='progress', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stops the renderer and prints a final update."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.render(final=True)
+
+
+if __name__ == '__main__':
+    print("[*] ProgressTracker Test Suite")
+    configure_logging('DEBUG', stream=sys.stdout, buffer_capacity=50)
+    log = get_logger('progress_test')
+
+    for tty_mode in (True, False):
+        print(f"\n--- tty={tty_mode} ---")
+        tracker = ProgressTracker(refresh_interval=0.2, machine_interval=0.3, stream=sys.stdout, tty=tty_mode)
+        tracker.start_rendering()
+        tracker.add_queued('sqli', 30)
+        for i in range(30):
+            tracker.start('sqli')
+            time.sleep(0.02)
+            tracker.finish('sqli', error=(i % 10 == 0))
+            if i % 10 == 0:
+                log.info(f"probe {i} logged through the buffered handler")
+        tracker.stop()
+        print(f"Snapshot: {tracker.snapshot()['sqli']}")
+
+    print("\n[*] ProgressTracker Test Suite Finished.")
@@ -1,6 +1,10 @@
+import gzip
 import json
 import os
+import queue
 import sys
+import threading
+import time
 
 # Attempt to import ConfigManager for type hinting, not strictly needed for functionality
 try:
@@ -54,6 +58,66 @@ class Reporter:
         print("================ END OF CONSOLE REPORT ================")
 
 
+    def print_console_aggregated(self, aggregates):
+        """
+        Prints one entry per distinct issue (see FindingAggregator.aggregates()).
+
+        Args:
+            aggregates (iterable): Aggregate records.
+
+        Returns:
+            int: Number of issues printed.
+        """
+        printed = 0
+        for record in aggregates:
+            if printed == 0:
+                print("\n\n==================== CONSOLE REPORT ====================")
+            printed += 1
+            best = record.get('best', {})
+            print(f"\n[+] Potential {str(record.get('type', 'N/A')).upper()} Found! (#{printed}, {record.get('count', 1)} hit(s))")
+            print(f"  Location:  {record.get('host', 'N/A')}{record.get('path_template', '')}")
+            print(f"  Parameter: {record.get('parameter', 'N/A')}")
+            print(f"  Best URL:  {str(best.get('url', 'N/A'))[:200]}")
+            print(f"  Payloads:  {', '.join(str(p)[:60] for p in record.get('payload_samples', []))}")
+            if 'evidence' in best:
+                print(f"  Evidence:  {str(best.get('evidence', 'N/A'))[:200]}")
+            if 'response_status' in best:
+                print(f"  Status:    {best.get('response_status', 'N/A')}")
+            print("----------------------------------------------------")
+        if printed:
+            print("================ END OF CONSOLE REPORT ================")
+        else:
+            print("\n[*] No findings to report to console.")
+        return printed
+
+    def save_aggregates_to_file(self, aggregates, output_filepath):
+        """
+        Saves aggregate records (one per distinct issue) to a file in JSON Lines format.
+
+        Args:
+            aggregates (iterable): Aggregate records.
+            output_filepath (str): The path to the output file.
+
+        Returns:
+            bool: True if saving was successful, False otherwise.
+        """
+        try:
+            output_dir = os.path.dirname(output_filepath)
+            if output_dir and not os.path.exists(output_dir):
+                os.makedirs(output_dir, exist_ok=True)
+                print(f"  [Info] Created directory: {output_dir}")
+
+            written = 0
+            with open(output_filepath, 'w') as f:
+                for record in aggregates:
+                    f.write(json.dumps(record, default=str) + '\n')
+                    written += 1
+            print(f"  [+] {written} aggregated issue(s) saved to: {output_filepath}")
+            return True
+        except IOError as e:
+            print(f"  [!] Error: Could not write to file {output_filepath}. {e}")
+            return False
+
     def save_to_file(self, findings, output_filepath):
         """
         Saves findings to a file in JSON Lines format.
@@ -89,6 +153,186 @@ class Reporter:
             print(f"  [!] Error: An unexpected error occurred while saving to file: {e}")
             return False
 
+
+class StreamingReporter:
+    """
+    Writes findings to a JSON Lines file while the scan is running.
+
+    Scanners hand findings to submit(), which only puts them on a queue; a background
+    thread appends them to the file and flushes/fsyncs according to the configured
+    policy. close() drains the queue and appends a final summary record
+    ({"record_type": "summary", ...}). Output is gzip-compressed when requested or
+    when the file name ends in '.gz'; each flush ends a deflate block so the file can
+    be followed live with e.g. `tail -f` (or `zcat` for compressed output).
+    """
+
+    FSYNC_POLICIES = ('never', 'interval', 'always')
+
+    def __init__(self, output_filepath, flush_every=50, flush_interval=1.0, fsync='interval',
+                 fsync_interval=5.0, compress=None, append=False):
+        """
+        Initializes the StreamingReporter and opens (truncates) the output file.
+
+        Args:
+            output_filepath (str): Path to the JSONL output file.
+            flush_every (int, optional): Flush after this many buffered findings.
+            flush_interval (float, optional): Flush at least this often (seconds) while findings arrive.
+            fsync (str, optional): 'never', 'interval' (every fsync_interval seconds) or 'always' (on every flush).
+            fsync_interval (float, optional): Seconds between fsyncs with the 'interval' policy.
+            compress (bool, optional): Gzip output. None -> decided by a '.gz' suffix.
+            append (bool, optional): Add to an existing file instead of replacing it, e.g. to resume a run.
+
+        Raises:
+            ValueError: If appending would mix gzip and plain output in one file.
+        """
+        if fsync not in self.FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {self.FSYNC_POLICIES}")
+        self.output_filepath = output_filepath
+        self.flush_every = max(1, flush_every)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.compress = output_filepath.endswith('.gz') if compress is None else compress
+
+        output_dir = os.path.dirname(output_filepath)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir, exist_ok=True)
+            print(f"  [Info] Created directory: {output_dir}")
+
+        if append and os.path.exists(output_filepath) and os.path.getsize(output_filepath):
+            with open(output_filepath, 'rb') as existing:
+                existing_compressed = existing.read(2) == b'\x1f\x8b'
+            if existing_compressed != self.compress: # A gzip member after plain lines (or the reverse) is unreadable
+                raise ValueError(f"Cannot append {'gzip' if self.compress else 'plain'} output to "
+                                 f"{'gzip' if existing_compressed else 'plain'} file {output_filepath}")
+        self._raw_file = open(output_filepath, 'ab' if append else 'wb')
+        self._file = gzip.GzipFile(fileobj=self._raw_file, mode='ab') if self.compress else self._raw_file
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self.started_at = time.time()
+        self.count = 0
+        self.counts_by_type = {}
+        self.write_errors = 0
+        self._thread = threading.Thread(target=self._writer_loop, name='streaming-reporter', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, config_manager_instance, output_filepath):
+        """Creates a StreamingReporter using the 'reporting' settings of a ConfigManager."""
+        get = config_manager_instance.get_setting
+        return cls(
+            output_filepath,
+            flush_every=get('reporting.flush_every', 50),
+            flush_interval=get('reporting.flush_interval', 1.0),
+            fsync=get('reporting.fsync', 'interval'),
+            fsync_interval=get('reporting.fsync_interval', 5.0),
+            compress=get('reporting.compress', None),
+            append=get('reporting.append', False),
+        )
+
+    def submit(self, finding):
+        """Queues a finding for writing. Safe to call from any thread."""
+        if self._closed:
+            raise RuntimeError("StreamingReporter is closed")
+        self._queue.put(finding)
+
+    # Scanners accept any callable as finding sink
+    __call__ = submit
+
+    def _write_line(self, record):
+        self._file.write((json.dumps(record, default=str) + '\n').encode('utf-8'))
+
+    def _flush(self, do_fsync):
+        self._file.flush() # GzipFile.flush() emits a sync flush, keeping the stream readable
+        if self.compress:
+            self._raw_file.flush()
+        if do_fsync:
+            os.fsync(self._raw_file.fileno())
+
+    def _writer_loop(self):
+        pending = 0
+        last_flush = last_fsync = time.monotonic()
+        while True:
+            try:
+                finding = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                finding = None
+
+            if finding is not None and finding is not _STOP:
+                try:
+                    self._write_line(finding)
+                    self.count += 1
+                    finding_type = finding.get('type', 'unknown') if isinstance(finding, dict) else 'unknown'
+                    self.counts_by_type[finding_type] = self.counts_by_type.get(finding_type, 0) + 1
+                    pending += 1
+                except (IOError, OSError, TypeError, ValueError) as e:
+                    self.write_errors += 1
+                    print(f"  [!] Error: Could not write finding to {self.output_filepath}. {e}", file=sys.stderr)
+
+            now = time.monotonic()
+            if pending and (pending >= self.flush_every or now - last_flush >= self.flush_interval or finding is _STOP):
+                do_fsync = self.fsync == 'always' or (self.fsync == 'interval' and now - last_fsync >= self.fsync_interval)
+                try:
+                    self._flush(do_fsync)
+                except (IOError, OSError) as e:
+                    self.write_errors += 1
+                    print(f"  [!] Error: Could not flush {self.output_filepath}. {e}", file=sys.stderr)
+                pending = 0
+                last_flush = now
+                if do_fsync:
+                    last_fsync = now
+
+            if finding is _STOP:
+                return
+
+    def close(self, extra_summary=None):
+        """
+        Drains queued findings, appends the summary record and closes the file.
+
+        Args:
+            extra_summary (dict, optional): Additional fields for the summary record.
+
+        Returns:
+            dict: The summary record that was written.
+        """
+        if self._closed:
+            return None
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+        summary = {
+            'record_type': 'summary',
+            'findings': self.count,
+            'findings_by_type': self.counts_by_type,
+            'started_at': self.started_at,
+            'finished_at': time.time(),
+            'write_errors': self.write_errors,
+        }
+        if extra_summary:
+            summary.update(extra_summary)
+        try:
+            self._write_line(summary)
+            self._flush(self.fsync != 'never')
+        finally:
+            if self.compress:
+                self._file.close()
+            self._raw_file.close()
+        print(f"  [+] {self.count} findings streamed to: {self.output_filepath}")
+        return summary
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close({'aborted': exc_type is not None})
+        return False
+
+
+_STOP = object() # Sentinel telling the writer thread to finish
+
+
 if __name__ == '__main__':
     # --- Standalone Testing Setup for Reporter ---
     # This mock allows testing reporter without needing the full ConfigManager
@@ -176,4 +420,28 @@ if __name__ == '__main__':
     print("\n--- Reporter: Testing File Output with no findings ---")
     reporter_instance.save_to_file([], "empty_report.jsonl") # Should just print "No findings"
 
+    print("\n--- StreamingReporter: Testing streamed gzip output ---")
+    stream_test_filename = 'test_stream_output.jsonl.gz'
+    with StreamingReporter(stream_test_filename, flush_every=1, fsync='always') as stream_reporter:
+        for finding in sample_findings_data:
+            stream_reporter.submit(finding)
+    with gzip.open(stream_test_filename, 'rt') as f_read:
+        records = [json.loads(line) for line in f_read]
+    print(f"  Records read back: {len(records)} (expect {len(sample_findings_data) + 1} incl. summary)")
+    print(f"  Summary record: {records[-1]}")
+    with StreamingReporter(stream_test_filename, flush_every=1) as stream_reporter: # Same file again: replaced
+        stream_reporter.submit(sample_findings_data[0])
+    with gzip.open(stream_test_filename, 'rt') as f_read:
+        print(f"  Records after a second run: {sum(1 for _ in f_read)} (expect 2, not appended)")
+    with StreamingReporter(stream_test_filename, flush_every=1, append=True) as stream_reporter:
+        stream_reporter.submit(sample_findings_data[0])
+    with gzip.open(stream_test_filename, 'rt') as f_read:
+        print(f"  Records after an appended run: {sum(1 for _ in f_read)} (expect 4)")
+    try:
+        StreamingReporter(stream_test_filename, compress=False, append=True)
+        print("  [!] Plain output was appended to a gzip file")
+    except ValueError as e:
+        print(f"  Refused: {e}")
+    os.remove(stream_test_filename)
+
     print("\n[*] Reporter Standalone Test Suite Finished.")
@@ -0,0 +1,163 @@
+import threading
+
+# Content types that cannot carry an SQL error message or a reflected payload
+BINARY_CONTENT_TYPES = (
+    'image/', 'audio/', 'video/', 'font/', 'application/pdf', 'application/zip', 'application/gzip',
+    'application/x-gzip', 'application/x-tar', 'application/x-7z-compressed', 'application/x-rar',
+    'application/vnd.rar', 'application/octet-stream', 'application/wasm', 'application/x-shockwave-flash',
+    'application/msword', 'application/vnd.ms-', 'application/vnd.openxmlformats', 'application/font',
+    'application/x-font', 'application/java-archive', 'application/x-msdownload',
+)
+
+# Leading bytes of binary formats, for responses with a missing or wrong Content-Type.
+# Short signatures that plain text can start with (e.g. 'BM', 'MZ') are left out on purpose.
+MAGIC_SIGNATURES = (
+    b'\x89PNG', b'GIF87a', b'GIF89a', b'\xff\xd8\xff', b'%PDF-', b'PK\x03\x04', b'\x1f\x8b',
+    b'RIFF', b'OggS', b'fLaC', b'\x00\x00\x01\x00', b'wOFF', b'wOF2', b'\x7fELF',
+    b'7z\xbc\xaf\x27\x1c', b'Rar!', b'\x00asm', b'\xd0\xcf\x11\xe0', b'\x00\x00\x00\x18ftyp', b'\x00\x00\x00\x20ftyp',
+)
+
+TRIAGE_OUTCOMES = ('analyzed', 'truncated', 'skipped_content_type', 'skipped_magic', 'skipped_oversized')
+
+
+class ResponseTriage:
+    """
+    Decides from headers and leading bytes whether a response body is worth analyzing.
+
+    The body is streamed (scanners request with stream=True) and only read when it can
+    carry the signal: binary Content-Types are dropped without reading a byte, bodies
+    whose first chunk starts with a binary file signature are dropped after that chunk,
+    and bodies larger than `max_body_bytes` are truncated (or skipped). Outcomes are counted per module so the
+    run report shows how much was not analyzed.
+    """
+
+    def __init__(self, max_body_bytes=2 * 1024 * 1024, oversized='truncate', skip_content_types=BINARY_CONTENT_TYPES,
+                 check_magic=True, chunk_size=65536):
+        """
+        Args:
+            max_body_bytes (int, optional): Bytes of a body that are analyzed at most.
+            oversized (str, optional): 'truncate' analyzes the first max_body_bytes, 'skip' drops the response.
+            skip_content_types (tuple, optional): Content-Type prefixes that are never analyzed.
+            check_magic (bool, optional): Drop bodies starting with a known binary file signature.
+            chunk_size (int, optional): Bytes read from the socket at a time.
+        """
+        if oversized not in ('truncate', 'skip'):
+            raise ValueError(f"oversized must be 'truncate' or 'skip', not {oversized!r}")
+        self.max_body_bytes = max_body_bytes
+        self.oversized = oversized
+        self.skip_content_types = tuple(t.lower() for t in skip_content_types)
+        self.check_magic = check_magic
+        self.chunk_size = chunk_size
+        self._counts = {} # module -> {outcome: count}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Creates a ResponseTriage from the 'triage' settings."""
+        return cls(
+            max_body_bytes=config_manager.get_setting('triage.max_body_bytes', 2 * 1024 * 1024),
+            oversized=config_manager.get_setting('triage.oversized', 'truncate'),
+            skip_content_types=config_manager.get_setting('triage.skip_content_types') or BINARY_CONTENT_TYPES,
+            check_magic=config_manager.get_setting('triage.check_magic', True)
+        )
+
+    def _count(self, module, outcome):
+        with self._lock:
+            counts = self._counts.get(module)
+            if counts is None:
+                counts = self._counts[module] = dict.fromkeys(TRIAGE_OUTCOMES, 0)
+            counts[outcome] += 1
+
+    def read(self, response, module=None, error_statuses=False):
+        """
+        Returns the part of a response body worth analyzing, and releases the connection.
+
+        Args:
+            response (requests.Response or None): Preferably requested with stream=True.
+            module (str, optional): Module the outcome is counted for.
+            error_statuses (bool, optional): Also read 4xx/5xx responses (not counted otherwise).
+
+        Returns:
+            bytes or None: The (possibly truncated) body, or None if there is nothing to analyze.
+        """
+        if response is None:
+            return None
+        try:
+            if not response and not error_statuses:
+                return None
+            content_type = (response.headers.get('Content-Type') or '').split(';', 1)[0].strip().lower()
+            if content_type and content_type.startswith(self.skip_content_types):
+                self._count(module, 'skipped_content_type')
+                return None
+            length = response.headers.get('Content-Length')
+            if self.oversized == 'skip' and length and length.isdigit() and int(length) > self.max_body_bytes:
+                self._count(module, 'skipped_oversized')
+                return None
+
+            chunks = []
+            received = 0
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if not chunks and self.check_magic and chunk.startswith(MAGIC_SIGNATURES):
+                    self._count(module, 'skipped_magic')
+                    return None
+                chunks.append(chunk)
+                received += len(chunk)
+                if received > self.max_body_bytes:
+                    break
+            body = b''.join(chunks)
+            if received > self.max_body_bytes:
+                if self.oversized == 'skip':
+                    self._count(module, 'skipped_oversized')
+                    return None
+                self._count(module, 'truncated')
+                return body[:self.max_body_bytes]
+            self._count(module, 'analyzed')
+            return body
+        finally:
+            response.close()
+
+    def report(self):
+        """
+        Returns:
+            dict: module -> {outcome: count} for every module that had responses triaged.
+        """
+        with self._lock:
+            return {module: dict(counts) for module, counts in self._counts.items()}
+
+
+if __name__ == '__main__':
+    print("[*] ResponseTriage Test Suite")
+
+    class FakeResponse:
+        def __init__(self, body, content_type='text/html', send_length=True):
+            self.headers = {'Content-Type': content_type}
+            if send_length:
+                self.headers['Content-Length'] = str(len(body))
+            self._body = body
+            self.bytes_read = 0
+
+        def iter_content(self, chunk_size=1):
+            for i in range(0, len(self._body), chunk_size):
+                self.bytes_read += len(self._body[i:i + chunk_size])
+                yield self._body[i:i + chunk_size]
+
+        def close(self):
+            pass
+
+    triage = ResponseTriage(max_body_bytes=100000, chunk_size=4096)
+    cases = [
+        ('HTML page', FakeResponse(b'<html>You have an error in your SQL syntax</html>')),
+        ('PNG by Content-Type', FakeResponse(b'\x89PNG' + b'\x00' * 50000, 'image/png')),
+        ('PDF served as text/html', FakeResponse(b'%PDF-1.7' + b'\x00' * 50000)),
+        ('Large JSON', FakeResponse(b'{"a": "' + b'x' * 300000 + b'"}', 'application/json', send_length=False)),
+    ]
+    for name, response in cases:
+        body = triage.read(response, 'sqli')
+        print(f"  {name:<24} -> {'skipped' if body is None else f'{len(body)} bytes analyzed'}, "
+              f"{response.bytes_read} bytes read")
+
+    strict = ResponseTriage(max_body_bytes=100000, oversized='skip')
+    response = FakeResponse(b'x' * 300000)
+    print(f"  Oversized, 'skip' policy -> {strict.read(response, 'xss')}, {response.bytes_read} bytes read")
+    print(f"\n[*] Report: {triage.report()} {strict.report()}")
+    print("\n[*] ResponseTriage Test Suite Finished.")
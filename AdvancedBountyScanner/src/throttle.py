@@ -0,0 +1,223 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from profiles import ProfileResolver
+
+
+class TokenBucket:
+    """
+    Token bucket whose rate can be changed while threads are waiting on it.
+
+    Callers reserve a token and sleep outside the lock until it becomes valid, so
+    waiting threads are served in order and a lowered rate takes effect for the
+    very next reservation.
+    """
+
+    def __init__(self, rate, burst=1.0):
+        """
+        Args:
+            rate (float): Tokens (requests) per second. 0 or less disables limiting.
+            burst (float, optional): Tokens that may accumulate while idle.
+        """
+        self._lock = threading.Lock()
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+
+    def set_rate(self, rate, burst=None):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            if burst is not None:
+                self.burst = burst
+            self._tokens = min(self._tokens, self.burst)
+
+    def _refill(self, now):
+        if self.rate > 0:
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self):
+        """Blocks until a token is available."""
+        with self._lock:
+            if self.rate <= 0:
+                return
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
+
+
+class AdjustableSemaphore:
+    """Counting semaphore whose limit can be raised or lowered at runtime (0 = unlimited)."""
+
+    def __init__(self, limit):
+        self._cond = threading.Condition()
+        self.limit = limit
+        self.in_use = 0
+
+    def set_limit(self, limit):
+        with self._cond:
+            self.limit = limit
+            self._cond.notify_all()
+
+    def acquire(self):
+        with self._cond:
+            while self.limit and self.in_use >= self.limit:
+                self._cond.wait()
+            self.in_use += 1
+
+    def release(self):
+        with self._cond:
+            self.in_use -= 1
+            self._cond.notify()
+
+
+class Throttle:
+    """
+    Local rate and concurrency limits for CoreEngine, driven by a ProfileResolver.
+
+    Every throttle key of the resolver (a host, or a host and module with its own
+    profile) gets a token bucket and, when its profile sets one, a concurrency
+    limit; all requests also share the global max_concurrent_requests limit.
+    configure() swaps in a new resolver and adjusts the live buckets/semaphores, so
+    a reloaded configuration applies to requests already waiting without
+    restarting the scan.
+    """
+
+    def __init__(self, resolver=None):
+        """
+        Args:
+            resolver (ProfileResolver, optional): Limits per host and module (default: no limits).
+        """
+        self._lock = threading.Lock()
+        self._global_slots = AdjustableSemaphore(0)
+        self._states = {} # throttle key (Limits.key) -> (TokenBucket, AdjustableSemaphore)
+        self._resolver = None
+        self.configure(resolver or ProfileResolver({}))
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Creates a Throttle from the global limits and 'profiles' of a ConfigManager."""
+        return cls(ProfileResolver.from_config(config_manager))
+
+    def configure_from(self, config_manager):
+        """Re-reads the limits from a ConfigManager (e.g., as its reload listener)."""
+        self.configure(ProfileResolver.from_config(config_manager))
+
+    def configure(self, resolver):
+        """Atomically replaces the resolver and applies its limits to the existing throttle state."""
+        with self._lock:
+            self._resolver = resolver
+            self._global_slots.set_limit(resolver.max_concurrent)
+            # Resolved by the key, not by the request that created the state: a (host, None) key is
+            # shared by every module without limits of its own, whatever module came first.
+            for key, (bucket, slots) in list(self._states.items()):
+                limits = resolver.resolve(*key)
+                if limits.key != key: # The module gained or lost its own limits; its requests use another key now
+                    del self._states[key]
+                    continue
+                bucket.set_rate(limits.rate_limit)
+                slots.set_limit(limits.max_concurrent)
+
+    def limits(self, host, module=None):
+        """Returns the effective Limits for a request (a single dictionary lookup once resolved)."""
+        return self._resolver.resolve(host, module)
+
+    def _state(self, limits):
+        state = self._states.get(limits.key)
+        if state is None:
+            with self._lock:
+                state = self._states.get(limits.key)
+                if state is None:
+                    state = self._states[limits.key] = (
+                        TokenBucket(limits.rate_limit), AdjustableSemaphore(limits.max_concurrent)
+                    )
+        return state
+
+    @contextmanager
+    def slot(self, host, module=None, limits=None):
+        """
+        Holds the concurrency slots of a request and waits for its rate limit before yielding.
+
+        Args:
+            host (str): Lower-case hostname.
+            module (str, optional): Requesting module.
+            limits (Limits, optional): Already resolved limits, to skip a second lookup.
+        """
+        if limits is None:
+            limits = self.limits(host, module)
+        bucket, key_slots = self._state(limits)
+        # Per-key slot first: requests queued for a slow host must not sit on global slots.
+        key_slots.acquire()
+        try:
+            self._global_slots.acquire()
+            try:
+                bucket.acquire()
+                yield
+            finally:
+                self._global_slots.release()
+        finally:
+            key_slots.release()
+
+
+if __name__ == '__main__':
+    print("[*] Throttle Test Suite")
+
+    throttle = Throttle(ProfileResolver(
+        {'rate_limit': 20, 'max_concurrent_requests': 4, 'timeout': 10},
+        host_profiles={'fragile.test': {'rate_limit': 5, 'max_concurrent_requests': 1, 'timeout': 30}}
+    ))
+    print(f"Limits robust.test: {throttle.limits('robust.test')}")
+    print(f"Limits fragile.test: {throttle.limits('fragile.test')}")
+
+    def burst(host, count, threads=4):
+        active = [0]
+        peak = [0]
+        lock = threading.Lock()
+
+        def one():
+            with throttle.slot(host):
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.2) # Long enough for requests to overlap
+                with lock:
+                    active[0] -= 1
+
+        started = time.monotonic()
+        workers = [threading.Thread(target=lambda: [one() for _ in range(count // threads)]) for _ in range(threads)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.monotonic() - started
+        return count / elapsed, peak[0]
+
+    rate, peak = burst('robust.test', 40)
+    print(f"robust.test: {rate:.1f} req/s (limit 20), peak concurrency {peak} (limit 4)")
+    rate, peak = burst('fragile.test', 8)
+    print(f"fragile.test: {rate:.1f} req/s (limit 5), peak concurrency {peak} (limit 1)")
+
+    print("\n--- Reconfigure: 40 req/s and 12 concurrent, fragile.test override removed ---")
+    throttle.configure(ProfileResolver({'rate_limit': 40, 'max_concurrent_requests': 12, 'timeout': 10}))
+    rate, peak = burst('robust.test', 96, threads=16)
+    print(f"robust.test: {rate:.1f} req/s (limit 40), peak concurrency {peak} (limit 12)")
+    rate, peak = burst('fragile.test', 96, threads=16)
+    print(f"fragile.test: {rate:.1f} req/s (limit 40), peak concurrency {peak} (limit 12)")
+
+    print("\n--- Reload gives sqli its own limit; the bucket xss and crawl share keeps the host's ---")
+    throttle = Throttle(ProfileResolver({'rate_limit': 40, 'max_concurrent_requests': 12, 'timeout': 10}))
+    with throttle.slot('shared.test', 'sqli'): # The (host, None) state is created by an sqli request
+        pass
+    throttle.configure(ProfileResolver({'rate_limit': 40, 'max_concurrent_requests': 12, 'timeout': 10},
+                                       module_profiles={'sqli': {'rate_limit': 2}}))
+    with throttle.slot('shared.test', 'sqli'):
+        pass
+    print(f"  shared.test buckets: {({key: bucket.rate for key, (bucket, _) in throttle._states.items()})} "
+          f"(expect 40 for (host, None), 2 for sqli)")
+
+    print("\n[*] Throttle Test Suite Finished.")
@@ -0,0 +1,244 @@
+import hashlib
+import math
+import re
+from urllib.parse import urlparse, parse_qs
+
+# Path segments that only differ by an identifier are generalized to a placeholder.
+_NUMERIC_SEGMENT = re.compile(r'^\d+$')
+_UUID_SEGMENT = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+_HEX_SEGMENT = re.compile(r'^[0-9a-fA-F]{16,}$') # Long hex ids / hashes
+
+
+def path_template(path):
+    """
+    Generalizes identifier-like path segments.
+
+    '/users/42/orders/0b6f...-...' -> '/users/{int}/orders/{uuid}'
+
+    Args:
+        path (str): The URL path.
+
+    Returns:
+        str: The path template.
+    """
+    if not path:
+        return '/'
+    segments = []
+    for segment in path.split('/'):
+        if _NUMERIC_SEGMENT.match(segment):
+            segments.append('{int}')
+        elif _UUID_SEGMENT.match(segment):
+            segments.append('{uuid}')
+        elif _HEX_SEGMENT.match(segment):
+            segments.append('{hex}')
+        else:
+            segments.append(segment)
+    return '/'.join(segments)
+
+
+def url_pattern(url):
+    """
+    Builds the dedup pattern of a URL: scheme, host, path template and sorted parameter names.
+
+    URLs with the same pattern expose the same injection points, e.g.
+    http://x/item.php?id=1 and http://x/item.php?id=2 both map to 'http://x/item.php?id'.
+    The scheme is kept because http:// and https:// are often served by different stacks.
+
+    Args:
+        url (str): The URL to normalize.
+
+    Returns:
+        str: The pattern key.
+    """
+    parsed = urlparse(url)
+    scheme = (parsed.scheme or 'http').lower()
+    host = (parsed.hostname or '').lower()
+    if parsed.port and not ((parsed.scheme == 'http' and parsed.port == 80) or (parsed.scheme == 'https' and parsed.port == 443)):
+        host = f"{host}:{parsed.port}"
+    param_names = sorted(parse_qs(parsed.query, keep_blank_values=True).keys())
+    return f"{scheme}://{host}{path_template(parsed.path)}?{'&'.join(param_names)}"
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Memory is decided up front from the expected number of items and the acceptable
+    false-positive rate, so it does not grow with the input. A false positive here
+    means a URL is wrongly treated as already seen and skipped.
+    """
+
+    def __init__(self, capacity=1000000, error_rate=0.001):
+        """
+        Args:
+            capacity (int, optional): Expected number of distinct items.
+            error_rate (float, optional): Target false-positive probability at capacity.
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item):
+        # Double hashing (Kirsch-Mitzenmacher) from one 128-bit digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def add(self, item):
+        """
+        Adds an item.
+
+        Returns:
+            bool: True if the item was (probably) not present before.
+        """
+        added = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                added = True
+        return added
+
+
+class _DigestCounter:
+    """
+    Exact per-pattern counter that stores 8-byte digests instead of full pattern strings.
+
+    Each pattern costs about 100 bytes (digest, counter and dict slot), so 1M patterns take
+    about 100 MB. Once `max_patterns` are stored, new patterns go to a Bloom counter sized for
+    ten times as many (about 18 MB for 1M), and memory stops growing.
+    """
+
+    def __init__(self, max_patterns, error_rate):
+        self.max_patterns = max_patterns
+        self.error_rate = error_rate
+        self.counts = {}
+        self.overflow = None # _BloomCounter for patterns beyond max_patterns
+
+    def claim(self, pattern, limit):
+        key = hashlib.blake2b(pattern.encode('utf-8'), digest_size=8).digest()
+        seen = self.counts.get(key)
+        if seen is None and len(self.counts) >= self.max_patterns:
+            if self.overflow is None:
+                self.overflow = _BloomCounter(10 * self.max_patterns * limit, self.error_rate)
+            return self.overflow.claim(pattern, limit)
+        seen = seen or 0
+        if seen >= limit:
+            return False
+        self.counts[key] = seen + 1
+        return True
+
+
+class _BloomCounter:
+    """Per-pattern counter on top of a Bloom filter: representative slot i of a pattern is 'pattern#i'."""
+
+    def __init__(self, capacity, error_rate):
+        self.bloom = BloomFilter(capacity=capacity, error_rate=error_rate)
+
+    def claim(self, pattern, limit):
+        for slot in range(limit):
+            if self.bloom.add(f"{pattern}#{slot}"):
+                return True
+        return False
+
+
+class URLDeduplicator:
+    """
+    Collapses URLs that share an injection-point pattern before they reach the scanners.
+
+    Keeps the first `per_pattern` URLs of every pattern (see url_pattern()) and drops
+    the rest. Two backends are available:
+      - 'hashset': exact, stores an 8-byte digest and a counter per pattern (about 100 bytes
+                   each) for the first `capacity` patterns, then falls back to a Bloom filter.
+      - 'bloom': fixed memory sized from `capacity`/`error_rate`; may drop a tiny
+                 fraction of genuinely new patterns (false positives).
+    """
+
+    def __init__(self, per_pattern=1, backend='hashset', capacity=1000000, error_rate=0.001):
+        """
+        Args:
+            per_pattern (int, optional): Representatives kept per pattern.
+            backend (str, optional): 'hashset' or 'bloom'.
+            capacity (int, optional): Expected distinct patterns x per_pattern (bloom); most patterns
+                                      stored exactly (hashset).
+            error_rate (float, optional): False-positive rate at capacity (bloom, and hashset overflow).
+        """
+        if per_pattern < 1:
+            raise ValueError("per_pattern must be at least 1")
+        self.per_pattern = per_pattern
+        if backend == 'bloom':
+            self._counter = _BloomCounter(capacity, error_rate)
+        elif backend == 'hashset':
+            self._counter = _DigestCounter(capacity, error_rate)
+        else:
+            raise ValueError(f"Unknown dedup backend: {backend}")
+        self.backend = backend
+        self.seen = 0
+        self.kept = 0
+
+    def add(self, url):
+        """
+        Offers a URL to the deduplicator.
+
+        Returns:
+            bool: True if the URL should be scanned, False if its pattern is already covered.
+        """
+        self.seen += 1
+        if self._counter.claim(url_pattern(url), self.per_pattern):
+            self.kept += 1
+            return True
+        return False
+
+    def filter(self, urls):
+        """Lazily yields the URLs from an iterable that should be scanned."""
+        for url in urls:
+            if self.add(url):
+                yield url
+
+    @property
+    def dropped(self):
+        return self.seen - self.kept
+
+
+if __name__ == '__main__':
+    print("[*] URLDeduplicator Test Suite")
+
+    sample_urls = [
+        "http://shop.test/item.php?id=1",
+        "http://shop.test/item.php?id=2",
+        "http://shop.test/item.php?id=3&ref=home",
+        "http://shop.test/item.php?ref=mail&id=4",
+        "http://shop.test/users/42/orders?sort=asc",
+        "http://shop.test/users/43/orders?sort=desc",
+        "http://shop.test/doc/0b6f2a1e-0c1d-4a44-9d9c-3b1f1e2d3c4b?v=1",
+        "http://SHOP.test:80/item.php?id=5",
+        "https://shop.test/item.php?id=6", # Same path over TLS: its own pattern
+    ]
+
+    print("\n--- Patterns ---")
+    for url in sample_urls:
+        print(f"  {url} -> {url_pattern(url)}")
+
+    for backend in ('hashset', 'bloom'):
+        for per_pattern in (1, 2):
+            dedup = URLDeduplicator(per_pattern=per_pattern, backend=backend, capacity=1000)
+            kept = list(dedup.filter(sample_urls))
+            print(f"\n--- backend={backend} per_pattern={per_pattern}: kept {dedup.kept}/{dedup.seen} ---")
+            for url in kept:
+                print(f"  {url}")
+
+    capped = URLDeduplicator(backend='hashset', capacity=100)
+    kept = sum(capped.add(f"http://shop.test/p{i}?id=1") for i in range(1000))
+    print(f"\n--- hashset capped at 100 patterns: kept {kept}/1000 distinct, {len(capped._counter.counts)} stored exactly ---")
+
+    print("\n--- Bloom filter sizing ---")
+    bloom = BloomFilter(capacity=1000000, error_rate=0.001)
+    print(f"  1M items @ 0.1%: {len(bloom.bits) / 1024 / 1024:.2f} MiB, {bloom.num_hashes} hashes")
+
+    print("\n[*] URLDeduplicator Test Suite Finished.")
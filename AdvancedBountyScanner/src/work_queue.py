@@ -0,0 +1,574 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+
+def compute_config_hash(settings):
+    """
+    Computes a stable hash of a settings dictionary.
+
+    Args:
+        settings (dict): The settings to hash (e.g., ConfigManager.settings).
+
+    Returns:
+        str: A short hex digest that identifies this exact configuration.
+    """
+    canonical = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+class SQLiteTaskQueue:
+    """
+    Durable scan task queue backed by a local SQLite database.
+
+    The coordinator enqueues one task per URL (with the scanner set and the hash of the
+    configuration it was created with). Workers lease tasks for a visibility timeout;
+    a lease that is not completed in time becomes visible again so another worker can
+    pick the task up. Findings are written back into the same database.
+
+    Any store offering the same methods (enqueue/lease/complete/fail/...) can be
+    dropped in place of this class, e.g. one talking to a Redis-protocol server.
+    """
+
+    def __init__(self, db_path, visibility_timeout=300, max_attempts=3):
+        """
+        Initializes the queue and creates the schema if needed.
+
+        Args:
+            db_path (str): Path to the SQLite database file shared by coordinator and workers.
+            visibility_timeout (int, optional): Seconds a leased task stays invisible to other workers.
+            max_attempts (int, optional): Leases allowed per task before it is marked as failed.
+        """
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        # isolation_level=None: we issue BEGIN IMMEDIATE ourselves so leases are atomic across processes
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS configs (
+                config_hash TEXT PRIMARY KEY,
+                settings    TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS tasks (
+                id            INTEGER PRIMARY KEY AUTOINCREMENT,
+                url           TEXT NOT NULL,
+                scans         TEXT NOT NULL,
+                config_hash   TEXT NOT NULL,
+                status        TEXT NOT NULL DEFAULT 'pending',
+                worker_id     TEXT,
+                lease_expires REAL,
+                attempts      INTEGER NOT NULL DEFAULT 0,
+                error         TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, lease_expires);
+            CREATE TABLE IF NOT EXISTS findings (
+                id      INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id INTEGER NOT NULL,
+                finding TEXT NOT NULL
+            );
+        """)
+
+    def close(self):
+        """Closes the underlying database connection."""
+        self.conn.close()
+
+    # --- Coordinator side ---
+
+    def register_config(self, settings):
+        """
+        Stores a configuration snapshot so workers can run with identical settings.
+
+        Args:
+            settings (dict): The effective settings of the coordinator.
+
+        Returns:
+            str: The config hash to attach to tasks.
+        """
+        config_hash = compute_config_hash(settings)
+        self.conn.execute(
+            "INSERT OR IGNORE INTO configs (config_hash, settings) VALUES (?, ?)",
+            (config_hash, json.dumps(settings, default=str))
+        )
+        return config_hash
+
+    def get_config(self, config_hash):
+        """
+        Returns the settings dictionary registered under config_hash, or None.
+        """
+        row = self.conn.execute("SELECT settings FROM configs WHERE config_hash = ?", (config_hash,)).fetchone()
+        return json.loads(row['settings']) if row else None
+
+    def enqueue(self, url, scans, config_hash):
+        """
+        Adds a single scan task.
+
+        Args:
+            url (str): The URL to scan.
+            scans (list): Scan types to run against the URL (e.g., ['sqli', 'xss']).
+            config_hash (str): Hash returned by register_config().
+
+        Returns:
+            int: The id of the new task.
+        """
+        cursor = self.conn.execute(
+            "INSERT INTO tasks (url, scans, config_hash) VALUES (?, ?, ?)",
+            (url, json.dumps(list(scans)), config_hash)
+        )
+        return cursor.lastrowid
+
+    def enqueue_many(self, urls, scans, config_hash):
+        """
+        Adds one task per URL in a single transaction.
+
+        Returns:
+            int: Number of tasks enqueued.
+        """
+        scans_json = json.dumps(list(scans))
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.conn.executemany(
+                "INSERT INTO tasks (url, scans, config_hash) VALUES (?, ?, ?)",
+                ((url, scans_json, config_hash) for url in urls)
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount
+
+    def _retire_exhausted(self, now):
+        # Expired leases that are out of attempts will never succeed; mark them failed.
+        self.conn.execute("""
+            UPDATE tasks SET status = 'failed', error = 'max attempts exceeded'
+            WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?
+        """, (now, self.max_attempts))
+
+    def counts(self):
+        """
+        Returns task counts per status. Leases that have expired are reported as 'pending',
+        or retired as 'failed' first if the task has no attempts left.
+
+        Returns:
+            dict: e.g. {'pending': 10, 'leased': 2, 'done': 40, 'failed': 0, 'cancelled': 0}
+        """
+        now = time.time()
+        self._retire_exhausted(now) # Otherwise a task whose last worker died would stay 'pending' forever
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0, 'cancelled': 0}
+        rows = self.conn.execute("""
+            SELECT CASE WHEN status = 'leased' AND lease_expires < ? THEN 'pending' ELSE status END AS s,
+                   COUNT(*) AS n
+            FROM tasks GROUP BY s
+        """, (now,)).fetchall()
+        for row in rows:
+            counts[row['s']] = row['n']
+        return counts
+
+    def is_drained(self):
+        """True when no task is pending or currently leased."""
+        counts = self.counts()
+        return counts['pending'] == 0 and counts['leased'] == 0
+
+    def cancel_pending(self):
+        """
+        Marks every task that is pending (or whose lease expired) as 'cancelled', e.g. once the
+        run budget is spent. Tasks leased right now are left to finish.
+
+        Returns:
+            int: Number of tasks cancelled.
+        """
+        return self.conn.execute("""
+            UPDATE tasks SET status = 'cancelled', lease_expires = NULL, error = 'run budget spent'
+            WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+        """, (time.time(),)).rowcount
+
+    def iter_findings(self, after_id=0):
+        """
+        Yields (finding_row_id, finding_dict) for stored findings with id > after_id.
+        """
+        rows = self.conn.execute(
+            "SELECT id, finding FROM findings WHERE id > ? ORDER BY id", (after_id,)
+        )
+        for row in rows:
+            yield row['id'], json.loads(row['finding'])
+
+    # --- Worker side ---
+
+    def lease(self, worker_id, visibility_timeout=None):
+        """
+        Atomically leases the next available task.
+
+        A task is available when it is pending, or when its previous lease expired.
+        Tasks that already used up max_attempts are marked 'failed' instead of being leased.
+
+        Args:
+            worker_id (str): Identifier of the leasing worker.
+            visibility_timeout (int, optional): Overrides the queue's default lease length.
+
+        Returns:
+            dict or None: The task ({'id', 'url', 'scans', 'config_hash', 'attempts'}) or None if nothing is available.
+        """
+        timeout = visibility_timeout if visibility_timeout is not None else self.visibility_timeout
+        now = time.time()
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._retire_exhausted(now)
+            row = self.conn.execute("""
+                SELECT id, url, scans, config_hash, attempts FROM tasks
+                WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                ORDER BY id LIMIT 1
+            """, (now,)).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute("""
+                UPDATE tasks SET status = 'leased', worker_id = ?, lease_expires = ?, attempts = attempts + 1
+                WHERE id = ?
+            """, (worker_id, now + timeout, row['id']))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        return {
+            'id': row['id'],
+            'url': row['url'],
+            'scans': json.loads(row['scans']),
+            'config_hash': row['config_hash'],
+            'attempts': row['attempts'] + 1,
+        }
+
+    def extend_lease(self, task_id, worker_id, visibility_timeout=None):
+        """
+        Pushes the lease deadline of a task forward (heartbeat for long tasks).
+
+        Returns:
+            bool: False if the worker no longer owns the lease.
+        """
+        timeout = visibility_timeout if visibility_timeout is not None else self.visibility_timeout
+        cursor = self.conn.execute(
+            "UPDATE tasks SET lease_expires = ? WHERE id = ? AND worker_id = ? AND status = 'leased'",
+            (time.time() + timeout, task_id, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, task_id, worker_id, findings):
+        """
+        Marks a leased task as done and stores its findings.
+
+        If the lease expired and another worker took the task over, the result is
+        discarded so findings are not recorded twice.
+
+        Returns:
+            bool: True if the result was accepted.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.conn.execute(
+                "UPDATE tasks SET status = 'done', lease_expires = NULL WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (task_id, worker_id)
+            )
+            if cursor.rowcount != 1:
+                self.conn.execute("ROLLBACK")
+                return False
+            if findings:
+                self.conn.executemany(
+                    "INSERT INTO findings (task_id, finding) VALUES (?, ?)",
+                    ((task_id, json.dumps(f)) for f in findings)
+                )
+            self.conn.execute("COMMIT")
+            return True
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def cancel(self, task_id, worker_id):
+        """Gives up a leased task without running it (the run budget is spent); it is not retried."""
+        cursor = self.conn.execute(
+            "UPDATE tasks SET status = 'cancelled', lease_expires = NULL, error = 'run budget spent' "
+            "WHERE id = ? AND worker_id = ? AND status = 'leased'",
+            (task_id, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, task_id, worker_id, error):
+        """
+        Releases a task after an error. It is retried until max_attempts is reached.
+        """
+        self.conn.execute("""
+            UPDATE tasks
+            SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                error = ?, lease_expires = NULL
+            WHERE id = ? AND worker_id = ? AND status = 'leased'
+        """, (self.max_attempts, str(error), task_id, worker_id))
+
+
+class SQLiteHostRateLimiter:
+    """
+    Central per-host rate limiter shared by all workers through the queue database.
+
+    Each host has a 'next free slot' timestamp. A request reserves the next slot
+    atomically and then sleeps until it arrives, so the combined rate of every worker
+    stays at or below `rate_limit` requests/second per host, however many workers run.
+    """
+
+    def __init__(self, db_path, rate_limit):
+        """
+        Args:
+            db_path (str): Path to the shared SQLite database (usually the queue database).
+            rate_limit (float): Requests per second allowed per host. 0 disables limiting.
+        """
+        self.rate_limit = float(rate_limit or 0)
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS host_slots (
+                host      TEXT PRIMARY KEY,
+                next_slot REAL NOT NULL
+            )
+        """)
+
+    def reserve(self, host):
+        """
+        Reserves the next request slot for host.
+
+        Returns:
+            float: Seconds the caller has to wait before sending its request.
+        """
+        if self.rate_limit <= 0 or not host:
+            return 0.0
+        interval = 1.0 / self.rate_limit
+        now = time.time()
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute("SELECT next_slot FROM host_slots WHERE host = ?", (host,)).fetchone()
+            slot = max(now, row[0]) if row else now
+            self.conn.execute(
+                "INSERT OR REPLACE INTO host_slots (host, next_slot) VALUES (?, ?)",
+                (host, slot + interval)
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return max(0.0, slot - now)
+
+    def wait(self, host):
+        """Blocks until the caller may send a request to host."""
+        delay = self.reserve(host)
+        if delay > 0:
+            time.sleep(delay)
+
+    def close(self):
+        self.conn.close()
+
+
+class SQLiteRunBudget:
+    """
+    Run budget of a distributed scan, shared by the coordinator and every worker.
+
+    The coordinator stores the run's limits with start(); the deadline is wall-clock
+    time, so it holds on every machine. Workers reserve requests in blocks and add the
+    bytes they received (ScanBudget does both when given this object as shared_run), so
+    a request or byte cap covers all workers together instead of each one. Like
+    SQLiteHostRateLimiter, it keeps its state in the queue database and uses its own
+    connection.
+    """
+
+    def __init__(self, db_path, config_hash):
+        """
+        Args:
+            db_path (str): Path to the shared SQLite database (usually the queue database).
+            config_hash (str): The run's config hash; each run has its own counters.
+        """
+        self.config_hash = config_hash
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS run_budgets (
+                config_hash  TEXT PRIMARY KEY,
+                started      REAL NOT NULL,
+                deadline     REAL,
+                max_requests INTEGER,
+                max_bytes    INTEGER,
+                requests     INTEGER NOT NULL DEFAULT 0,
+                bytes        INTEGER NOT NULL DEFAULT 0,
+                skipped      INTEGER NOT NULL DEFAULT 0,
+                exhausted    TEXT
+            )
+        """)
+
+    def start(self, limits):
+        """
+        Starts the run's budget with limits {'seconds', 'requests', 'bytes'} (None/0 = unlimited),
+        resetting its counters.
+
+        Returns:
+            bool: False (and nothing is stored) when no limit is set.
+        """
+        limits = limits or {}
+        if not any(limits.get(key) for key in ('seconds', 'requests', 'bytes')):
+            self.conn.execute("DELETE FROM run_budgets WHERE config_hash = ?", (self.config_hash,))
+            return False
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO run_budgets (config_hash, started, deadline, max_requests, max_bytes) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (self.config_hash, now, now + limits['seconds'] if limits.get('seconds') else None,
+             limits.get('requests') or None, limits.get('bytes') or None)
+        )
+        return True
+
+    @property
+    def enabled(self):
+        """True when the coordinator started a budget for this run."""
+        return self._row() is not None
+
+    def _row(self):
+        return self.conn.execute("SELECT * FROM run_budgets WHERE config_hash = ?", (self.config_hash,)).fetchone()
+
+    @staticmethod
+    def _spent(row, now):
+        if row['exhausted']:
+            return row['exhausted']
+        if row['deadline'] is not None and now >= row['deadline']:
+            return 'seconds'
+        if row['max_requests'] and row['requests'] >= row['max_requests']:
+            return 'requests'
+        if row['max_bytes'] and row['bytes'] >= row['max_bytes']:
+            return 'bytes'
+        return None
+
+    def reserve(self, count):
+        """
+        Reserves up to `count` requests.
+
+        Returns:
+            int: Requests granted; 0 once a limit is spent.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._row()
+            if row is None:
+                granted = count
+            elif self._spent(row, time.time()):
+                self.conn.execute("UPDATE run_budgets SET exhausted = ? WHERE config_hash = ?",
+                                  (self._spent(row, time.time()), self.config_hash))
+                granted = 0
+            else:
+                granted = min(count, row['max_requests'] - row['requests']) if row['max_requests'] else count
+                self.conn.execute("UPDATE run_budgets SET requests = requests + ? WHERE config_hash = ?",
+                                  (granted, self.config_hash))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return granted
+
+    def add_bytes(self, count):
+        """Adds received body bytes."""
+        self.conn.execute("UPDATE run_budgets SET bytes = bytes + ? WHERE config_hash = ?", (count, self.config_hash))
+
+    def release(self, unused_requests, skipped=0):
+        """Returns reserved requests that were not sent, and counts requests refused by a worker."""
+        self.conn.execute(
+            "UPDATE run_budgets SET requests = MAX(0, requests - ?), skipped = skipped + ? WHERE config_hash = ?",
+            (unused_requests, skipped, self.config_hash)
+        )
+
+    def exhausted(self):
+        """Returns the name of the first limit that ran out ('seconds', 'requests', 'bytes'), or None."""
+        row = self._row()
+        return self._spent(row, time.time()) if row is not None else None
+
+    def report(self):
+        """Returns the run's usage in the shape of ScanBudget.report() (per-host/module budgets are per worker)."""
+        row = self._row()
+        now = time.time()
+        run = {'elapsed': 0.0, 'requests': 0, 'bytes': 0, 'skipped': 0, 'exhausted': None, 'limits': {}}
+        if row is not None:
+            run = {
+                'elapsed': round(now - row['started'], 1),
+                'requests': row['requests'],
+                'bytes': row['bytes'],
+                'skipped': row['skipped'],
+                'exhausted': self._spent(row, now),
+                'limits': {k: v for k, v in (('seconds', row['deadline'] and round(row['deadline'] - row['started'], 1)),
+                                             ('requests', row['max_requests']), ('bytes', row['max_bytes'])) if v},
+            }
+        return {'run': run, 'hosts': {}, 'modules': {}}
+
+    def close(self):
+        self.conn.close()
+
+
+def new_worker_id():
+    """Returns a worker identifier that is unique across machines."""
+    return f"{os.uname().nodename if hasattr(os, 'uname') else 'worker'}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+if __name__ == '__main__':
+    print("[*] SQLiteTaskQueue Test Suite")
+    test_db = 'temp_queue_test.db'
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(test_db + suffix):
+            os.remove(test_db + suffix)
+
+    queue = SQLiteTaskQueue(test_db, visibility_timeout=1, max_attempts=2)
+    cfg_hash = queue.register_config({'timeout': 5, 'rate_limit': 2})
+    print(f"Config hash: {cfg_hash}")
+    queue.enqueue_many(["http://a.test/?id=1", "http://b.test/?q=x"], ['sqli', 'xss'], cfg_hash)
+    print(f"Counts after enqueue: {queue.counts()}")
+
+    task = queue.lease('worker-1')
+    print(f"Leased: {task}")
+    print(f"Complete accepted: {queue.complete(task['id'], 'worker-1', [{'url': task['url'], 'type': 'error-based'}])}")
+
+    task = queue.lease('worker-1')
+    print(f"Leased (will expire): {task['url']}")
+    time.sleep(1.1)
+    stolen = queue.lease('worker-2')
+    print(f"Re-leased by worker-2 after visibility timeout: {stolen['url']} (attempt {stolen['attempts']})")
+    print(f"Stale complete from worker-1 accepted (expect False): {queue.complete(task['id'], 'worker-1', [])}")
+    print(f"Complete from worker-2 accepted (expect True): {queue.complete(stolen['id'], 'worker-2', [])}")
+    print(f"Counts: {queue.counts()}, drained: {queue.is_drained()}")
+    print(f"Findings: {[f for _, f in queue.iter_findings()]}")
+
+    limiter = SQLiteHostRateLimiter(test_db, rate_limit=10)
+    delays = [round(limiter.reserve('a.test'), 2) for _ in range(4)]
+    print(f"Reserved delays at 10 req/s (expect ~0, 0.1, 0.2, 0.3): {delays}")
+
+    from budget import ScanBudget
+    run_budget = SQLiteRunBudget(test_db, cfg_hash)
+    run_budget.start({'requests': 40})
+    workers = [ScanBudget(shared_run=SQLiteRunBudget(test_db, cfg_hash)) for _ in range(3)]
+    allowed = [sum(budget.allow('a.test') for _ in range(30)) for budget in workers]
+    for budget in workers:
+        budget.close()
+    print(f"Shared budget of 40 requests, 3 workers asking 30 each: allowed {allowed} (total {sum(allowed)}), "
+          f"exhausted: {run_budget.exhausted()}, report: {run_budget.report()['run']}")
+    queue.enqueue_many(["http://c.test/?id=2", "http://d.test/?id=3"], ['sqli'], cfg_hash)
+    print(f"Budget spent, pending tasks cancelled: {queue.cancel_pending()}, counts: {queue.counts()}")
+
+    run_budget.close()
+    limiter.close()
+    queue.close()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(test_db + suffix):
+            os.remove(test_db + suffix)
+    print("\n[*] SQLiteTaskQueue Test Suite Finished.")
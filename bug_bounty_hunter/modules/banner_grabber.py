@@ -0,0 +1,234 @@
+import asyncio
+import collections
+import re
+import ssl
+
+# Ports whose services normally speak TLS from the first byte.
+TLS_PORTS = frozenset((443, 465, 636, 853, 989, 990, 992, 993, 994, 995, 2083, 2087, 4443, 5986, 8443, 9443))
+
+# Ports whose services send a greeting before the client says anything (SSH, FTP, SMTP, ...).
+GREETING_PORTS = frozenset((21, 22, 23, 25, 110, 119, 143, 465, 587, 993, 995, 2222, 3306, 5900, 5901, 6667))
+
+# Request sent when the service waits for the client; HTTP is by far the most common, and
+# most other services answer an unexpected line with an error that still identifies them.
+HTTP_PROBE = b"HEAD / HTTP/1.0\r\nUser-Agent: Mozilla/5.0\r\nAccept: */*\r\n\r\n"
+PROBES = {
+    6379: b"PING\r\n", # Redis
+    11211: b"version\r\n", # Memcached
+}
+
+# (service, pattern over the raw reply, group holding the product, group holding the version), in match order.
+SIGNATURES = tuple((service, re.compile(pattern, re.IGNORECASE | re.MULTILINE), product, version) for service, pattern, product, version in (
+    ('ssh', rb'^SSH-[\d.]+-(([A-Za-z][\w.-]*?)[_-]([\w.]+)|\S+)', 2, 3),
+    ('http', rb'^HTTP/[\d.]+ \d{3}[\s\S]*?^Server: *([^/\r\n ]+)(?:/([\w.-]+))?', 1, 2),
+    ('http', rb'^HTTP/[\d.]+ \d{3}', None, None),
+    ('ftp', rb'^220[ -].*?\b(vsFTPd|ProFTPD|Pure-FTPd|FileZilla Server|Microsoft FTP Service)\b[ v]*([\d.]+[a-z]?)?', 1, 2),
+    ('ftp', rb'^220[ -].*\bftp\b', None, None),
+    ('smtp', rb'^220[ -]\S+ .*?\b(Postfix|Exim|Sendmail|Microsoft ESMTP MAIL Service|OpenSMTPD)\b[ v]*([\d.]+)?', 1, 2),
+    ('smtp', rb'^220[ -]\S+ .*\bE?SMTP\b', None, None),
+    ('pop3', rb'^\+OK\b.*?\b(Dovecot|Courier|Cyrus)?', 1, None),
+    ('imap', rb'^\* OK\b.*?\b(Dovecot|Courier|Cyrus)?', 1, None),
+    ('mysql', rb'^.\x00\x00\x00\x0a(\d+\.\d+\.[\w.-]+)\x00', None, 1),
+    ('vnc', rb'^RFB (\d{3}\.\d{3})\n', None, 1),
+    ('redis', rb'^(?:\+PONG|-NOAUTH|-ERR)', None, None),
+    ('memcached', rb'^VERSION ([\d.]+)', None, 1),
+    ('telnet', rb'^\xff[\xfb-\xfe]', None, None),
+))
+
+
+class Fingerprint(collections.namedtuple('Fingerprint', 'service product version banner tls')):
+    """
+    What answered on a port: service is the matched signature's name (None when nothing
+    matched or nothing was read), banner the first line of the reply as text.
+    """
+    __slots__ = ()
+
+    def as_dict(self):
+        return {key: value for key, value in self._asdict().items() if value not in (None, False, '')}
+
+
+def match_signature(data):
+    """Returns (service, product, version) of the first signature matching a reply, or (None, None, None)."""
+    for service, pattern, product_group, version_group in SIGNATURES:
+        match = pattern.search(data)
+        if match:
+            product = match.group(product_group) if product_group else None
+            version = match.group(version_group) if version_group else None
+            return (service, product.decode('ascii', 'replace') if product else None,
+                    version.decode('ascii', 'replace') if version else None)
+    return None, None, None
+
+
+def _first_line(data, limit=200):
+    line = data.split(b'\n', 1)[0].strip()
+    return ''.join(chr(b) if 32 <= b < 127 else '.' for b in line[:limit])
+
+
+class BannerGrabber:
+    """
+    Reads what services on open ports say, and matches it against SIGNATURES.
+
+    Greeting services are read right after the connect; the others get a probe first
+    (HEAD / for HTTP, PING for Redis, ...), and TLS ports are wrapped in TLS before that
+    without verifying certificates. At most `max_bytes` are read with short timeouts,
+    so a grab costs about one round trip, and up to `concurrency` grabs run at once,
+    alongside the connect scan. Fingerprints are cached per (ip, port), so an address
+    reached through several host names is grabbed once.
+    """
+
+    def __init__(self, concurrency=200, timeout=2.0, read_timeout=1.0, max_bytes=2048,
+                 greeting_ports=GREETING_PORTS, tls_ports=TLS_PORTS):
+        """
+        Args:
+            concurrency (int, optional): Grabs in flight at once.
+            timeout (float, optional): Seconds for the connect and TLS handshake.
+            read_timeout (float, optional): Seconds to wait for the greeting or the reply to the probe.
+            max_bytes (int, optional): Most bytes read from a service.
+            greeting_ports (set, optional): Ports read before sending a probe.
+            tls_ports (set, optional): Ports tried with TLS first.
+        """
+        self.greeting_ports = frozenset(greeting_ports)
+        self.tls_ports = frozenset(tls_ports)
+        self.timeout = timeout
+        self.read_timeout = read_timeout
+        self.max_bytes = max_bytes
+        self.cache = {} # (ip, port) -> Fingerprint
+        self._inflight = {} # (ip, port) -> Future of a grab in progress
+        self.stats = collections.Counter()
+        self.concurrency = concurrency
+        self._semaphore = None
+        self._loop = None # The semaphore belongs to one event loop; scans may run several in turn
+        self._tls = ssl.create_default_context()
+        self._tls.check_hostname = False
+        self._tls.verify_mode = ssl.CERT_NONE
+
+    async def _exchange(self, ip, port, tls):
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(ip, port, ssl=self._tls if tls else None, limit=self.max_bytes), self.timeout)
+        try:
+            data = b''
+            if port in self.greeting_ports:
+                data = await self._read(reader)
+            if not data:
+                writer.write(PROBES.get(port, HTTP_PROBE))
+                await writer.drain()
+                data = await self._read(reader)
+            return data
+        finally:
+            writer.close()
+
+    async def _read(self, reader):
+        data = b''
+        try:
+            while len(data) < self.max_bytes:
+                chunk = await asyncio.wait_for(reader.read(self.max_bytes - len(data)), self.read_timeout)
+                if not chunk:
+                    break
+                data += chunk
+                if b'\n' in chunk and not data.startswith(b'HTTP/'): # One greeting line is enough
+                    break
+                if b'\r\n\r\n' in data: # End of the HTTP headers
+                    break
+        except asyncio.TimeoutError:
+            pass
+        return data
+
+    async def grab(self, ip, port):
+        """Returns the Fingerprint of ip:port, grabbing it unless it is cached or already being grabbed."""
+        key = (ip, port)
+        if key in self.cache:
+            self.stats['cached'] += 1
+            return self.cache[key]
+        if key in self._inflight:
+            self.stats['cached'] += 1
+            return await asyncio.shield(self._inflight[key])
+        future = self._inflight[key] = asyncio.ensure_future(self._grab(ip, port))
+        try:
+            return await future
+        finally:
+            del self._inflight[key]
+
+    async def _grab(self, ip, port):
+        key = (ip, port)
+        if self._loop is not asyncio.get_running_loop():
+            self._loop, self._semaphore = asyncio.get_running_loop(), asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            tls = port in self.tls_ports
+            try:
+                data = await self._exchange(ip, port, tls)
+            except (ssl.SSLError, ConnectionResetError) if tls else ():
+                tls = False # Not TLS after all
+                data = await self._exchange(ip, port, tls)
+        if data:
+            service, product, version = match_signature(data)
+            fingerprint = Fingerprint(service, product, version, _first_line(data), tls)
+        else:
+            fingerprint = Fingerprint(None, None, None, None, tls)
+        self.stats['identified' if fingerprint.service else 'unidentified'] += 1
+        self.cache[key] = fingerprint
+        return fingerprint
+
+    async def try_grab(self, ip, port):
+        """grab(), but connection errors give an empty Fingerprint (not cached) instead of raising."""
+        try:
+            return await self.grab(ip, port)
+        except (OSError, asyncio.TimeoutError, ssl.SSLError):
+            self.stats['failed'] += 1
+            return Fingerprint(None, None, None, None, False)
+
+
+if __name__ == '__main__':
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    print("[*] BannerGrabber Example")
+    samples = {
+        b"SSH-2.0-OpenSSH_8.9p1 Ubuntu-3ubuntu0.6\r\n": ('ssh', 'OpenSSH', '8.9p1'),
+        b"220 mail.example.com ESMTP Postfix (Ubuntu)\r\n": ('smtp', 'Postfix', None),
+        b"220 (vsFTPd 3.0.5)\r\n": ('ftp', 'vsFTPd', '3.0.5'),
+        b"HTTP/1.1 200 OK\r\nDate: x\r\nServer: nginx/1.24.0\r\n\r\n": ('http', 'nginx', '1.24.0'),
+        b"J\x00\x00\x00\x0a8.0.36-0ubuntu0.22.04.1\x00": ('mysql', None, '8.0.36-0ubuntu0.22.04.1'),
+        b"RFB 003.008\n": ('vnc', None, '003.008'),
+        b"-NOAUTH Authentication required.\r\n": ('redis', None, None),
+    }
+    for data, expected in samples.items():
+        print(f"  {_first_line(data)[:40]!r:<44} -> {match_signature(data)} {'ok' if match_signature(data) == expected else 'MISMATCH'}")
+
+    class Handler(BaseHTTPRequestHandler):
+        server_version = 'DemoHTTP/1.0'
+
+        def do_HEAD(self):
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+    http_server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+
+    async def ssh_like(reader, writer):
+        writer.write(b"SSH-2.0-OpenSSH_9.6\r\n")
+        await writer.drain()
+        writer.close()
+
+    async def silent(reader, writer):
+        await reader.read() # Until the grabber gives up and closes
+        writer.close()
+
+    async def main():
+        ssh_server = await asyncio.start_server(ssh_like, '127.0.0.1', 0)
+        silent_server = await asyncio.start_server(silent, '127.0.0.1', 0)
+        ssh_port = ssh_server.sockets[0].getsockname()[1]
+        grabber = BannerGrabber(read_timeout=0.5, greeting_ports=GREETING_PORTS | {ssh_port})
+        targets = [('127.0.0.1', http_server.server_address[1]), ('127.0.0.1', ssh_port),
+                   ('127.0.0.1', silent_server.sockets[0].getsockname()[1]), ('127.0.0.1', 1)]
+        started = time.monotonic()
+        results = await asyncio.gather(*(grabber.try_grab(ip, port) for ip, port in targets * 2))
+        print(f"  {len(results)} grabs in {time.monotonic() - started:.2f}s, {dict(grabber.stats)}")
+        for (ip, port), fingerprint in zip(targets, results):
+            print(f"    {ip}:{port:<6} {fingerprint.as_dict()}")
+        ssh_server.close()
+        silent_server.close()
+    asyncio.run(main())
+    http_server.shutdown()
@@ -0,0 +1,585 @@
+import array
+import asyncio
+import bisect
+import collections
+import errno
+import itertools
+import ipaddress
+import os
+import random
+import socket
+import time
+
+try:
+    import resource
+except ImportError: # Not available on Windows
+    resource = None
+
+# The ports scan_ports has always tried, in that order.
+COMMON_PORTS = (21, 22, 23, 25, 53, 80, 110, 143, 443, 445, 3306, 3389, 5900, 8000, 8080, 8443)
+
+# Most frequently open TCP ports on the internet, most frequent first; 'top<N>' takes the
+# first N and continues with the remaining ports in ascending order beyond this list.
+TOP_PORTS = (
+    80, 23, 443, 21, 22, 25, 3389, 110, 445, 139, 143, 53, 135, 3306, 8080, 1723, 111, 995, 993, 5900,
+    1025, 587, 8888, 199, 1720, 465, 548, 113, 81, 6001, 10000, 514, 5060, 179, 1026, 2000, 8443, 8000, 32768, 554,
+    26, 1433, 49152, 2001, 515, 8008, 49154, 1027, 5666, 646, 5000, 5631, 631, 49153, 8081, 2049, 88, 79, 5800, 106,
+    2121, 1110, 49155, 6000, 513, 990, 5357, 427, 49156, 543, 544, 5101, 144, 7, 389, 8009, 3128, 444, 9999, 5009,
+    7070, 5190, 3000, 5432, 1900, 3986, 13, 1029, 9, 5051, 6646, 49157, 1028, 873, 1755, 2717, 4899, 9100, 119, 37,
+)
+
+OPEN, CLOSED, FILTERED, ERROR = 'open', 'closed', 'filtered', 'error'
+
+# connect() errors that mean nothing answered for the port (dropped, or an ICMP error on the way)
+_UNREACHABLE = {errno.EHOSTUNREACH, errno.ENETUNREACH, getattr(errno, 'EHOSTDOWN', errno.EHOSTUNREACH)}
+
+
+class PortResult(collections.namedtuple('PortResult', 'host port status rtt error attempts')):
+    """
+    Outcome of probing a port: status is 'open', 'closed' (RST), 'filtered' (no answer or
+    unreachable) or 'error'; rtt is the seconds until the SYN-ACK or RST (None otherwise);
+    attempts counts the connects, including retries after timeouts.
+    """
+    __slots__ = ()
+
+
+class RTTEstimator:
+    """
+    Smoothed round-trip time of one host, as TCP keeps it (RFC 6298).
+
+    Every SYN-ACK or RST is a sample; the connect timeout is SRTT + 4 * RTTVAR, so it
+    settles just above the host's real latency and widens when the latency jitters.
+    """
+    __slots__ = ('srtt', 'rttvar', 'samples')
+
+    def __init__(self):
+        self.srtt = None
+        self.rttvar = None
+        self.samples = 0
+
+    def update(self, rtt):
+        if self.srtt is None:
+            self.srtt, self.rttvar = rtt, rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        self.samples += 1
+
+    def timeout(self, initial, minimum, maximum):
+        """Connect timeout: `initial` until the first sample, then SRTT + 4 * RTTVAR within [minimum, maximum]."""
+        if self.srtt is None:
+            return initial
+        return min(maximum, max(minimum, self.srtt + 4 * self.rttvar))
+
+
+class HostResult(collections.namedtuple('HostResult', 'address results counts')):
+    """
+    All ports of one host, once its last probe has finished: results holds the PortResults
+    of open ports and errors in port order, counts the number of results per status.
+    """
+    __slots__ = ()
+
+
+def parse_ports(spec):
+    """
+    Parses a port specification into a list of unique ports, in the order given.
+
+    Accepts comma-separated ports and ranges ('22,80,8000-8100'), 'top<N>' (the N most
+    common ports), '-' or 'all' for 1-65535, and 'common' for the classic 16-port list.
+
+    Raises:
+        ValueError: Malformed specs and ports outside 1-65535.
+    """
+    ports = {}
+    for part in str(spec).replace(' ', '').split(','):
+        if not part:
+            continue
+        if part in ('-', 'all'):
+            ports.update(dict.fromkeys(range(1, 65536)))
+        elif part == 'common':
+            ports.update(dict.fromkeys(COMMON_PORTS))
+        elif part.startswith('top'):
+            count = int(part[3:].lstrip('-:') or 100)
+            top = list(TOP_PORTS[:count])
+            if count > len(TOP_PORTS):
+                listed = set(TOP_PORTS)
+                top += [p for p in range(1, 65536) if p not in listed][:count - len(TOP_PORTS)]
+            ports.update(dict.fromkeys(top))
+        elif '-' in part:
+            low, high = part.split('-', 1)
+            low, high = int(low or 1), int(high or 65535)
+            if not 1 <= low <= high <= 65535:
+                raise ValueError(f"invalid port range {part!r}")
+            ports.update(dict.fromkeys(range(low, high + 1)))
+        else:
+            port = int(part)
+            if not 1 <= port <= 65535:
+                raise ValueError(f"invalid port {port}")
+            ports[port] = None
+    if not ports:
+        raise ValueError(f"no ports in {spec!r}")
+    return list(ports)
+
+
+def raise_fd_limit(wanted):
+    """Raises the soft open-files limit towards `wanted`; returns how many sockets may be open at once."""
+    if resource is None:
+        return wanted
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < wanted + 64 and soft != resource.RLIM_INFINITY:
+        target = wanted + 64 if hard == resource.RLIM_INFINITY else min(hard, wanted + 64)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError):
+            pass
+    return max(1, min(wanted, soft - 64)) # Leave descriptors for files, DNS and HTTP sockets
+
+
+def lcg_permutation(n, seed=None):
+    """
+    Yields 0..n-1, each once, in a pseudo-random order without storing them.
+
+    x -> (a * x + c) mod m, with m the next power of two, c odd and a = 1 (mod 4), visits
+    every value below m once (Hull-Dobell); an xorshift scrambles the regular low bits,
+    and values >= n are skipped, which at most doubles the steps.
+    """
+    if n <= 0:
+        return
+    bits = max(2, (n - 1).bit_length())
+    m = 1 << bits
+    mask, shift = m - 1, (bits + 1) // 2
+    rng = random.Random(seed)
+    a = rng.randrange(m // 4) * 4 + 1
+    c = rng.randrange(m // 2) * 2 + 1
+    x = rng.randrange(m)
+    for _ in range(m):
+        x = (a * x + c) & mask
+        value = x ^ (x >> shift)
+        if value < n:
+            yield value
+
+
+class TargetSet:
+    """
+    Hosts to scan, from names, addresses, CIDR ranges and files listing those, indexable.
+
+    Ranges are kept as networks and single IPv4 addresses as 32-bit integers, so a /16
+    costs a few bytes instead of 65536 strings. Host names are resolved when added. Every
+    address is listed once: single addresses (given or resolved) inside a range are
+    dropped, and a range overlapping earlier ones only adds the addresses they miss.
+    """
+
+    def __init__(self, max_addresses=1 << 24, resolve=socket.gethostbyname):
+        """
+        Args:
+            max_addresses (int, optional): Largest range accepted (a /8 by default).
+            resolve (callable, optional): Resolves a host name to an address.
+        """
+        self.max_addresses = max_addresses
+        self.resolve = resolve
+        self.names = {} # address -> host names it was added as
+        self.unresolved = []
+        self._networks = [] # (first host as int, version, count)
+        self._offsets = [] # Index of the first host of each network
+        self._network_hosts = 0
+        self._ipv4 = array.array('I')
+        self._other = [] # IPv6 addresses
+        self._singles = set() # Single addresses added, as ints
+
+    def __len__(self):
+        return self._network_hosts + len(self._ipv4) + len(self._other)
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        if index < self._network_hosts:
+            block = bisect.bisect_right(self._offsets, index) - 1
+            first, version, _ = self._networks[block]
+            return str(ipaddress.ip_address(first + index - self._offsets[block]) if version == 4
+                       else ipaddress.IPv6Address(first + index - self._offsets[block]))
+        index -= self._network_hosts
+        if index < len(self._ipv4):
+            return str(ipaddress.IPv4Address(self._ipv4[index]))
+        return self._other[index - len(self._ipv4)]
+
+    def label(self, address):
+        """The host names an address was added as, or the address itself."""
+        return ', '.join(self.names.get(address, ())) or address
+
+    def add(self, spec):
+        """
+        Adds a host name, an address, a CIDR range ('10.0.0.0/24') or a file with one of those per line.
+
+        Raises:
+            ValueError: If a range is larger than max_addresses.
+        """
+        spec = spec.strip()
+        if os.path.isfile(spec):
+            with open(spec, encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    line = line.split('#', 1)[0].strip()
+                    if line:
+                        self._add_one(line)
+        elif spec:
+            self._add_one(spec)
+
+    def _add_one(self, spec):
+        try:
+            network = ipaddress.ip_network(spec, strict=False)
+        except ValueError:
+            try:
+                address = self.resolve(spec)
+            except (OSError, UnicodeError):
+                self.unresolved.append(spec)
+                return
+            self._add_address(ipaddress.ip_address(address))
+            if spec not in self.names.setdefault(address, []):
+                self.names[address].append(spec)
+            return
+        if network.num_addresses == 1:
+            self._add_address(network.network_address)
+            return
+        first, count = int(network.network_address), network.num_addresses
+        if network.version == 4 and network.prefixlen < 31: # Skip the network and broadcast addresses
+            first, count = first + 1, count - 2
+        if count > self.max_addresses:
+            raise ValueError(f"{spec} has {count} addresses, more than the {self.max_addresses} allowed")
+        pieces = [(first, first + count)]
+        for start, version, size in self._networks: # Leave out what earlier ranges cover
+            if version == network.version:
+                pieces = [piece for low, high in pieces
+                          for piece in ((low, min(high, start)), (max(low, start + size), high)) if piece[0] < piece[1]]
+        for low, high in pieces:
+            self._offsets.append(self._network_hosts)
+            self._networks.append((low, network.version, high - low))
+            self._network_hosts += high - low
+        self._drop_covered_singles(network.version, pieces)
+
+    def _covered(self, value, version):
+        return any(start <= value < start + size for start, net_version, size in self._networks if net_version == version)
+
+    def _drop_covered_singles(self, version, pieces):
+        covered = lambda value: any(low <= value < high for low, high in pieces)
+        if version == 4:
+            if any(covered(value) for value in self._ipv4):
+                self._ipv4 = array.array('I', (value for value in self._ipv4 if not covered(value)))
+        else:
+            self._other = [address for address in self._other if not covered(int(ipaddress.IPv6Address(address)))]
+
+    def _add_address(self, address):
+        key = (int(address) << 1) | (address.version == 6)
+        if key in self._singles or self._covered(int(address), address.version):
+            return
+        self._singles.add(key)
+        if address.version == 4:
+            self._ipv4.append(int(address))
+        else:
+            self._other.append(str(address))
+
+
+class ConnectScanner:
+    """
+    Non-blocking TCP connect scanner.
+
+    Every probe is a non-blocking socket connecting on the event loop, so up to
+    `concurrency` connects are in flight at once instead of one at a time. A SYN-ACK
+    (connect succeeds) means open, a RST (connection refused) closed, and no answer
+    within the timeout filtered. Connections are closed as soon as they are established.
+
+    Timeouts adapt to each host: its first SYN-ACKs and RSTs give an RTT estimate, and
+    later connects wait SRTT + 4 * RTTVAR (see RTTEstimator) instead of a fixed second.
+    Only timed-out probes are retried, with the timeout doubled per attempt. When a
+    retry gets an answer, the first attempt was dropped rather than filtered, and the
+    number of connects in flight is halved (at most once per timeout interval); every
+    answer without a drop grows it again, by one per answer below the threshold where
+    drops were seen and by one per window of answers above it (AIMD).
+
+    Use scan() from a running event loop, or scan_all() from synchronous code.
+    """
+
+    def __init__(self, concurrency=1000, timeout=1.0, min_timeout=0.1, max_timeout=None, retries=1,
+                 min_concurrency=8, adaptive=True):
+        """
+        Args:
+            concurrency (int, optional): Most connects in flight at once (capped by the open-files limit).
+            timeout (float, optional): Seconds to wait for a SYN-ACK or RST before a host's RTT is known
+                                       (and always, without `adaptive`).
+            min_timeout (float, optional): Lower bound of the RTT-derived timeout.
+            max_timeout (float, optional): Upper bound of the RTT-derived and backed-off timeouts (default 3x timeout).
+            retries (int, optional): Retries of probes that timed out.
+            min_concurrency (int, optional): Connects in flight never drop below this after drops.
+            adaptive (bool, optional): Derive timeouts from RTTs and adjust the concurrency to drops.
+        """
+        self.concurrency = raise_fd_limit(max(1, concurrency))
+        self.timeout = timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout or 3 * timeout
+        self.retries = max(0, retries)
+        self.min_concurrency = min(self.concurrency, max(1, min_concurrency))
+        self.adaptive = adaptive
+        self.window = float(self.concurrency) # Connects allowed in flight now
+        self.threshold = float(self.concurrency) # Window where drops were last seen
+        self.stats = collections.Counter()
+        self._rtt = {} # host -> RTTEstimator
+        self._last_decrease = 0.0
+
+    def host_timeout(self, host, attempt=0):
+        """Connect timeout for the next probe of `host`, doubled per earlier timed-out attempt."""
+        if not self.adaptive:
+            return self.timeout
+        estimator = self._rtt.get(host)
+        timeout = estimator.timeout(self.timeout, self.min_timeout, self.max_timeout) if estimator else self.timeout
+        return min(self.max_timeout, timeout * (2 ** attempt))
+
+    def forget_host(self, host):
+        """Drops the RTT estimate of a host that will not be probed again."""
+        self._rtt.pop(host, None)
+
+    def _answered(self, result):
+        if result.rtt is not None and result.attempts == 1: # Retried samples are ambiguous (Karn)
+            self._rtt.setdefault(result.host, RTTEstimator()).update(result.rtt)
+        if not self.adaptive:
+            return
+        now = time.monotonic()
+        if result.attempts > 1:
+            self.stats['drops'] += 1
+            if now - self._last_decrease >= self.host_timeout(result.host):
+                self._last_decrease = now
+                self.threshold = max(self.min_concurrency, self.window / 2)
+                self.window = self.threshold
+                self.stats['window_decreases'] += 1
+        elif self.window < self.threshold:
+            self.window = min(self.concurrency, self.window + 1)
+        else:
+            self.window = min(self.concurrency, self.window + 1 / self.window)
+
+    async def probe(self, host, port, attempt=0):
+        """Connects once to host:port (an IP address) and returns a PortResult."""
+        loop = asyncio.get_running_loop()
+        family = socket.AF_INET6 if ':' in host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (host, port)), self.host_timeout(host, attempt))
+            return PortResult(host, port, OPEN, time.monotonic() - started, None, attempt + 1)
+        except ConnectionRefusedError:
+            return PortResult(host, port, CLOSED, time.monotonic() - started, None, attempt + 1)
+        except asyncio.TimeoutError:
+            return PortResult(host, port, FILTERED, None, 'timeout', attempt + 1)
+        except OSError as e:
+            if e.errno in _UNREACHABLE:
+                return PortResult(host, port, FILTERED, None, e.strerror, attempt + 1)
+            return PortResult(host, port, ERROR, None, str(e), attempt + 1)
+        finally:
+            sock.close()
+
+    async def scan(self, targets):
+        """
+        Probes (host, port) pairs from any (lazy) iterable with up to `window` connects in flight.
+
+        Timed-out probes are retried before new pairs are taken.
+
+        Yields:
+            PortResult: The final result of every pair, in completion order.
+        """
+        targets = iter(targets)
+        retry = collections.deque()
+        pending = set()
+        exhausted = False
+        while pending or retry or not exhausted:
+            while len(pending) < int(self.window):
+                if retry:
+                    host, port, attempt = retry.popleft()
+                else:
+                    target = None if exhausted else next(targets, None)
+                    if target is None:
+                        exhausted = True
+                        break
+                    (host, port), attempt = target, 0
+                pending.add(asyncio.ensure_future(self.probe(host, port, attempt)))
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if result.error == 'timeout' and result.attempts <= self.retries:
+                    self.stats['retries'] += 1
+                    retry.append((result.host, result.port, result.attempts))
+                    continue
+                if result.status in (OPEN, CLOSED):
+                    self._answered(result)
+                self.stats[result.status] += 1
+                yield result
+
+    async def scan_hosts(self, hosts, ports, host_group=256, seed=None, allow=None):
+        """
+        Probes every port of every host in an interleaved, randomized order.
+
+        Hosts are taken in random order, `host_group` at a time, and the host x port pairs
+        of a group are probed in random order, so consecutive connects go to different
+        hosts and no host gets a burst of them; all hosts share the `window` of connects
+        in flight. The next group starts while the last probes of the previous one are
+        still running. Memory depends on the group size, not on the number of hosts. An
+        address listed again while it is still being scanned is skipped.
+
+        Args:
+            hosts (sequence): Addresses, indexable (e.g. a TargetSet).
+            ports (sequence): Ports probed on every host.
+            host_group (int, optional): Hosts whose ports are interleaved with each other.
+            seed (optional): Seed of the random order.
+            allow (callable, optional): Called with each address before a probe; stops the scan when it returns False.
+
+        Yields:
+            HostResult: One per host, as soon as all its ports have finished.
+        """
+        rng = random.Random(seed)
+        active = {} # address -> [probes not finished, all probes issued, results, counts]
+        finished = collections.deque()
+
+        def targets():
+            order = lcg_permutation(len(hosts), rng.random())
+            while True:
+                indexes = list(itertools.islice(order, host_group))
+                if not indexes:
+                    return
+                # An address listed twice is scanned once; its state must not be reset while probes are in flight.
+                group = [address for address in dict.fromkeys(hosts[index] for index in indexes) if address not in active]
+                if not group:
+                    continue
+                for address in group:
+                    active[address] = [0, False, [], collections.Counter()]
+                try:
+                    for pair in lcg_permutation(len(group) * len(ports), rng.random()):
+                        address = group[pair % len(group)]
+                        if allow is not None and not allow(address):
+                            return
+                        active[address][0] += 1
+                        yield address, ports[pair // len(group)]
+                finally:
+                    for address in group:
+                        state = active[address]
+                        state[1] = True
+                        if not state[0]:
+                            if state[3]:
+                                finished.append(address)
+                            else: # Stopped before any probe of this host
+                                del active[address]
+
+        def done(address):
+            outstanding, issued, results, counts = active.pop(address)
+            self.forget_host(address)
+            results.sort(key=lambda result: result.port)
+            return HostResult(address, results, counts)
+
+        async for result in self.scan(targets()):
+            state = active[result.host]
+            state[0] -= 1
+            state[3][result.status] += 1
+            if result.status not in (CLOSED, FILTERED):
+                state[2].append(result)
+            if not state[0] and state[1]:
+                yield done(result.host)
+            while finished:
+                yield done(finished.popleft())
+        while finished:
+            yield done(finished.popleft())
+
+    def scan_all(self, targets, on_result):
+        """Runs scan() to completion from synchronous code, calling on_result(PortResult) for each probe."""
+        async def run():
+            async for result in self.scan(targets):
+                on_result(result)
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    import threading
+
+    print("[*] ConnectScanner Example")
+    print(f"  parse_ports('22,80,8000-8003') -> {parse_ports('22,80,8000-8003')}")
+    print(f"  parse_ports('top10') -> {parse_ports('top10')}")
+    print(f"  len(parse_ports('-')) -> {len(parse_ports('-'))}, len(parse_ports('top1000')) -> {len(parse_ports('top1000'))}")
+
+    listeners = []
+    for _ in range(3):
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(128)
+        listeners.append(listener)
+    open_ports = sorted(listener.getsockname()[1] for listener in listeners)
+
+    def accept_forever(listener):
+        while True:
+            try:
+                listener.accept()[0].close()
+            except OSError:
+                return
+    for listener in listeners:
+        threading.Thread(target=accept_forever, args=(listener,), daemon=True).start()
+
+    scanner = ConnectScanner(concurrency=2000, timeout=1.0, min_timeout=0.05)
+    found = []
+    started = time.monotonic()
+    scanner.scan_all((('127.0.0.1', port) for port in range(1, 65536)),
+                     lambda r: found.append(r.port) if r.status == OPEN else None)
+    print(f"  Full sweep of 127.0.0.1: {time.monotonic() - started:.1f}s, {dict(scanner.stats)}, "
+          f"concurrency {scanner.concurrency}")
+    print(f"  Listening ports {open_ports} found: {set(open_ports) <= set(found)}")
+    print(f"  RTT-derived timeout for 127.0.0.1: {scanner.host_timeout('127.0.0.1') * 1000:.0f}ms (initial 1000ms)")
+    for listener in listeners:
+        listener.close()
+
+    # A server that accepts 300 connections/s behind a short backlog: SYNs beyond the backlog are
+    # dropped, so the scanner has to back off instead of reporting those probes as filtered.
+    slow = socket.socket()
+    slow.bind(('127.0.0.1', 0))
+    slow.listen(16)
+
+    def accept_slowly():
+        while True:
+            try:
+                slow.accept()[0].close()
+            except OSError:
+                return
+            time.sleep(1 / 300)
+    threading.Thread(target=accept_slowly, daemon=True).start()
+    port = slow.getsockname()[1]
+    for adaptive in (False, True):
+        scanner = ConnectScanner(concurrency=500, timeout=0.5, retries=3, adaptive=adaptive)
+        started = time.monotonic()
+        scanner.scan_all((('127.0.0.1', port) for _ in range(600)), lambda r: None)
+        print(f"  Rate-limited server, adaptive={adaptive}: {time.monotonic() - started:.1f}s, "
+              f"{scanner.stats[OPEN]} open, {scanner.stats[FILTERED]} falsely filtered, {scanner.stats['retries']} retries, "
+              f"window {scanner.window:.0f} (min {scanner.min_concurrency})")
+    slow.close()
+
+    # Every 127.x.y.z address is loopback on Linux, so a /16 can be swept locally.
+    wide = socket.socket()
+    wide.bind(('0.0.0.0', 0))
+    wide.listen(1024)
+    threading.Thread(target=accept_forever, args=(wide,), daemon=True).start()
+    hosts = TargetSet()
+    for spec in ('localhost', '127.0.0.1', '127.1.0.0/16', 'no-such-host.invalid'):
+        hosts.add(spec)
+    print(f"  Targets: {len(hosts)} host(s), 127.0.0.1 added as {hosts.label('127.0.0.1')!r}, unresolved {hosts.unresolved}")
+    order = list(itertools.islice(lcg_permutation(len(hosts) * 2), 20))
+    print(f"  First 20 of the schedule hit {len({index % len(hosts) for index in order})} distinct host(s)")
+    scanner = ConnectScanner(concurrency=2000, timeout=1.0)
+    ports = [wide.getsockname()[1], 1]
+    hosts_done, open_found, first_done = 0, 0, None
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+    started = time.monotonic()
+
+    async def sweep():
+        global hosts_done, open_found, first_done
+        async for host in scanner.scan_hosts(hosts, ports, seed=1):
+            hosts_done += 1
+            open_found += host.counts[OPEN]
+            first_done = first_done or time.monotonic() - started
+    asyncio.run(sweep())
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+    print(f"  {hosts_done} host(s) x {len(ports)} port(s) in {time.monotonic() - started:.1f}s, first host done after "
+          f"{first_done:.2f}s; {open_found} open; peak RSS grew by {(rss_after - rss_before) / 1024:.1f} MB")
+    wide.close()
@@ -18,7 +18,7 @@ def load_wordlist(wordlist_path):
         print(f"[!] Error reading wordlist {wordlist_path}: {e}")
         return []
 
-def find_directories(base_url, wordlist_path=None):
+def find_directories(base_url, wordlist_path=None, budget=None):
     """
     Attempts to find common directories or files on a web server using a wordlist.
 
@@ -26,6 +26,7 @@ def find_directories(base_url, wordlist_path=None):
         base_url (str): The base URL to scan (e.g., "http://example.com").
         wordlist_path (str, optional): Path to a custom directory/file wordlist.
                                        Defaults to 'common_directories.txt'.
+        budget (ScanBudget, optional): Stops the scan once a time/request/byte budget is spent.
     Returns:
         list: A list of URLs that returned a 'successful' status code.
     """
@@ -54,10 +55,14 @@ def find_directories(base_url, wordlist_path=None):
     with requests.Session() as session:
         session.headers.update({'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36 BugBountyHunterTool/1.0'})
 
-        for path_item in path_list:
+        for index, path_item in enumerate(path_list):
             current_path = path_item.strip()
             if not current_path:
                 continue
+            if budget is not None and not budget.allow(parsed_url.netloc, 'dir'):
+                budget.cancel('dir', len(path_list) - index)
+                print(f"[!] Budget spent, {len(path_list) - index} path(s) not tested.")
+                break
             if current_path.startswith('/'): # Ensure relative path
                 current_path = current_path[1:]
 
@@ -65,6 +70,8 @@ def find_directories(base_url, wordlist_path=None):
 
             try:
                 response = session.get(test_url, timeout=5, allow_redirects=False)
+                if budget is not None:
+                    budget.record_bytes(parsed_url.netloc, 'dir', len(response.content))
                 if response.status_code in successful_status_codes:
                     results.append({'url': test_url, 'status_code': response.status_code})
                 # Optionally include misses or all attempts in results for more comprehensive JSON
@@ -0,0 +1,325 @@
+import collections
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from dns_resolver import DNSAnswer, NOERROR, NXDOMAIN
+
+# The resolver functions of the socket module at import time; install() replaces the module attributes.
+_system_getaddrinfo = socket.getaddrinfo
+_system_gethostbyname = socket.gethostbyname
+
+
+def _is_ip(host):
+    for family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            socket.inet_pton(family, host.split('%', 1)[0])
+            return True
+        except OSError:
+            pass
+    return False
+
+
+# The dns_cache table is shared with AdvancedBountyScanner/src/dns_cache.py, which reads and
+# writes the same database file: keep SCHEMA identical in both modules, and bump SCHEMA_VERSION
+# in both when the table changes. The version is stored as the database's user_version.
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dns_cache (
+    name TEXT NOT NULL,
+    rdtype TEXT NOT NULL,
+    rcode INTEGER NOT NULL,
+    addresses TEXT NOT NULL,
+    cnames TEXT NOT NULL,
+    expires REAL NOT NULL,
+    PRIMARY KEY (name, rdtype)
+) WITHOUT ROWID
+"""
+_COLUMNS = ('name', 'rdtype', 'rcode', 'addresses', 'cnames', 'expires')
+
+
+def open_database(path):
+    """
+    Opens a DNS cache database, creating the table if needed, and checks its schema version.
+
+    Raises:
+        ValueError: The file holds a dns_cache table of another schema version or layout.
+    """
+    db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    try:
+        if path != ':memory:':
+            db.execute('PRAGMA journal_mode=WAL') # Concurrent runs and workers read while one writes
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute('PRAGMA busy_timeout=5000')
+        version = db.execute('PRAGMA user_version').fetchone()[0]
+        columns = tuple(row[1] for row in db.execute('PRAGMA table_info(dns_cache)'))
+        if version not in (0, SCHEMA_VERSION) or (columns and columns != _COLUMNS):
+            raise ValueError(f"{path}: dns_cache table has schema version {version} and columns {columns}; "
+                             f"this version of the cache needs version {SCHEMA_VERSION} with {_COLUMNS}")
+        db.execute(SCHEMA)
+        if version == 0: # A new file, or one written before versioning (same layout, checked above)
+            db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    except Exception:
+        db.close()
+        raise
+    return db
+
+
+class DNSCache:
+    """
+    DNS cache shared by every module of a run and, with a database file, by later runs.
+
+    Answers are kept in SQLite until their TTL runs out: positive answers for their
+    record TTL, negative answers (NXDOMAIN, no data) for the SOA negative-caching TTL,
+    both clamped to the configured bounds. Lookups go to an in-memory copy of the most
+    recently used `memory_entries` answers first, so a cached name costs a dict lookup,
+    not a query, while memory stays bounded on multi-million-name scans. New answers
+    are written to the database in batches of `batch_size`.
+
+    The subdomain scan reads and stores AsyncResolver answers through get()/put_many().
+    install() routes socket.getaddrinfo and socket.gethostbyname through the cache, so
+    requests (directory bruteforce, header, robots and wayback scans) and the port scan
+    resolve each name once per TTL instead of once per connection. Names resolved by
+    the system resolver carry no TTL; they are kept for `default_ttl` seconds.
+    """
+
+    def __init__(self, path=':memory:', min_ttl=30, max_ttl=86400, negative_ttl=300, default_ttl=300,
+                 memory_entries=100000, batch_size=500):
+        """
+        Args:
+            path (str, optional): SQLite database file shared across runs; ':memory:' caches for this process only.
+            min_ttl (int, optional): Positive answers are kept at least this many seconds.
+            max_ttl (int, optional): ...and at most this many seconds.
+            negative_ttl (int, optional): Upper bound for keeping NXDOMAIN/no-data answers.
+            default_ttl (int, optional): Seconds answers of the system resolver are kept.
+            memory_entries (int, optional): Answers kept in memory in front of the database.
+            batch_size (int, optional): New answers buffered before they are written.
+        """
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.default_ttl = default_ttl
+        self.memory_entries = max(batch_size, memory_entries)
+        self.batch_size = batch_size
+        self.stats = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'stored': 0}
+        self._lock = threading.Lock()
+        self._memory = collections.OrderedDict() # (name, rdtype) -> (expires, rcode, addresses, cnames), LRU order
+        self._pending = [] # Rows not written yet; all of them are in _memory
+        self._installed = False
+        self._db = open_database(path)
+        self.purge()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.uninstall()
+        with self._lock:
+            self._flush()
+            self._db.close()
+
+    def flush(self):
+        """Writes buffered answers to the database."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            with self._db: # Begin ... commit
+                self._db.execute('BEGIN')
+                self._db.executemany(
+                    'INSERT OR REPLACE INTO dns_cache (name, rdtype, rcode, addresses, cnames, expires) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    [(name, rdtype, rcode, json.dumps(addresses), json.dumps(cnames), expires)
+                     for name, rdtype, rcode, addresses, cnames, expires in self._pending]
+                )
+            self._pending = []
+        while len(self._memory) > self.memory_entries: # Only written answers may be dropped
+            self._memory.popitem(last=False)
+
+    def purge(self):
+        """Deletes expired answers from the database; returns how many were deleted."""
+        with self._lock:
+            return self._db.execute('DELETE FROM dns_cache WHERE expires <= ?', (time.time(),)).rowcount
+
+    def _expiry(self, rcode, addresses, ttl):
+        if addresses:
+            ttl = self.default_ttl if ttl is None else ttl
+            return time.time() + max(self.min_ttl, min(ttl, self.max_ttl))
+        ttl = self.negative_ttl if ttl is None else ttl
+        return time.time() + max(0, min(ttl, self.negative_ttl))
+
+    def get(self, name, rdtype='A'):
+        """
+        Returns the cached answer for a name, or None when it is not cached or expired.
+
+        Returns:
+            DNSAnswer or None: ttl is the number of seconds the answer stays cached.
+        """
+        key = (name.rstrip('.').lower(), rdtype)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._db.execute(
+                    'SELECT expires, rcode, addresses, cnames FROM dns_cache WHERE name = ? AND rdtype = ? AND expires > ?',
+                    (key[0], rdtype, now)
+                ).fetchone()
+                if row is not None:
+                    entry = self._memory[key] = (row[0], row[1], tuple(json.loads(row[2])), tuple(json.loads(row[3])))
+                    if len(self._memory) > self.memory_entries:
+                        self._flush()
+            if entry is None or entry[0] <= now:
+                self._memory.pop(key, None)
+                self.stats['misses'] += 1
+                return None
+            self._memory.move_to_end(key)
+            self.stats['hits' if entry[2] else 'negative_hits'] += 1
+        expires, rcode, addresses, cnames = entry
+        return DNSAnswer(key[0], rcode, addresses, cnames, int(expires - now), None)
+
+    def put(self, answer, rdtype='A'):
+        """Caches one DNSAnswer; answers with an error (timeout, SERVFAIL, ...) are not cached."""
+        self.put_many([answer], rdtype)
+
+    def put_many(self, answers, rdtype='A'):
+        """Caches DNSAnswers; returns how many were stored (errors are skipped)."""
+        rows = []
+        for answer in answers:
+            if answer.status == 'error':
+                continue
+            expires = self._expiry(answer.rcode, answer.addresses, answer.ttl)
+            rows.append((answer.name.rstrip('.').lower(), rdtype, answer.rcode, tuple(answer.addresses),
+                         tuple(answer.cnames), expires))
+        if not rows:
+            return 0
+        with self._lock:
+            for name, rdtype, rcode, addresses, cnames, expires in rows:
+                self._memory[(name, rdtype)] = (expires, rcode, addresses, cnames)
+                self._memory.move_to_end((name, rdtype))
+            self._pending.extend(rows)
+            if len(self._pending) >= self.batch_size or len(self._memory) > self.memory_entries:
+                self._flush()
+            self.stats['stored'] += len(rows)
+        return len(rows)
+
+    def resolve(self, name):
+        """
+        Returns the IPv4 and IPv6 addresses of a name, from the cache or the system resolver.
+
+        Raises:
+            socket.gaierror: The name does not exist (cached as well) or resolution failed.
+        """
+        name = name.rstrip('.').lower()
+        a, aaaa = self.get(name, 'A'), self.get(name, 'AAAA')
+        if a is not None and (a.addresses or a.rcode == NXDOMAIN or aaaa is not None):
+            addresses = a.addresses + (aaaa.addresses if aaaa is not None else ())
+        elif aaaa is not None and aaaa.addresses:
+            addresses = aaaa.addresses
+        else:
+            try:
+                infos = _system_getaddrinfo(name, None, 0, socket.SOCK_STREAM)
+            except socket.gaierror as e:
+                if e.errno in (socket.EAI_NONAME, getattr(socket, 'EAI_NODATA', socket.EAI_NONAME)):
+                    rcode = NXDOMAIN if e.errno == socket.EAI_NONAME else NOERROR
+                    self.put(DNSAnswer(name, rcode, (), (), None, None), 'A')
+                    self.put(DNSAnswer(name, rcode, (), (), None, None), 'AAAA')
+                raise # EAI_AGAIN and the like are transient; nothing is cached
+            ipv4 = tuple(dict.fromkeys(info[4][0] for info in infos if info[0] == socket.AF_INET))
+            ipv6 = tuple(dict.fromkeys(info[4][0] for info in infos if info[0] == socket.AF_INET6))
+            self.put(DNSAnswer(name, NOERROR, ipv4, (), None, None), 'A')
+            self.put(DNSAnswer(name, NOERROR, ipv6, (), None, None), 'AAAA')
+            addresses = ipv4 + ipv6
+        if not addresses:
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        return addresses
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        """Drop-in replacement for socket.getaddrinfo that resolves host names through the cache."""
+        name = host.decode('idna') if isinstance(host, bytes) else host
+        if not name or flags & socket.AI_NUMERICHOST or _is_ip(name):
+            return _system_getaddrinfo(host, port, family, type, proto, flags)
+        addresses = self.resolve(name)
+        if family == socket.AF_INET:
+            addresses = [address for address in addresses if ':' not in address]
+        elif family == socket.AF_INET6:
+            addresses = [address for address in addresses if ':' in address]
+        if not addresses:
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        results = []
+        for address in addresses:
+            results.extend(_system_getaddrinfo(address, port, family, type, proto, flags | socket.AI_NUMERICHOST))
+        return results
+
+    def gethostbyname(self, host):
+        """Drop-in replacement for socket.gethostbyname that resolves through the cache."""
+        if _is_ip(host):
+            return _system_gethostbyname(host)
+        ipv4 = [address for address in self.resolve(host) if ':' not in address]
+        if not ipv4:
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        return ipv4[0]
+
+    def install(self):
+        """Routes socket.getaddrinfo and socket.gethostbyname through this cache (process-wide)."""
+        socket.getaddrinfo = self.getaddrinfo
+        socket.gethostbyname = self.gethostbyname
+        self._installed = True
+        return self
+
+    def uninstall(self):
+        """Restores the system resolver functions if this cache installed itself."""
+        if self._installed:
+            socket.getaddrinfo = _system_getaddrinfo
+            socket.gethostbyname = _system_gethostbyname
+            self._installed = False
+
+    def report(self):
+        with self._lock:
+            self._flush()
+            stats = dict(self.stats)
+            stats['entries'] = self._db.execute('SELECT COUNT(*) FROM dns_cache').fetchone()[0]
+        return stats
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    print("[*] DNSCache Example")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'dns.sqlite')
+        with DNSCache(path, min_ttl=1, negative_ttl=60) as cache:
+            cache.put_many([
+                DNSAnswer('www.example.test', NOERROR, ('10.0.0.1',), (), 300, None),
+                DNSAnswer('short.example.test', NOERROR, ('10.0.0.2',), (), 1, None),
+                DNSAnswer('gone.example.test', NXDOMAIN, (), (), 3600, None), # Negative TTL capped at 60s
+                DNSAnswer('flaky.example.test', None, (), (), None, 'timeout'), # Not cached
+            ])
+            print(f"  Stored: {cache.report()}")
+
+        with DNSCache(path, min_ttl=1) as cache: # A later run
+            for name in ('www.example.test', 'gone.example.test', 'flaky.example.test'):
+                print(f"  get({name}) -> {cache.get(name)}")
+            time.sleep(1.1)
+            print(f"  get(short.example.test) after its TTL -> {cache.get('short.example.test')}")
+
+            cache.install()
+            try:
+                print(f"  socket.gethostbyname('www.example.test') -> {socket.gethostbyname('www.example.test')}")
+                print(f"  socket.getaddrinfo('www.example.test', 80)[0] -> {socket.getaddrinfo('www.example.test', 80)[0]}")
+                socket.getaddrinfo('gone.example.test', 443)
+            except socket.gaierror as e:
+                print(f"  socket.getaddrinfo('gone.example.test', 443) -> gaierror {e}")
+            print(f"  localhost (system resolver, now cached) -> {socket.gethostbyname('localhost')}, "
+                  f"{cache.get('localhost')}")
+            cache.uninstall()
+            print(f"  Report: {cache.report()}")
@@ -0,0 +1,642 @@
+import asyncio
+import collections
+import random
+import socket
+import struct
+import threading
+import time
+
+DNS_PORT = 53
+RDTYPES = {'A': 1, 'NS': 2, 'CNAME': 5, 'SOA': 6, 'AAAA': 28}
+RCODES = {0: 'NOERROR', 1: 'FORMERR', 2: 'SERVFAIL', 3: 'NXDOMAIN', 4: 'NOTIMP', 5: 'REFUSED'}
+NOERROR, SERVFAIL, NXDOMAIN = 0, 2, 3
+EDNS_PAYLOAD = 1232 # Advertised UDP payload size; avoids truncation and IP fragmentation
+DEFAULT_NAMESERVERS = ('1.1.1.1', '8.8.8.8')
+
+_random = random.SystemRandom() # Query IDs must not be predictable
+
+
+class DNSError(Exception):
+    """Raised for malformed DNS messages and responses that do not match their query."""
+
+
+class DNSAnswer(collections.namedtuple('DNSAnswer', 'name rcode addresses cnames ttl error')):
+    """
+    Result of one lookup.
+
+    addresses and cnames are tuples; ttl is the smallest TTL of the answer (or the
+    negative-caching TTL from the SOA record for NXDOMAIN/no-data); error is set when
+    no nameserver gave a usable answer.
+    """
+    __slots__ = ()
+
+    @property
+    def status(self):
+        """'found', 'not_resolved' (NXDOMAIN or no data) or 'error'."""
+        if self.addresses:
+            return 'found'
+        if self.error is None and self.rcode in (NOERROR, NXDOMAIN):
+            return 'not_resolved'
+        return 'error'
+
+
+def encode_name(name):
+    labels = name.rstrip('.').split('.') if name.strip('.') else []
+    out = bytearray()
+    for label in labels:
+        try:
+            raw = label.encode('idna') if not label.isascii() else label.encode('ascii')
+        except UnicodeError: # Not a valid IDN label, such as one with U+FFFD from an undecodable wordlist line
+            raise DNSError(f"invalid label in {name!r}") from None
+        if not 0 < len(raw) < 64:
+            raise DNSError(f"invalid label in {name!r}")
+        out += bytes((len(raw),)) + raw
+    return bytes(out + b'\x00')
+
+
+def build_query(query_id, name, qtype, edns=True):
+    """Returns a recursive query message for one question."""
+    header = struct.pack('!HHHHHH', query_id, 0x0100, 1, 0, 0, 1 if edns else 0) # RD set
+    message = header + encode_name(name) + struct.pack('!HH', qtype, 1)
+    if edns:
+        message += b'\x00' + struct.pack('!HHIH', 41, EDNS_PAYLOAD, 0, 0) # OPT pseudo-record
+    return message
+
+
+def _read_name(data, offset):
+    """Returns (name, offset after the name), following compression pointers."""
+    labels = []
+    end = None
+    jumps = 0
+    while True:
+        if offset >= len(data):
+            raise DNSError("name runs past the end of the message")
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if offset + 1 >= len(data):
+                raise DNSError("truncated compression pointer")
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            jumps += 1
+            if jumps > 64:
+                raise DNSError("compression pointer loop")
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(data[offset:offset + length].decode('ascii', 'replace'))
+        offset += length
+    return '.'.join(labels).lower(), end if end is not None else offset
+
+
+def parse_response(data, query_id=None, name=None, qtype=None):
+    """
+    Parses a response message and checks it answers the given query.
+
+    Returns:
+        dict: 'id', 'rcode', 'truncated', 'answers' [(name, type, ttl, value)], 'negative_ttl'.
+    """
+    if len(data) < 12:
+        raise DNSError("message shorter than a DNS header")
+    msg_id, flags, qdcount, ancount, nscount, _ = struct.unpack('!HHHHHH', data[:12])
+    if not flags & 0x8000:
+        raise DNSError("message is not a response")
+    if query_id is not None and msg_id != query_id:
+        raise DNSError("response ID does not match the query")
+    offset = 12
+    for _ in range(qdcount):
+        qname, offset = _read_name(data, offset)
+        rtype, _ = struct.unpack('!HH', data[offset:offset + 4])
+        offset += 4
+        if name is not None and (qname != name.rstrip('.').lower() or rtype != qtype):
+            raise DNSError("response question does not match the query")
+    answers = []
+    negative_ttl = None
+    for section in range(ancount + nscount):
+        rname, offset = _read_name(data, offset)
+        if offset + 10 > len(data):
+            raise DNSError("truncated resource record")
+        rtype, _, ttl, rdlength = struct.unpack('!HHIH', data[offset:offset + 10])
+        offset += 10
+        rdata_offset = offset
+        offset += rdlength
+        if offset > len(data):
+            raise DNSError("truncated resource record data")
+        if section < ancount:
+            if rtype == 1 and rdlength == 4:
+                answers.append((rname, 'A', ttl, socket.inet_ntoa(data[rdata_offset:offset])))
+            elif rtype == 28 and rdlength == 16:
+                answers.append((rname, 'AAAA', ttl, socket.inet_ntop(socket.AF_INET6, data[rdata_offset:offset])))
+            elif rtype == 5:
+                answers.append((rname, 'CNAME', ttl, _read_name(data, rdata_offset)[0]))
+        elif rtype == 6: # SOA in the authority section: TTL for caching the negative answer (RFC 2308)
+            _, soa_offset = _read_name(data, rdata_offset)
+            _, soa_offset = _read_name(data, soa_offset)
+            minimum = struct.unpack('!I', data[soa_offset + 16:soa_offset + 20])[0]
+            negative_ttl = min(ttl, minimum)
+    return {'id': msg_id, 'rcode': flags & 0x000F, 'truncated': bool(flags & 0x0200),
+            'answers': answers, 'negative_ttl': negative_ttl}
+
+
+def parse_nameserver(spec):
+    """'1.1.1.1', '127.0.0.1:5353', '::1' or '[::1]:5353' -> (host, port)."""
+    spec = spec.strip()
+    if spec.startswith('['):
+        host, _, port = spec[1:].partition(']')
+        return host, int(port.lstrip(':') or DNS_PORT)
+    if spec.count(':') == 1:
+        host, port = spec.split(':')
+        return host, int(port)
+    return spec, DNS_PORT
+
+
+def system_nameservers(path='/etc/resolv.conf'):
+    """Nameservers from resolv.conf, or DEFAULT_NAMESERVERS if there are none."""
+    found = []
+    try:
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == 'nameserver':
+                    found.append(parts[1].split('%')[0])
+    except OSError:
+        pass
+    return found or list(DEFAULT_NAMESERVERS)
+
+
+class _UDPChannel(asyncio.DatagramProtocol):
+    """One UDP socket with its in-flight queries, keyed by query ID."""
+
+    def __init__(self):
+        self.transport = None
+        self.pending = {} # query id -> (future, nameserver address)
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) < 12:
+            return
+        entry = self.pending.get(struct.unpack('!H', data[:2])[0])
+        # Answers from any other address than the queried nameserver are spoofing attempts
+        if entry is not None and addr[:2] == entry[1] and not entry[0].done():
+            entry[0].set_result(data)
+
+    def error_received(self, exc):
+        pass # ICMP errors surface as timeouts of the affected queries
+
+    def new_id(self):
+        while True:
+            query_id = _random.randrange(65536)
+            if query_id not in self.pending:
+                return query_id
+
+
+class _NameserverLimit:
+    """Spaces out queries to one nameserver to at most `rate` per second."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+
+    async def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class AsyncResolver:
+    """
+    Resolves names by speaking DNS over UDP directly to recursive nameservers.
+
+    Thousands of queries can be outstanding at once (`max_outstanding`). Queries are
+    spread over a pool of UDP sockets, each with its own random source port, and carry
+    random IDs; a response is only accepted from the queried nameserver, with the same
+    ID and question. Unanswered queries are retransmitted to the next nameserver after
+    `timeout`, truncated answers are retried over TCP, and every nameserver gets its
+    own query rate limit. With a `cache` (DNSCache), names with an unexpired cached
+    answer are not queried and new answers are stored in it.
+
+    Use it as an async context manager inside a running event loop.
+    """
+
+    def __init__(self, nameservers=None, timeout=2.0, retries=2, max_outstanding=1000, rate_limit=None,
+                 udp_sockets=16, tcp_fallback=True, cache=None):
+        """
+        Args:
+            nameservers (list, optional): 'host' or 'host:port' specs. Default: /etc/resolv.conf.
+            timeout (float, optional): Seconds to wait for each attempt.
+            retries (int, optional): Retransmits after the first attempt (rotating nameservers).
+            max_outstanding (int, optional): Queries in flight at once.
+            rate_limit (float, optional): Queries per second per nameserver (None = unlimited).
+            udp_sockets (int, optional): UDP sockets (source ports) queries are spread over.
+            tcp_fallback (bool, optional): Repeat truncated answers over TCP.
+            cache (DNSCache, optional): Answers are looked up in and stored to this cache.
+        """
+        self.nameservers = [parse_nameserver(ns) for ns in (nameservers or system_nameservers())]
+        self.timeout = timeout
+        self.retries = retries
+        self.max_outstanding = max(1, max_outstanding)
+        self.udp_sockets = max(1, udp_sockets)
+        self.tcp_fallback = tcp_fallback
+        self.cache = cache
+        self._limits = {ns: _NameserverLimit(rate_limit) for ns in self.nameservers}
+        self._channels = {} # address family -> [_UDPChannel]
+        self._semaphore = None
+        self._next_nameserver = 0
+        self.stats = {'queries': 0, 'retransmits': 0, 'timeouts': 0, 'tcp_fallbacks': 0, 'invalid': 0, 'cached': 0}
+
+    async def __aenter__(self):
+        self._semaphore = asyncio.Semaphore(self.max_outstanding)
+        loop = asyncio.get_running_loop()
+        for family in {self._family(ns) for ns in self.nameservers}:
+            local = ('::', 0) if family == socket.AF_INET6 else ('0.0.0.0', 0)
+            channels = self._channels[family] = []
+            for _ in range(self.udp_sockets):
+                _, channel = await loop.create_datagram_endpoint(_UDPChannel, local_addr=local, family=family)
+                channels.append(channel)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for channels in self._channels.values():
+            for channel in channels:
+                channel.transport.close()
+        self._channels = {}
+
+    @staticmethod
+    def _family(nameserver):
+        return socket.AF_INET6 if ':' in nameserver[0] else socket.AF_INET
+
+    async def _query_udp(self, nameserver, name, qtype):
+        channel = _random.choice(self._channels[self._family(nameserver)])
+        query_id = channel.new_id()
+        future = asyncio.get_running_loop().create_future()
+        channel.pending[query_id] = (future, nameserver)
+        try:
+            await self._limits[nameserver].wait()
+            self.stats['queries'] += 1
+            channel.transport.sendto(build_query(query_id, name, qtype), nameserver)
+            data = await asyncio.wait_for(future, self.timeout)
+        finally:
+            channel.pending.pop(query_id, None)
+        return parse_response(data, query_id, name, qtype)
+
+    async def _query_tcp(self, nameserver, name, qtype):
+        query_id = _random.randrange(65536)
+        query = build_query(query_id, name, qtype, edns=False)
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(*nameserver), self.timeout)
+        try:
+            writer.write(struct.pack('!H', len(query)) + query)
+            await writer.drain()
+            length = struct.unpack('!H', await asyncio.wait_for(reader.readexactly(2), self.timeout))[0]
+            data = await asyncio.wait_for(reader.readexactly(length), self.timeout)
+        finally:
+            writer.close()
+        return parse_response(data, query_id, name, qtype)
+
+    async def resolve(self, name, rdtype='A'):
+        """
+        Resolves one name.
+
+        Returns:
+            DNSAnswer: Never raises for network or server errors; see DNSAnswer.error.
+        """
+        name = name.rstrip('.').lower()
+        if self.cache is None:
+            return await self._resolve(name, rdtype)
+        answer = self.cache.get(name, rdtype)
+        if answer is not None:
+            self.stats['cached'] += 1
+            return answer
+        answer = await self._resolve(name, rdtype)
+        self.cache.put(answer, rdtype) # Errors are not cached
+        return answer
+
+    async def _resolve(self, name, rdtype):
+        qtype = RDTYPES[rdtype]
+        try:
+            encode_name(name)
+        except DNSError as e: # The name cannot be queried at all; an error answer, not a retry
+            return DNSAnswer(name, None, (), (), None, str(e))
+        error = 'timeout'
+        async with self._semaphore:
+            start = self._next_nameserver
+            self._next_nameserver = (start + 1) % len(self.nameservers)
+            for attempt in range(self.retries + 1):
+                nameserver = self.nameservers[(start + attempt) % len(self.nameservers)]
+                if attempt:
+                    self.stats['retransmits'] += 1
+                try:
+                    response = await self._query_udp(nameserver, name, qtype)
+                    if response['truncated'] and self.tcp_fallback:
+                        self.stats['tcp_fallbacks'] += 1
+                        response = await self._query_tcp(nameserver, name, qtype)
+                except asyncio.TimeoutError:
+                    self.stats['timeouts'] += 1
+                    error = 'timeout'
+                    continue
+                except (OSError, EOFError, DNSError) as e: # EOFError: asyncio.IncompleteReadError
+                    self.stats['invalid'] += isinstance(e, DNSError)
+                    error = str(e) or type(e).__name__
+                    continue
+                if response['rcode'] not in (NOERROR, NXDOMAIN):
+                    error = RCODES.get(response['rcode'], f"rcode {response['rcode']}")
+                    continue # SERVFAIL/REFUSED: ask the next nameserver
+                return self._answer(name, response)
+        return DNSAnswer(name, None, (), (), None, error)
+
+    @staticmethod
+    def _answer(name, response):
+        answers = response['answers']
+        addresses = tuple(value for _, rtype, _, value in answers if rtype in ('A', 'AAAA'))
+        cnames = tuple(value for _, rtype, _, value in answers if rtype == 'CNAME')
+        ttl = min((ttl for _, _, ttl, _ in answers), default=response['negative_ttl'])
+        return DNSAnswer(name, response['rcode'], addresses, cnames, ttl, None)
+
+    async def resolve_many(self, names, rdtype='A'):
+        """
+        Resolves names from any (lazy) iterable with up to max_outstanding queries in flight.
+
+        Yields:
+            DNSAnswer: In completion order, not input order.
+        """
+        names = iter(names)
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < self.max_outstanding:
+                name = next(names, None)
+                if name is None:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(self.resolve(name, rdtype)))
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+
+
+def resolve_all(names, rdtype='A', **resolver_options):
+    """Resolves names from synchronous code; returns {name: DNSAnswer}."""
+    async def run():
+        async with AsyncResolver(**resolver_options) as resolver:
+            return {answer.name: answer async for answer in resolver.resolve_many(names, rdtype)}
+    return asyncio.run(run())
+
+
+class WildcardFingerprint(collections.namedtuple('WildcardFingerprint', 'zone addresses cnames ttls')):
+    """Answers a wildcard record gave for random labels of `zone` (frozensets)."""
+    __slots__ = ()
+
+    def as_dict(self):
+        return {'zone': self.zone, 'addresses': sorted(self.addresses), 'cnames': sorted(self.cnames),
+                'ttls': sorted(self.ttls)}
+
+
+class WildcardDetector:
+    """
+    Detects wildcard DNS records, so names that only resolve through them are not reported as found.
+
+    The first time a name below a zone resolves, `probes` random labels are resolved in
+    that zone (the level being tested: 'a.dev.example.com' -> 'dev.example.com'). If any
+    of them resolves, the zone has a wildcard, and the addresses, CNAME targets and TTLs
+    the random labels got form its fingerprint. The fingerprint (or the fact that there
+    is none) is cached per zone, so each later candidate costs one set comparison.
+
+    A candidate matches the wildcard if all its addresses are wildcard addresses. With
+    `compare_cname`, a candidate whose CNAME target is the wildcard's also matches (CDN
+    wildcards with rotating addresses). With `compare_ttl`, a candidate that shares some
+    addresses with the wildcard also matches if its TTL is one the wildcard answered with.
+    """
+
+    def __init__(self, probes=3, compare_cname=True, compare_ttl=False):
+        """
+        Args:
+            probes (int, optional): Random labels resolved per zone.
+            compare_cname (bool, optional): Also match candidates by CNAME target.
+            compare_ttl (bool, optional): Also match candidates with partly overlapping addresses and a wildcard TTL.
+        """
+        self.probes = probes
+        self.compare_cname = compare_cname
+        self.compare_ttl = compare_ttl
+        self.fingerprints = {} # zone -> WildcardFingerprint, or None when the zone has no wildcard
+        self.filtered = collections.Counter() # zone -> candidates filtered as wildcard answers
+        self._inflight = {} # zone -> asyncio.Task, so concurrent candidates share one detection
+
+    async def _detect(self, resolver, zone):
+        labels = [''.join(_random.choice('abcdefghijklmnopqrstuvwxyz0123456789') for _ in range(16))
+                  for _ in range(self.probes)]
+        answers = await asyncio.gather(*(resolver.resolve(f"{label}.{zone}") for label in labels))
+        found = [a for a in answers if a.status == 'found']
+        if not found:
+            return None
+        return WildcardFingerprint(
+            zone,
+            frozenset(ip for a in found for ip in a.addresses),
+            frozenset(a.cnames[-1] for a in found if a.cnames),
+            frozenset(a.ttl for a in found if a.ttl is not None)
+        )
+
+    async def fingerprint(self, resolver, zone):
+        """Returns the WildcardFingerprint of a zone (None if it has no wildcard), probing it once."""
+        if zone in self.fingerprints:
+            return self.fingerprints[zone]
+        task = self._inflight.get(zone)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = self._inflight[zone] = asyncio.ensure_future(self._detect(resolver, zone))
+        result = await task
+        self.fingerprints[zone] = result
+        self._inflight.pop(zone, None)
+        return result
+
+    def matches(self, fingerprint, answer):
+        """True if the answer of a candidate is explained by the wildcard."""
+        addresses = set(answer.addresses)
+        if addresses <= fingerprint.addresses:
+            return True
+        if self.compare_cname and answer.cnames and answer.cnames[-1] in fingerprint.cnames:
+            return True
+        return self.compare_ttl and bool(addresses & fingerprint.addresses) and answer.ttl in fingerprint.ttls
+
+    async def is_wildcard(self, resolver, answer):
+        """True if a resolved candidate only resolves through a wildcard record of its parent zone."""
+        zone = answer.name.partition('.')[2]
+        if not zone or answer.status != 'found':
+            return False
+        fingerprint = await self.fingerprint(resolver, zone)
+        if fingerprint is None or not self.matches(fingerprint, answer):
+            return False
+        self.filtered[zone] += 1
+        return True
+
+    def report(self):
+        """Returns {zone: fingerprint dict with 'filtered'} for every zone that has a wildcard."""
+        return {zone: dict(fp.as_dict(), filtered=self.filtered[zone])
+                for zone, fp in self.fingerprints.items() if fp is not None}
+
+
+class StubDNSServer:
+    """
+    Minimal authoritative DNS server over UDP and TCP for testing resolvers locally.
+
+    `records` maps names (or '*.zone' wildcards) to lists of IPv4 addresses, `cnames`
+    maps names to their CNAME target. Names listed in `truncate` get a truncated UDP
+    answer, so clients must retry over TCP; `drop_every` drops every n-th UDP query.
+    Unknown names get NXDOMAIN with an SOA record carrying `negative_ttl`.
+    """
+
+    def __init__(self, records=None, cnames=None, host='127.0.0.1', port=0, ttl=300, negative_ttl=60,
+                 truncate=(), drop_every=0):
+        self.records = {k.lower(): list(v) for k, v in (records or {}).items()}
+        self.cnames = {k.lower(): v.lower() for k, v in (cnames or {}).items()}
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.truncate = {n.lower() for n in truncate}
+        self.drop_every = drop_every
+        self.counts = {'udp': 0, 'tcp': 0, 'dropped': 0}
+        self._udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._udp.bind((host, port))
+        self.address = self._udp.getsockname()
+        self._tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._tcp.bind(self.address)
+        self._tcp.listen(64)
+        self._closed = False
+
+    @property
+    def nameserver(self):
+        return f"{self.address[0]}:{self.address[1]}"
+
+    def start(self):
+        threading.Thread(target=self._serve_udp, daemon=True).start()
+        threading.Thread(target=self._serve_tcp, daemon=True).start()
+        return self
+
+    def close(self):
+        self._closed = True
+        self._udp.close()
+        self._tcp.close()
+
+    def _lookup(self, name):
+        if name in self.records:
+            return self.records[name]
+        labels = name.split('.')
+        for i in range(1, len(labels)):
+            wildcard = '*.' + '.'.join(labels[i:])
+            if wildcard in self.records:
+                return self.records[wildcard]
+        return None
+
+    def _answer(self, query, over_tcp):
+        query_id, flags = struct.unpack('!HH', query[:4])
+        name, offset = _read_name(query, 12)
+        qtype = struct.unpack('!H', query[offset:offset + 2])[0]
+        question = query[12:offset + 4]
+        answers = []
+        owner = name
+        target = self.cnames.get(owner)
+        while target is not None and len(answers) < 8:
+            answers.append(encode_name(owner) + struct.pack('!HHIH', 5, 1, self.ttl, len(encode_name(target)))
+                           + encode_name(target))
+            owner, target = target, self.cnames.get(target)
+        addresses = self._lookup(owner)
+        rcode = NXDOMAIN if addresses is None and not answers else NOERROR
+        if qtype == 1:
+            for address in addresses or ():
+                answers.append(encode_name(owner) + struct.pack('!HHIH', 1, 1, self.ttl, 4) + socket.inet_aton(address))
+        authority = []
+        if not answers or rcode == NXDOMAIN:
+            soa = encode_name('ns.stub') + encode_name('admin.stub') + struct.pack('!IIIII', 1, 3600, 600, 86400, self.negative_ttl)
+            authority.append(encode_name('stub') + struct.pack('!HHIH', 6, 1, self.negative_ttl, len(soa)) + soa)
+        response_flags = 0x8180 | rcode # QR, RD, RA
+        if name in self.truncate and not over_tcp:
+            response_flags |= 0x0200
+            answers, authority = [], []
+        header = struct.pack('!HHHHHH', query_id, response_flags, 1, len(answers), len(authority), 0)
+        return header + question + b''.join(answers) + b''.join(authority)
+
+    def _serve_udp(self):
+        while not self._closed:
+            try:
+                query, addr = self._udp.recvfrom(4096)
+            except OSError:
+                return
+            self.counts['udp'] += 1
+            if self.drop_every and self.counts['udp'] % self.drop_every == 0:
+                self.counts['dropped'] += 1
+                continue
+            try:
+                self._udp.sendto(self._answer(query, False), addr)
+            except (OSError, DNSError, struct.error):
+                pass
+
+    def _serve_tcp(self):
+        while not self._closed:
+            try:
+                conn, _ = self._tcp.accept()
+            except OSError:
+                return
+            with conn:
+                try:
+                    length = struct.unpack('!H', conn.recv(2))[0]
+                    query = b''
+                    while len(query) < length:
+                        chunk = conn.recv(length - len(query))
+                        if not chunk:
+                            break
+                        query += chunk
+                    self.counts['tcp'] += 1
+                    response = self._answer(query, True)
+                    conn.sendall(struct.pack('!H', len(response)) + response)
+                except (OSError, DNSError, struct.error):
+                    pass
+
+
+if __name__ == '__main__':
+    print("[*] AsyncResolver Example (against a local stub DNS server)")
+    records = {f"host{i}.example.test": [f"10.0.{i // 256}.{i % 256}"] for i in range(0, 20000, 7)}
+    records['big.example.test'] = ['10.9.9.9']
+    server = StubDNSServer(records, cnames={'www.example.test': 'host0.example.test'}, truncate={'big.example.test'},
+                           drop_every=500).start()
+
+    names = [f"host{i}.example.test" for i in range(20000)] + ['www.example.test', 'big.example.test']
+    started = time.monotonic()
+
+    async def main():
+        async with AsyncResolver([server.nameserver], timeout=1.0, max_outstanding=256) as resolver:
+            answers = {a.name: a async for a in resolver.resolve_many(names)}
+            return answers, resolver.stats
+    answers, stats = asyncio.run(main())
+    elapsed = time.monotonic() - started
+    statuses = collections.Counter(a.status for a in answers.values())
+    print(f"  {len(names)} names in {elapsed:.2f}s ({len(names) / elapsed:.0f}/s): {dict(statuses)}")
+    print(f"  Resolver stats: {stats}; server: {server.counts}")
+    print(f"  www -> {answers['www.example.test'].cnames} {answers['www.example.test'].addresses}")
+    print(f"  big (truncated over UDP) -> {answers['big.example.test'].addresses}")
+    print(f"  NXDOMAIN negative TTL: {answers['host1.example.test'].ttl}s")
+    print(f"  resolve_all: {resolve_all(['host7.example.test'], nameservers=[server.nameserver])}")
+    server.close()
+
+    print("\n[*] WildcardDetector Example")
+    server = StubDNSServer({'*.wild.test': ['10.1.1.1', '10.1.1.2'], 'real.wild.test': ['10.2.2.2'],
+                            'cdn.wild.test': ['10.1.1.1'], 'www.tame.test': ['10.3.3.3']}).start()
+    detector = WildcardDetector()
+
+    async def check():
+        async with AsyncResolver([server.nameserver], timeout=0.5) as resolver:
+            names = ['real.wild.test', 'cdn.wild.test', 'foo.wild.test', 'bar.wild.test', 'www.tame.test', 'nope.tame.test']
+            return {a.name: (a.status, await detector.is_wildcard(resolver, a))
+                    async for a in resolver.resolve_many(names)}
+    for name, (status, wildcard) in sorted(asyncio.run(check()).items()):
+        print(f"  {name:<16} {status:<13} {'filtered (wildcard)' if wildcard else ''}")
+    print(f"  Zones probed: {sorted(detector.fingerprints)}; report: {detector.report()}")
+    server.close()
@@ -1,32 +1,164 @@
+import array
+import asyncio
+import collections.abc
+import functools
 import socket
 import sys
+import time
 
-def scan_ports(target_host, provided_ports=None):
+from connect_scanner import COMMON_PORTS, OPEN, CLOSED, FILTERED, ERROR, ConnectScanner, TargetSet, parse_ports
+
+
+@functools.lru_cache(maxsize=None)
+def service_name(port):
+    try:
+        return socket.getservbyport(port)
+    except OSError:
+        return "unknown"
+
+
+def _port_list(provided_ports):
+    if provided_ports is None:
+        return list(COMMON_PORTS)
+    if isinstance(provided_ports, str):
+        return parse_ports(provided_ports)
+    return list(provided_ports)
+
+
+class PortTable(collections.abc.Sequence):
+    """
+    Port scan results of one host as typed arrays.
+
+    Ports are kept in an array of 16-bit integers and their states as one byte each;
+    the few ports with more to say (an error message, a banner) carry a small dict.
+    Indexing or iterating gives the usual result dicts ({'port', 'status', 'service'},
+    plus 'error_message' or 'banner'), built on the fly, so the IANA service name is
+    only looked up when a result is read; compact() gives a smaller form for reports.
+    """
+    __slots__ = ('host', 'address', 'ports', 'states', 'extras')
+
+    STATES = (OPEN, CLOSED, FILTERED, ERROR)
+
+    def __init__(self, host=None, address=None):
+        self.host = host
+        self.address = address
+        self.ports = array.array('H')
+        self.states = bytearray()
+        self.extras = {} # port -> {'service', 'banner', 'error_message'}, only for ports that have them
+
+    def add(self, port, status, **extra):
+        self.ports.append(port)
+        self.states.append(self.STATES.index(status))
+        if extra:
+            self.annotate(port, **extra)
+
+    def add_result(self, result):
+        """Appends a PortResult; errors keep their message."""
+        if result.status == ERROR:
+            self.add(result.port, ERROR, error_message=f"Socket error: {result.error}")
+        else:
+            self.add(result.port, result.status)
+
+    def annotate(self, port, **extra):
+        self.extras.setdefault(port, {}).update(extra)
+
+    def open_ports(self):
+        return [port for port, state in zip(self.ports, self.states) if state == 0]
+
+    def __len__(self):
+        return len(self.ports)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        port, status = self.ports[index], self.STATES[self.states[index]]
+        result = {'port': port, 'status': status, 'service': service_name(port) if status == OPEN else 'unknown'}
+        result.update(self.extras.get(port, ()))
+        return result
+
+    def sort(self):
+        """Sorts by port."""
+        order = sorted(range(len(self)), key=self.ports.__getitem__)
+        self.ports = array.array('H', (self.ports[i] for i in order))
+        self.states = bytearray(self.states[i] for i in order)
+
+    def to_dicts(self):
+        return list(self)
+
+    def compact(self):
+        """
+        Smaller form for reports: 'open' lists the open ports; 'errors', 'services' (where a
+        banner identified something else than the IANA name) and 'banners' map ports to
+        values and are left out when empty.
+        """
+        compact = {'open': self.open_ports()}
+        for key, field in (('errors', 'error_message'), ('services', 'service'), ('banners', 'banner')):
+            values = {str(port): extra[field] for port, extra in sorted(self.extras.items()) if field in extra}
+            if values:
+                compact[key] = values
+        return compact
+
+    @classmethod
+    def from_compact(cls, compact, host=None, address=None):
+        """Rebuilds a table from compact(): its open and error ports, with their services and banners."""
+        table = cls(host, address)
+        for port in compact.get('open', ()):
+            table.add(port, OPEN)
+        for port, message in compact.get('errors', {}).items():
+            table.add(int(port), ERROR, error_message=message)
+        for key, field in (('services', 'service'), ('banners', 'banner')):
+            for port, value in compact.get(key, {}).items():
+                table.annotate(int(port), **{field: value})
+        table.sort()
+        return table
+
+
+async def _grab_banners(grabber, table, ports=None):
+    """Grabs the banners of the open ports of a PortTable and records them; the service becomes the identified one."""
+    ports = table.open_ports() if ports is None else ports
+    fingerprints = await asyncio.gather(*(grabber.try_grab(table.address, port) for port in ports))
+    for port, fingerprint in zip(ports, fingerprints):
+        if fingerprint.service and fingerprint.service != service_name(port):
+            table.annotate(port, service=fingerprint.service)
+        if fingerprint.banner is not None:
+            table.annotate(port, banner=fingerprint.as_dict())
+
+
+def scan_ports(target_host, provided_ports=None, budget=None, concurrency=1000, timeout=1.0, retries=1, max_timeout=None,
+               banners=None):
     """
-    Scans a target host for open common ports.
+    Scans a target host for open TCP ports.
+
+    Connects are non-blocking and up to `concurrency` of them are in flight at once, so
+    a full 1-65535 sweep takes seconds to minutes, depending on how many ports drop
+    the connect instead of refusing it. Once the host has answered a few connects, the
+    timeout follows its measured round-trip time instead of `timeout`, ports that timed
+    out are retried, and fewer connects are kept in flight when the host drops some.
 
     Args:
         target_host (str): The IP address or hostname to scan.
+        provided_ports (list or str, optional): Ports, or a spec such as '1-1024,8080' or 'top1000'
+                                                (see parse_ports). Defaults to 16 common ports.
+        budget (ScanBudget, optional): Stops the scan once a time/request budget is spent.
+        concurrency (int, optional): Most connects in flight at once.
+        timeout (float, optional): Seconds to wait for each connect until the host's RTT is known.
+        retries (int, optional): Retries of connects that timed out.
+        max_timeout (float, optional): Longest wait for a connect, retries included (default 3x timeout).
+        banners (BannerGrabber, optional): Grabs the banner of each open port as soon as it is found,
+                                           while the connect scan goes on.
 
     Returns:
-        list: A list of integers representing open ports.
+        PortTable: One result per open port, read as a dict ({'port', 'status', 'service'}), in port order;
+                   errors are included too. With banners, open ports whose service answered also get a
+                   'banner' dict ({'service', 'product', 'version', 'banner', 'tls'}, keys without a value
+                   left out). A list with one error dict if the host does not resolve.
     """
-    default_common_ports = [
-        21, 22, 23, 25, 53, 80, 110, 143, 443, 445,
-        3306, 3389, 5900, 8000, 8080, 8443
-    ]
-
-    ports_to_scan_list = []
-    if provided_ports is None:
-        ports_to_scan_list = default_common_ports
-    else:
-        ports_to_scan_list = provided_ports
+    ports_to_scan_list = _port_list(provided_ports)
 
-    results = []
     target_ip = None
 
     # Informational print, acceptable before returning structured data
-    print(f"[*] Scanning {target_host} for open ports...")
+    print(f"[*] Scanning {target_host} for open ports ({len(ports_to_scan_list)} port(s))...")
 
     try:
         target_ip = socket.gethostbyname(target_host)
@@ -39,35 +171,134 @@ def scan_ports(target_host, provided_ports=None):
         print(f"[!] An error occurred resolving hostname {target_host}: {e}. Exiting port scan.")
         return [{'port': None, 'status': 'host_resolution_error', 'service': None, 'error_message': str(e)}]
 
-    for port in ports_to_scan_list: # Iterate over the correct list
-        sock = None
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)
-            result_code = sock.connect_ex((target_ip, port))
-
-            service_name = "unknown"
-            try:
-                service_name = socket.getservbyport(port)
-            except OSError:
-                pass # Keep service_name as "unknown" if not found
-
-            if result_code == 0:
-                results.append({'port': port, 'status': 'open', 'service': service_name})
-            # Optionally, include closed ports in results if desired for JSON output
-            # else:
-            #     results.append({'port': port, 'status': 'closed', 'service': service_name})
-
-        except socket.error as e:
-            results.append({'port': port, 'status': 'error', 'service': 'unknown', 'error_message': f"Socket error: {e}"})
-        except Exception as e:
-            results.append({'port': port, 'status': 'error', 'service': 'unknown', 'error_message': f"Unexpected error: {e}"})
-        finally:
-            if sock:
-                sock.close()
+    results = PortTable(target_host, target_ip)
+
+    def targets():
+        for index, port in enumerate(ports_to_scan_list):
+            if budget is not None and not budget.allow(target_host, 'port'):
+                budget.cancel('port', len(ports_to_scan_list) - index)
+                print(f"[!] Budget spent, {len(ports_to_scan_list) - index} port(s) not tested.")
+                return
+            yield target_ip, port
+
+    scanner = ConnectScanner(concurrency=concurrency, timeout=timeout, max_timeout=max_timeout, retries=retries)
+    started = time.monotonic()
+
+    async def run():
+        grabs = []
+        async for result in scanner.scan(targets()):
+            if result.status not in (CLOSED, FILTERED):
+                results.add_result(result)
+                if banners and result.status == OPEN:
+                    grabs.append(asyncio.ensure_future(_grab_banners(banners, results, [result.port])))
+        await asyncio.gather(*grabs)
+    asyncio.run(run())
+    stats = scanner.stats
+    print(f"[*] {stats[OPEN] + stats[CLOSED] + stats[FILTERED] + stats[ERROR]} port(s) in {time.monotonic() - started:.1f}s: "
+          f"{stats[OPEN]} open, {stats[CLOSED]} closed, {stats[FILTERED]} filtered.")
+    print(f"[*] Connect timeout {scanner.host_timeout(target_ip) * 1000:.0f}ms, {stats['retries']} retries, "
+          f"{stats['drops']} drop(s), {scanner.window:.0f} connects in flight at the end.")
 
+    if banners:
+        print(f"[*] Banners: {banners.stats['identified']} service(s) identified, {banners.stats['unidentified']} not, "
+              f"{banners.stats['failed']} failed, {banners.stats['cached']} cached.")
+
+    results.sort()
     return results
 
+
+def scan_hosts(targets, provided_ports=None, on_host=None, budget=None, concurrency=1000, timeout=1.0, retries=1,
+               max_timeout=None, host_group=256, seed=None, banners=None):
+    """
+    Scans many hosts for open TCP ports at once.
+
+    The host x port pairs are probed in a random order that interleaves `host_group`
+    hosts at a time, under one limit of `concurrency` connects in flight, so no host
+    gets a burst of connects. Each host is reported as soon as its last port finished.
+    Memory does not grow with the number of hosts: ranges are not expanded and only the
+    hosts of the current group are tracked.
+
+    Args:
+        targets (iterable): Host names, IP addresses, CIDR ranges ('10.0.0.0/24') and files listing those.
+        provided_ports (list or str, optional): Ports or a port spec (see parse_ports). Defaults to 16 common ports.
+        on_host (callable, optional): Called with a PortTable of the open ports and errors of every scanned host,
+                                      whose host is the name(s) the address was given as (or the address).
+        budget (ScanBudget, optional): Stops the scan once a time/request budget is spent.
+        concurrency (int, optional): Most connects in flight at once, over all hosts.
+        timeout (float, optional): Seconds to wait for each connect until a host's RTT is known.
+        retries (int, optional): Retries of connects that timed out.
+        max_timeout (float, optional): Longest wait for a connect, retries included (default 3x timeout).
+        host_group (int, optional): Hosts interleaved with each other.
+        seed (optional): Seed of the random order, for repeatable scans.
+        banners (BannerGrabber, optional): Grabs the banners of each host's open ports once its connects are
+                                           done, while other hosts are still scanned; on_host waits for them.
+
+    Returns:
+        dict: Counts of hosts and port statuses, the targets that did not resolve and the pairs not tested.
+    """
+    ports_to_scan_list = _port_list(provided_ports)
+    hosts = TargetSet()
+    for target in targets:
+        try:
+            hosts.add(target)
+        except ValueError as e:
+            print(f"[!] Skipping target: {e}")
+    for target in hosts.unresolved:
+        print(f"[!] Hostname {target} could not be resolved, not scanning it.")
+    total = len(hosts) * len(ports_to_scan_list)
+    print(f"[*] Scanning {len(hosts)} host(s) for open ports ({len(ports_to_scan_list)} port(s) each)...")
+
+    summary = {'hosts': 0, 'hosts_with_open_ports': 0, 'open': 0, 'closed': 0, 'filtered': 0, 'error': 0,
+               'unresolved': hosts.unresolved, 'not_tested': 0}
+    issued = 0
+
+    def allow(address):
+        nonlocal issued
+        if budget is not None and not budget.allow(hosts.names.get(address, [address])[0], 'port'):
+            summary['not_tested'] = total - issued
+            budget.cancel('port', total - issued)
+            print(f"[!] Budget spent, {total - issued} host/port pair(s) not tested.")
+            return False
+        issued += 1
+        return True
+
+    scanner = ConnectScanner(concurrency=concurrency, timeout=timeout, max_timeout=max_timeout, retries=retries)
+    started = time.monotonic()
+
+    async def report(host):
+        table = PortTable(hosts.label(host.address), host.address)
+        for result in host.results:
+            table.add_result(result)
+        if banners and host.counts[OPEN]:
+            await _grab_banners(banners, table)
+        if on_host is not None:
+            on_host(table)
+
+    async def run():
+        reports = set()
+        async for host in scanner.scan_hosts(hosts, ports_to_scan_list, host_group=host_group, seed=seed, allow=allow):
+            summary['hosts'] += 1
+            summary['hosts_with_open_ports'] += bool(host.counts[OPEN])
+            reports.add(asyncio.ensure_future(report(host)))
+            finished = {task for task in reports if task.done()}
+            reports -= finished
+            for task in finished:
+                task.result() # Raises what on_host raised
+        await asyncio.gather(*reports)
+    asyncio.run(run())
+
+    stats = scanner.stats
+    for status in (OPEN, CLOSED, FILTERED, ERROR):
+        summary[status] = stats[status]
+    summary['retries'], summary['drops'] = stats['retries'], stats['drops']
+    print(f"[*] {summary['hosts']} host(s), {issued} connect(s) in {time.monotonic() - started:.1f}s: "
+          f"{stats[OPEN]} open on {summary['hosts_with_open_ports']} host(s), {stats[CLOSED]} closed, {stats[FILTERED]} filtered.")
+    if banners:
+        summary['banners'] = dict(banners.stats)
+        print(f"[*] Banners: {banners.stats['identified']} service(s) identified, {banners.stats['unidentified']} not, "
+              f"{banners.stats['failed']} failed, {banners.stats['cached']} cached.")
+    return summary
+
 def print_results(results, target_host):
     """Prints port scan results in a human-readable format."""
     print(f"\n--- Port Scan Results for {target_host} ---")
@@ -84,7 +315,9 @@ def print_results(results, target_host):
     open_ports_found = False
     for res in results:
         if res['status'] == 'open':
-            print(f"  [+] Port {res['port']} is open (Service: {res.get('service', 'unknown')})")
+            banner = res.get('banner', {})
+            product = ' '.join(filter(None, (banner.get('product'), banner.get('version'))))
+            print(f"  [+] Port {res['port']} is open (Service: {res.get('service', 'unknown')}{', ' + product if product else ''})")
             open_ports_found = True
         # Optionally print errors for specific ports if they are included in results
         # elif res['status'] == 'error':
@@ -94,6 +327,18 @@ def print_results(results, target_host):
         print(f"  No common ports found open on {target_host} from the list scanned.")
 
 if __name__ == '__main__':
+    import json
+
+    sample = PortTable('example.test', '192.0.2.1')
+    for port, status in ((22, OPEN), (80, OPEN), (443, CLOSED), (8443, OPEN)):
+        sample.add(port, status)
+    sample.add(25, ERROR, error_message="Socket error: [Errno 101] Network is unreachable")
+    sample.annotate(8443, service='http', banner={'service': 'http', 'product': 'nginx', 'tls': True})
+    sample.sort()
+    restored = PortTable.from_compact(json.loads(json.dumps(sample.compact())))
+    kept = [result for result in sample if result['status'] != CLOSED] # compact() leaves out closed/filtered ports
+    print(f"[*] compact() round trip: {sample.compact()} -> {'ok' if restored.to_dicts() == kept else 'MISMATCH'}")
+
     host_to_scan_example = "scanme.nmap.org"
 
     print(f"[*] Example Port Scan for: {host_to_scan_example}")
@@ -0,0 +1,144 @@
+import threading
+import time
+
+LIMIT_KEYS = ('seconds', 'requests', 'bytes')
+
+
+class ScanBudget:
+    """
+    Wall-clock, request and byte budgets for a run, for every host and per scan type.
+
+    Scans call allow() before each request (DNS lookup, connect or HTTP request) and
+    stop their loop as soon as it returns False; the entries they never tried are
+    passed to cancel() so the report says how much of each scan is missing.
+    """
+
+    def __init__(self, run=None, per_host=None, per_scan=None):
+        """
+        Args:
+            run (dict, optional): Limits for the whole run: 'seconds', 'requests', 'bytes' (None = unlimited).
+            per_host (dict, optional): The same limits, applied to every host separately.
+            per_scan (dict, optional): The same limits, applied to every scan type separately.
+        """
+        self.limits = {
+            'run': {k: (run or {}).get(k) for k in LIMIT_KEYS},
+            'host': {k: (per_host or {}).get(k) for k in LIMIT_KEYS},
+            'scan': {k: (per_scan or {}).get(k) for k in LIMIT_KEYS},
+        }
+        self._usage = {('run', None): self._new_usage()}
+        self._cancelled = {} # scan type -> entries never attempted
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _new_usage():
+        return {'started': time.monotonic(), 'requests': 0, 'bytes': 0, 'exhausted': None}
+
+    @property
+    def enabled(self):
+        return any(v for limits in self.limits.values() for v in limits.values())
+
+    def _spent(self, scope, name):
+        usage = self._usage.get((scope, name))
+        if usage is None:
+            usage = self._usage[(scope, name)] = self._new_usage()
+        if usage['exhausted'] is None:
+            limits = self.limits[scope]
+            if limits['seconds'] and time.monotonic() - usage['started'] >= limits['seconds']:
+                usage['exhausted'] = 'seconds'
+            elif limits['requests'] and usage['requests'] >= limits['requests']:
+                usage['exhausted'] = 'requests'
+            elif limits['bytes'] and usage['bytes'] >= limits['bytes']:
+                usage['exhausted'] = 'bytes'
+        return usage['exhausted']
+
+    def _scopes(self, host, scan):
+        return [('run', None), ('host', host), ('scan', scan)]
+
+    def allow(self, host, scan):
+        """
+        Reserves one request of a scan against the run, host and scan budgets.
+
+        Returns:
+            bool: False once any of them is spent; the request must not be sent.
+        """
+        with self._lock:
+            scopes = self._scopes(host, scan)
+            if any(self._spent(scope, name) for scope, name in scopes):
+                return False
+            for key in scopes:
+                self._usage[key]['requests'] += 1
+            return True
+
+    def record_bytes(self, host, scan, count):
+        """Adds received bytes to the budgets of a request."""
+        with self._lock:
+            for scope, name in self._scopes(host, scan):
+                self._spent(scope, name)
+                self._usage[(scope, name)]['bytes'] += count
+
+    def cancel(self, scan, count):
+        """Records `count` entries of a scan that were never attempted because a budget was spent."""
+        if count > 0:
+            with self._lock:
+                self._cancelled[scan] = self._cancelled.get(scan, 0) + count
+
+    def run_exhausted(self):
+        with self._lock:
+            return self._spent('run', None) is not None
+
+    def report(self):
+        """
+        Returns budget usage for the JSON report.
+
+        Returns:
+            dict: {'partial', 'run', 'scans', 'hosts', 'cancelled'}; 'hosts' lists only hosts whose budget ran out.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._spent('run', None)
+
+            def describe(key):
+                usage = self._usage[key]
+                return {'elapsed': round(now - usage['started'], 1), 'requests': usage['requests'],
+                        'bytes': usage['bytes'], 'exhausted': usage['exhausted']}
+
+            return {
+                'partial': bool(self._cancelled) or any(u['exhausted'] for u in self._usage.values()),
+                'run': describe(('run', None)),
+                'scans': {key[1]: describe(key) for key in self._usage if key[0] == 'scan'},
+                'hosts': {key[1]: describe(key) for key, usage in self._usage.items()
+                          if key[0] == 'host' and usage['exhausted']},
+                'cancelled': dict(self._cancelled),
+            }
+
+
+def print_report(report):
+    """Prints the budget report in a human-readable format."""
+    run = report['run']
+    if not report['partial']:
+        print(f"[*] Budget: {run['requests']} request(s), {run['bytes']} byte(s) in {run['elapsed']}s, within limits.")
+        return
+    print(f"\n[!] Budget spent, results are PARTIAL ({run['requests']} request(s), {run['bytes']} byte(s) in {run['elapsed']}s).")
+    if run['exhausted']:
+        print(f"  Run budget ({run['exhausted']}) spent.")
+    for scan, usage in report['scans'].items():
+        if usage['exhausted']:
+            print(f"  {scan} scan budget ({usage['exhausted']}) spent.")
+    for host, usage in report['hosts'].items():
+        print(f"  Host {host} budget ({usage['exhausted']}) spent.")
+    for scan, count in report['cancelled'].items():
+        print(f"  {scan}: {count} entr{'y' if count == 1 else 'ies'} not tested.")
+
+
+if __name__ == '__main__':
+    print("[*] ScanBudget Example")
+    budget = ScanBudget(run={'seconds': 0.3}, per_host={'requests': 3}, per_scan={'bytes': 100})
+
+    attempts = [budget.allow('example.com', 'dir') for _ in range(5)]
+    budget.cancel('dir', attempts.count(False))
+    print(f"  dir requests to example.com (host limit 3): {attempts}")
+    budget.record_bytes('other.example.com', 'header', 150)
+    print(f"  header after 150 bytes (scan limit 100): {budget.allow('other.example.com', 'header')}")
+    time.sleep(0.35)
+    print(f"  run exhausted after 0.35s (run limit 0.3s): {budget.run_exhausted()}")
+    print_report(budget.report())
@@ -0,0 +1,169 @@
+import cProfile
+import collections
+import contextlib
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+PROFILE_MODES = ('cprofile', 'sample')
+
+
+class ScanProfiler:
+    """
+    Profiles each scan of a run as its own phase (subdomain, port, dir, wayback, header, robots).
+
+    Scans run one after the other, so every phase gets one cProfile.Profile ('cprofile'
+    mode) or, in 'sample' mode, a background thread records the stacks of all threads
+    every `sample_interval` seconds while the phase runs. With `trace_memory`, a
+    tracemalloc snapshot is taken at the start and end of every phase.
+
+    close() writes <phase>.prof or <phase>.folded files and summary.txt (top-N functions
+    and allocation sites per phase) into a 'profile-<timestamp>' directory.
+    """
+
+    def __init__(self, output_dir, mode='cprofile', top_n=25, sample_interval=0.005, trace_memory=True):
+        """
+        Args:
+            output_dir (str): Directory the profile directory is created in.
+            mode (str, optional): 'cprofile' (deterministic) or 'sample' (statistical, lower overhead).
+            top_n (int, optional): Functions and allocation sites listed per phase.
+            sample_interval (float, optional): Seconds between stack samples in 'sample' mode.
+            trace_memory (bool, optional): Snapshot traced memory at phase boundaries.
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"profile mode must be one of {PROFILE_MODES}, not {mode!r}")
+        self.output_dir = output_dir
+        self.mode = mode
+        self.top_n = top_n
+        self.sample_interval = sample_interval
+        self.trace_memory = trace_memory
+        self.phases = {} # phase -> {'seconds', 'profile', 'samples', 'memory'}
+        self._current = None
+        self._stop = threading.Event()
+        self._sampler = None
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if mode == 'sample':
+            self._sampler = threading.Thread(target=self._sample_loop, name='profile-sampler', daemon=True)
+            self._sampler.start()
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.sample_interval):
+            phase = self._current
+            if phase is None:
+                continue
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                phase['samples'][';'.join(reversed(stack))] += 1
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Profiles the enclosed scan as phase `name`."""
+        phase = {'seconds': 0.0, 'profile': None, 'samples': collections.Counter(), 'memory': None}
+        self.phases[name] = phase
+        before = None
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            before = self._snapshot()
+        if self.mode == 'cprofile':
+            phase['profile'] = cProfile.Profile()
+            phase['profile'].enable()
+        self._current = phase
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            phase['seconds'] = time.monotonic() - started
+            self._current = None
+            if phase['profile'] is not None:
+                phase['profile'].disable()
+            if before is not None:
+                current, peak = tracemalloc.get_traced_memory()
+                phase['memory'] = (current, peak, self._snapshot().compare_to(before, 'lineno')[:self.top_n])
+
+    def close(self):
+        """
+        Stops profiling and writes the profiles and summary.txt.
+
+        Returns:
+            str: The directory the profile was written to.
+        """
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        directory = os.path.join(self.output_dir, time.strftime('profile-%Y%m%d-%H%M%S'))
+        os.makedirs(directory, exist_ok=True)
+        out = io.StringIO()
+        out.write(f"Profile mode: {self.mode}\n")
+        for name, phase in self.phases.items():
+            out.write(f"\n=== Phase {name}: {phase['seconds']:.2f}s ===\n")
+            if phase['profile'] is not None:
+                stats = pstats.Stats(phase['profile'], stream=out)
+                stats.dump_stats(os.path.join(directory, f"{name}.prof"))
+                stats.strip_dirs().sort_stats('cumulative').print_stats(self.top_n)
+            elif phase['samples']:
+                samples = phase['samples']
+                with open(os.path.join(directory, f"{name}.folded"), 'w', encoding='utf-8') as f:
+                    for stack, count in samples.most_common():
+                        f.write(f"{stack} {count}\n")
+                total = sum(samples.values())
+                own = collections.Counter()
+                for stack, count in samples.items():
+                    own[stack.rsplit(';', 1)[-1]] += count
+                out.write(f"{total} samples every {self.sample_interval * 1000:g}ms, top {self.top_n} by own samples:\n")
+                for function, count in own.most_common(self.top_n):
+                    out.write(f"  {100.0 * count / total:6.1f}%  {count:>7}  {function}\n")
+            if phase['memory'] is not None:
+                current, peak, growth = phase['memory']
+                out.write(f"Memory: traced {current / 1024 / 1024:.1f} MiB at end, peak {peak / 1024 / 1024:.1f} MiB. "
+                          f"Top allocation sites by growth:\n")
+                for stat in growth:
+                    out.write(f"  {stat}\n")
+        with open(os.path.join(directory, 'summary.txt'), 'w', encoding='utf-8') as f:
+            f.write(out.getvalue())
+        return directory
+
+
+def profile_phase(profiler, name):
+    """profiler.phase(name), or a no-op context when profiling is off."""
+    return profiler.phase(name) if profiler is not None else contextlib.nullcontext()
+
+
+if __name__ == '__main__':
+    import json
+    import tempfile
+
+    print("[*] ScanProfiler Example")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in PROFILE_MODES:
+            profiler = ScanProfiler(tmp, mode=mode, top_n=3, sample_interval=0.001)
+            with profile_phase(profiler, 'subdomain'):
+                hosts = json.loads(json.dumps([f"host-{i}.example.com" for i in range(100000)]))
+            with profile_phase(profiler, 'port'):
+                sum(i * i for i in range(300000))
+            directory = profiler.close()
+            print(f"\n--- mode={mode}: {sorted(os.listdir(directory))} ---")
+            with open(os.path.join(directory, 'summary.txt')) as f:
+                print(f.read()[:1500])
+            time.sleep(1) # Next mode gets its own timestamped directory
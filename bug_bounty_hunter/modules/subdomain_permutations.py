@@ -0,0 +1,188 @@
+import hashlib
+import itertools
+import math
+import re
+
+# Words combined with discovered names; extend with --permutation_words.
+DEFAULT_WORDS = (
+    'dev', 'development', 'stage', 'staging', 'stg', 'test', 'qa', 'uat', 'prod', 'preprod', 'demo', 'beta',
+    'int', 'internal', 'ext', 'admin', 'api', 'app', 'old', 'new', 'v1', 'v2', 'backup', 'sandbox', 'corp',
+    'cdn', 'static', 'mobile', 'portal', 'auth', 'vpn', 'git', 'ci',
+)
+
+# Templates expanded for every discovered name. Fields: {sub} the name without the domain
+# ('api.staging'), {label} its first label ('api'), {rest} the labels after it ('staging'),
+# {stem} the first label without trailing digits ('api' for 'api2'), {word} every word,
+# {n} 1..max_number. 'swap' and 'drop' are built-in rules: replace a dash-separated part
+# that is a known word by every other word ('dev-api' -> 'staging-api'), and remove one
+# dash-separated part or one label ('dev-api' -> 'api').
+DEFAULT_PATTERNS = (
+    '{word}-{sub}', '{label}-{word}.{rest}', '{word}{sub}', '{label}{word}.{rest}',
+    '{word}.{sub}', '{label}.{word}.{rest}',
+    '{stem}{n}.{rest}', '{stem}-{n}.{rest}', '{stem}0{n}.{rest}',
+    'swap', 'drop',
+)
+
+_LABEL = re.compile(r'^[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?$')
+_TRAILING_DIGITS = re.compile(r'\d+$')
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Memory is decided up front from the expected number of items and the acceptable
+    false-positive rate, so it does not grow with the input. A false positive here
+    means a candidate is wrongly treated as already tried and skipped.
+    """
+
+    def __init__(self, capacity=1000000, error_rate=0.001):
+        """
+        Args:
+            capacity (int, optional): Expected number of distinct items.
+            error_rate (float, optional): Target false-positive probability at capacity.
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item):
+        # Double hashing (Kirsch-Mitzenmacher) from one 128-bit digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def add(self, item):
+        """
+        Adds an item.
+
+        Returns:
+            bool: True if the item was (probably) not present before.
+        """
+        added = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                added = True
+        return added
+
+
+def normalize(candidate):
+    """Lower-cases a candidate and drops empty labels; returns None if it is not a valid host name."""
+    labels = [label for label in candidate.lower().split('.') if label]
+    if not labels or not all(_LABEL.match(label) for label in labels):
+        return None
+    return '.'.join(labels)
+
+
+class PermutationGenerator:
+    """
+    Lazily generates alterations of discovered subdomains (dev-api, api2, api.staging, ...).
+
+    Candidates are produced one at a time from the pattern templates and rules, so the
+    alteration space is never materialized. Every name handed out or marked as known is
+    added to a Bloom filter of fixed size and never produced again, across rounds: the
+    names found in one round are the seeds of the next.
+    """
+
+    def __init__(self, words=DEFAULT_WORDS, patterns=DEFAULT_PATTERNS, max_number=3, capacity=1000000, error_rate=0.001):
+        """
+        Args:
+            words (iterable, optional): Words combined with the discovered names.
+            patterns (iterable, optional): Templates and rule names, see DEFAULT_PATTERNS.
+            max_number (int, optional): Highest number tried for {n}.
+            capacity (int, optional): Distinct names the Bloom filter is sized for.
+            error_rate (float, optional): Chance that an untried name is skipped at capacity.
+        """
+        self.words = tuple(dict.fromkeys(w.strip().lower() for w in words if w.strip()))
+        self.patterns = tuple(patterns)
+        self.max_number = max_number
+        self.seen = BloomFilter(capacity, error_rate)
+        self.generated = 0
+        self._word_set = frozenset(self.words)
+
+    def add_known(self, subs):
+        """Marks names (without the domain) as already tried, e.g. the wordlist results."""
+        for sub in subs:
+            sub = normalize(sub)
+            if sub:
+                self.seen.add(sub)
+
+    def _expand(self, pattern, sub):
+        label, _, rest = sub.partition('.')
+        fields = {'sub': sub, 'label': label, 'rest': rest, 'stem': _TRAILING_DIGITS.sub('', label) or label}
+        words = self.words if '{word}' in pattern else ('',)
+        numbers = range(1, self.max_number + 1) if '{n}' in pattern else (0,)
+        for word, n in itertools.product(words, numbers):
+            yield pattern.format(word=word, n=n, **fields)
+
+    def _swap(self, sub):
+        label, _, rest = sub.partition('.')
+        parts = label.split('-')
+        for index, part in enumerate(parts):
+            if part in self._word_set:
+                for word in self.words:
+                    if word != part:
+                        yield '-'.join(parts[:index] + [word] + parts[index + 1:]) + '.' + rest
+
+    @staticmethod
+    def _drop(sub):
+        labels = sub.split('.')
+        parts = labels[0].split('-')
+        if len(parts) > 1:
+            for index in range(len(parts)):
+                yield '.'.join(['-'.join(parts[:index] + parts[index + 1:])] + labels[1:])
+        if len(labels) > 1:
+            for index in range(len(labels)):
+                yield '.'.join(labels[:index] + labels[index + 1:])
+
+    def _alterations(self, sub):
+        for pattern in self.patterns:
+            if pattern == 'swap':
+                yield from self._swap(sub)
+            elif pattern == 'drop':
+                yield from self._drop(sub)
+            else:
+                yield from self._expand(pattern, sub)
+
+    def candidates(self, seeds):
+        """
+        Yields new alterations of the seed names (without the domain), lazily.
+
+        The seeds themselves are marked as known. Names already produced in this or an
+        earlier round are skipped.
+        """
+        for seed in seeds:
+            seed = normalize(seed)
+            if not seed:
+                continue
+            self.seen.add(seed)
+            for candidate in self._alterations(seed):
+                candidate = normalize(candidate)
+                if candidate and self.seen.add(candidate):
+                    self.generated += 1
+                    yield candidate
+
+
+if __name__ == '__main__':
+    print("[*] PermutationGenerator Example")
+    generator = PermutationGenerator(capacity=100000)
+    generator.add_known(['www'])
+    first = list(itertools.islice(generator.candidates(['api', 'dev-api', 'app2.eu']), 5000))
+    print(f"  Round 1: {len(first)} candidate(s) from 3 seeds, e.g. {first[:8]}")
+    for expected in ('api2', 'api.staging', 'staging-api', 'dev', 'app1.eu', 'app3.eu', 'app2'):
+        print(f"    {expected:<12} {'generated' if expected in first else 'MISSING'}")
+    print(f"  'www' (known) generated: {'www' in first}")
+    second = list(generator.candidates(['api2', 'staging-api']))
+    print(f"  Round 2: {len(second)} new candidate(s); repeats of round 1: {len(set(first) & set(second))}")
+
+    lazy = generator.candidates(f"host{i}" for i in range(10 ** 9)) # Never materialized
+    print(f"  Lazy over 10^9 seeds, first 3: {list(itertools.islice(lazy, 3))}")
+    print(f"  Bloom filter: {len(generator.seen.bits) // 1024} KiB, {generator.seen.num_hashes} hashes")
@@ -1,9 +1,164 @@
+import array
+import asyncio
+import collections
+import collections.abc
+import gzip
+import ipaddress
+import itertools
 import socket
 import os
+import time
+
+from dns_resolver import AsyncResolver, WildcardDetector
+from subdomain_permutations import PermutationGenerator
 
 # Determine the correct path to the wordlists directory relative to this module
 MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
 DEFAULT_SUBDOMAIN_WORDLIST = os.path.join(MODULE_DIR, '..', 'wordlists', 'common_subdomains.txt')
+GZIP_MAGIC = b'\x1f\x8b'
+
+class SubdomainHit(collections.namedtuple('SubdomainHit', 'subdomain ip position')):
+    """A subdomain that resolved; position is its line number in the wordlist (0-based)."""
+    __slots__ = ()
+
+    def as_dict(self):
+        return {'subdomain': self.subdomain, 'ip': self.ip, 'status': 'found'}
+
+
+class SubdomainTable(collections.abc.Sequence):
+    """
+    Subdomain scan results stored column by column.
+
+    Names are kept as strings, IPv4 addresses as 32-bit integers, statuses and sources
+    as one byte each, and wordlist positions in an integer array, instead of one dict
+    per name. Indexing or iterating gives the usual result dicts ({'subdomain', 'ip',
+    'status'}, plus 'source' when set), built on the fly; compact() gives a columnar
+    form for reports.
+    """
+    __slots__ = ('names', 'positions', '_ipv4', '_states', '_sources', '_other')
+
+    STATUSES = ('found', 'wildcard', 'not_resolved', 'error')
+    SOURCES = (None, 'permutation')
+
+    def __init__(self):
+        self.names = []
+        self.positions = array.array('q') # Wordlist line number, -1 when there is none
+        self._ipv4 = array.array('I') # 0 when the address is missing or not IPv4
+        self._states = bytearray()
+        self._sources = bytearray()
+        self._other = {} # index -> {'ip': IPv6 address, 'status': 'error: <reason>'}, for the few that need it
+
+    def add(self, subdomain, ip=None, status='found', source=None, position=None):
+        """Appends one result; status may be any of STATUSES, or 'error: <reason>'."""
+        index = len(self.names)
+        self.names.append(subdomain)
+        self.positions.append(-1 if position is None else position)
+        other = {}
+        address = ipaddress.ip_address(ip) if ip else None
+        if address is not None and address.version == 4 and int(address):
+            self._ipv4.append(int(address))
+        else:
+            self._ipv4.append(0)
+            if address is not None:
+                other['ip'] = ip
+        state = status.split(':', 1)[0]
+        self._states.append(self.STATUSES.index(state))
+        if state != status:
+            other['status'] = status
+        self._sources.append(self.SOURCES.index(source))
+        if other:
+            self._other[index] = other
+
+    def add_hit(self, hit, source=None):
+        """Appends a SubdomainHit."""
+        self.add(hit.subdomain, hit.ip, source=source, position=hit.position)
+
+    def __len__(self):
+        return len(self.names)
+
+    def ip(self, index):
+        packed = self._ipv4[index]
+        if packed:
+            return str(ipaddress.IPv4Address(packed))
+        return self._other.get(index, {}).get('ip')
+
+    def status(self, index):
+        return self._other.get(index, {}).get('status') or self.STATUSES[self._states[index]]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        result = {'subdomain': self.names[index], 'ip': self.ip(index), 'status': self.status(index)}
+        if self._sources[index]:
+            result['source'] = self.SOURCES[self._sources[index]]
+        return result
+
+    def sort(self):
+        """Sorts by wordlist position; results without one keep their order after the others."""
+        order = sorted(range(len(self)), key=lambda i: (0, self.positions[i]) if self.positions[i] >= 0 else (1, i))
+        self.names = [self.names[i] for i in order]
+        self.positions = array.array('q', (self.positions[i] for i in order))
+        self._ipv4 = array.array('I', (self._ipv4[i] for i in order))
+        self._states = bytearray(self._states[i] for i in order)
+        self._sources = bytearray(self._sources[i] for i in order)
+        new_index = {old: new for new, old in enumerate(order) if old in self._other}
+        self._other = {new_index[old]: other for old, other in self._other.items()}
+
+    def to_dicts(self):
+        return list(self)
+
+    def compact(self):
+        """
+        Columnar form for reports: parallel 'subdomain' and 'ip' lists, plus 'status' and
+        'source' lists only when some result is not a plain wordlist hit.
+        """
+        columns = {'subdomain': self.names, 'ip': [self.ip(i) for i in range(len(self))]}
+        if any(self._states) or self._other:
+            columns['status'] = [self.status(i) for i in range(len(self))]
+        if any(self._sources):
+            columns['source'] = [self.SOURCES[source] for source in self._sources]
+        return columns
+
+    @classmethod
+    def from_compact(cls, columns):
+        """Rebuilds a table from compact(); wordlist positions are not part of it and stay unset."""
+        table = cls()
+        count = len(columns['subdomain'])
+        statuses = columns.get('status') or ['found'] * count
+        sources = columns.get('source') or [None] * count
+        for subdomain, ip, status, source in zip(columns['subdomain'], columns['ip'], statuses, sources):
+            table.add(subdomain, ip, status, source)
+        return table
+
+
+def open_wordlist(wordlist_path):
+    """Opens a wordlist for reading text; gzip-compressed files are recognized by their magic bytes."""
+    with open(wordlist_path, 'rb') as f:
+        compressed = f.read(2) == GZIP_MAGIC
+    if compressed:
+        return gzip.open(wordlist_path, 'rt', encoding='utf-8', errors='replace')
+    return open(wordlist_path, 'r', encoding='utf-8', errors='replace')
+
+
+def iter_wordlist(wordlist_path, start=0):
+    """
+    Reads a wordlist lazily, one entry per line.
+
+    Args:
+        wordlist_path (str): Plain or gzip-compressed wordlist.
+        start (int, optional): Line number (0-based) to start at, e.g. the resume_from of an earlier scan.
+
+    Yields:
+        tuple: (line number, entry) for every non-empty line.
+    """
+    with open_wordlist(wordlist_path) as f:
+        for number, line in enumerate(itertools.islice(f, start, None), start):
+            entry = line.strip()
+            if entry:
+                yield number, entry
+
 
 def load_wordlist(wordlist_path):
     """Loads a wordlist from the given path, one entry per line."""
@@ -11,24 +166,210 @@ def load_wordlist(wordlist_path):
         print(f"[!] Wordlist not found: {wordlist_path}")
         return []
     try:
-        with open(wordlist_path, 'r') as f:
-            return [line.strip() for line in f if line.strip()]
+        return [entry for _, entry in iter_wordlist(wordlist_path)]
     except Exception as e:
         print(f"[!] Error reading wordlist {wordlist_path}: {e}")
         return []
 
-def find_subdomains(domain, wordlist_path=None):
+
+def _resolve_wordlist(domain, entries, on_result, budget, nameservers, concurrency, rate_limit, timeout, wildcards,
+                      cache, count_remaining=True):
+    """
+    Resolves '<entry>.<domain>' for every (line number, entry) and calls on_result(line number, answer, status).
+
+    status is 'found', 'wildcard', 'not_resolved' or 'error: <reason>'. Only the queries
+    in flight are held in memory. Returns a summary dict: counts per status, resolver
+    statistics and resume_from, the line number of the first untested entry when the
+    budget ran out (None once the wordlist is done). Without `count_remaining` the
+    untested entries are not counted, for generators too large to run to the end.
+    """
+    domain = domain.rstrip('.').lower() # Answer names carry no trailing dot
+    detector = WildcardDetector() if wildcards is True else wildcards or None
+    positions = {} # name -> line numbers of its queries in flight
+    summary = {'tested': 0, 'found': 0, 'wildcard': 0, 'not_resolved': 0, 'error': 0, 'resume_from': None}
+    errors = collections.Counter()
+
+    def candidates():
+        for position, sub in entries:
+            if budget is not None and not budget.allow(domain, 'subdomain'):
+                summary['resume_from'] = position
+                if count_remaining:
+                    remaining = 1 + sum(1 for _ in entries)
+                    budget.cancel('subdomain', remaining)
+                    print(f"[!] Budget spent, {remaining} subdomain(s) not tested; resume at line {position}.")
+                else:
+                    print("[!] Budget spent, remaining candidates not tested.")
+                return
+            name = f"{sub}.{domain}".lower()
+            positions.setdefault(name, []).append(position)
+            yield name
+
+    async def resolve():
+        async with AsyncResolver(nameservers, timeout=timeout, max_outstanding=concurrency,
+                                 rate_limit=rate_limit, cache=cache) as resolver:
+            async for answer in resolver.resolve_many(candidates()):
+                queued = positions[answer.name]
+                position = queued.pop(0)
+                if not queued:
+                    del positions[answer.name]
+                status = answer.status
+                if status == 'found' and detector is not None and await detector.is_wildcard(resolver, answer):
+                    status = 'wildcard'
+                summary['tested'] += 1
+                if status == 'error':
+                    errors[answer.error] += 1
+                    status = f'error: {answer.error}'
+                    summary['error'] += 1
+                else:
+                    summary[status] += 1
+                on_result(position, answer, status)
+            return resolver.stats
+
+    started = time.monotonic()
+    stats = asyncio.run(resolve())
+    summary['errors'] = dict(errors)
+    summary['cached'] = stats['cached']
+    summary['queries'] = stats['queries']
+    print(f"[*] Resolved {summary['tested']} name(s) in {time.monotonic() - started:.1f}s ({stats['cached']} from cache, "
+          f"{stats['queries']} queries, {stats['retransmits']} retransmit(s), {stats['tcp_fallbacks']} TCP fallback(s)).")
+
+    if detector is not None:
+        for zone, fingerprint in detector.report().items():
+            print(f"[!] Wildcard DNS on *.{zone} ({', '.join(fingerprint['addresses'][:4])}): "
+                  f"{fingerprint['filtered']} name(s) reported as 'wildcard', not as found.")
+    return summary
+
+
+def _first_address(answer):
+    ipv4 = [ip for ip in answer.addresses if ':' not in ip]
+    return (ipv4 or answer.addresses)[0]
+
+
+def scan_subdomains(domain, wordlist_path=None, on_hit=None, start=0, budget=None, nameservers=None, concurrency=500,
+                    rate_limit=None, timeout=2.0, wildcards=True, cache=None):
+    """
+    Streaming subdomain scan for wordlists of any size.
+
+    The wordlist (plain or gzip) is read lazily and only found subdomains are passed
+    on, as compact SubdomainHit records in completion order; wildcard answers, misses
+    and errors are only counted. Memory stays flat however long the wordlist is.
+
+    Args:
+        domain (str): The target domain (e.g., "example.com").
+        wordlist_path (str, optional): Path to a custom subdomain wordlist. Defaults to 'common_subdomains.txt'.
+        on_hit (callable, optional): Called with a SubdomainHit for every found subdomain.
+        start (int, optional): Wordlist line number to start at, to resume an earlier scan.
+        Other arguments: as for find_subdomains.
+
+    Returns:
+        dict: 'tested', 'found', 'wildcard', 'not_resolved' and 'error' counts, 'errors'
+              (reason -> count), 'cached', 'queries' and 'resume_from' (line number to pass
+              as `start` to continue after a spent budget, None when the wordlist is done).
+    """
+    domain = domain.rstrip('.').lower()
+    if wordlist_path is None:
+        wordlist_path = DEFAULT_SUBDOMAIN_WORDLIST
+        print(f"[*] Using default subdomain wordlist: {wordlist_path}")
+    if not os.path.exists(wordlist_path):
+        print(f"[!] Wordlist not found: {wordlist_path}. Aborting subdomain scan.")
+        return None
+
+    print(f"[*] Scanning for subdomains of {domain} using wordlist: {os.path.basename(wordlist_path)}"
+          f"{f' from line {start}' if start else ''}...")
+
+    def on_result(position, answer, status):
+        if status == 'found' and on_hit is not None:
+            on_hit(SubdomainHit(answer.name, _first_address(answer), position))
+
+    return _resolve_wordlist(domain, iter_wordlist(wordlist_path, start), on_result, budget, nameservers,
+                             concurrency, rate_limit, timeout, wildcards, cache)
+
+
+def scan_permutations(domain, seeds, generator=None, max_rounds=3, on_hit=None, budget=None, nameservers=None,
+                      concurrency=500, rate_limit=None, timeout=2.0, wildcards=True, cache=None):
+    """
+    Resolves alterations of discovered subdomains in rounds until no new names are found.
+
+    Round 1 resolves the alterations of `seeds` (dev-api, api2, api.staging, ...); the
+    names found in a round are the seeds of the next. Candidates are generated lazily
+    and deduplicated by the generator's Bloom filter, so no round materializes its
+    candidate list. Hits are passed to on_hit as for scan_subdomains.
+
+    Args:
+        domain (str): The target domain (e.g., "example.com").
+        seeds (iterable): Discovered subdomains, with or without the domain.
+        generator (PermutationGenerator, optional): Words, patterns and the names already tried.
+        max_rounds (int, optional): Rounds at most.
+        wildcards (bool or WildcardDetector, optional): Pass the detector of the wordlist scan to reuse its zones.
+        Other arguments: as for find_subdomains.
+
+    Returns:
+        dict: 'rounds' (one scan_subdomains-style summary per round), 'found' and 'candidates'.
+    """
+    domain = domain.rstrip('.').lower()
+    generator = generator or PermutationGenerator()
+    detector = WildcardDetector() if wildcards is True else wildcards or None
+    suffix = f".{domain}"
+    seeds = [seed.lower()[:-len(suffix)] if seed.lower().endswith(suffix) else seed for seed in seeds]
+    summary = {'rounds': [], 'found': 0, 'candidates': 0}
+
+    for round_number in range(1, max_rounds + 1):
+        if not seeds:
+            break
+        if budget is not None and budget.run_exhausted():
+            break
+        print(f"[*] Permutation round {round_number}: alterations of {len(seeds)} subdomain(s)...")
+        generator.add_known(seeds) # A seed is not rediscovered as an alteration of an earlier seed
+        found = []
+
+        def on_result(position, answer, status):
+            if status == 'found':
+                found.append(answer.name[:-len(suffix)])
+                if on_hit is not None:
+                    on_hit(SubdomainHit(answer.name, _first_address(answer), None))
+
+        generated_before = generator.generated
+        round_summary = _resolve_wordlist(
+            domain, enumerate(generator.candidates(seeds)), on_result, budget, nameservers, concurrency,
+            rate_limit, timeout, detector or False, cache, count_remaining=False
+        )
+        round_summary['candidates'] = generator.generated - generated_before
+        summary['rounds'].append(round_summary)
+        summary['found'] += round_summary['found']
+        summary['candidates'] += round_summary['candidates']
+        if round_summary['resume_from'] is not None:
+            break # Budget spent
+        seeds = found
+    return summary
+
+
+def find_subdomains(domain, wordlist_path=None, budget=None, nameservers=None, concurrency=500, rate_limit=None,
+                    timeout=2.0, wildcards=True, cache=None):
     """
     Finds active subdomains for a given domain using a wordlist.
 
+    Names are resolved concurrently by an AsyncResolver that queries the nameservers
+    directly, so large wordlists take minutes instead of hours. Every tested name is
+    returned, so memory grows with the wordlist; use scan_subdomains for huge lists.
+
     Args:
         domain (str): The target domain (e.g., "example.com").
         wordlist_path (str, optional): Path to a custom subdomain wordlist.
                                        Defaults to 'common_subdomains.txt'.
+        budget (ScanBudget, optional): Stops the scan once a time/request budget is spent.
+        nameservers (list, optional): Recursive nameservers ('ip' or 'ip:port'). Default: /etc/resolv.conf.
+        concurrency (int, optional): DNS queries in flight at once.
+        rate_limit (float, optional): Queries per second per nameserver (None = unlimited).
+        timeout (float, optional): Seconds to wait for an answer before retransmitting.
+        wildcards (bool or WildcardDetector, optional): Report names that only resolve through a
+            wildcard record as 'wildcard' instead of 'found'. Pass a WildcardDetector to set its
+            options or read its report afterwards; False disables the check.
+        cache (DNSCache, optional): Names with an unexpired cached answer are not queried;
+            new answers are stored in it.
 
     Returns:
-        list: A list of tuples, where each tuple contains (subdomain_full_url, ip_address).
-              Returns an empty list if no subdomains are found or if the base domain is invalid.
+        SubdomainTable: One result per tested name in wordlist order, each read as a dict
+                        {'subdomain', 'ip', 'status'}. Empty if the wordlist is missing or empty.
     """
     if wordlist_path is None:
         wordlist_path = DEFAULT_SUBDOMAIN_WORDLIST
@@ -38,22 +379,19 @@ def find_subdomains(domain, wordlist_path=None):
     if not subdomain_list:
         # This print is acceptable as it's an early exit / config error
         print(f"[*] No subdomains loaded from wordlist: {wordlist_path}. Aborting subdomain scan.")
-        return []
+        return SubdomainTable()
 
-    results = []
     # This print is acceptable as it's informational about the process
     print(f"[*] Scanning for subdomains of {domain} using wordlist: {os.path.basename(wordlist_path)}...")
 
-    for sub in subdomain_list:
-        subdomain_url = f"{sub}.{domain}"
-        try:
-            ip_address = socket.gethostbyname(subdomain_url)
-            results.append({'subdomain': subdomain_url, 'ip': ip_address, 'status': 'found'})
-        except socket.gaierror:
-            results.append({'subdomain': subdomain_url, 'ip': None, 'status': 'not_resolved'})
-        except Exception as e:
-            results.append({'subdomain': subdomain_url, 'ip': None, 'status': f'error: {e}'})
+    results = SubdomainTable()
+
+    def on_result(position, answer, status):
+        results.add(answer.name, _first_address(answer) if answer.addresses else None, status, position=position)
 
+    _resolve_wordlist(domain, iter(enumerate(subdomain_list)), on_result, budget, nameservers, concurrency,
+                      rate_limit, timeout, wildcards, cache)
+    results.sort() # Wordlist order, whatever order the answers arrived in
     return results
 
 def print_results(results, domain):
@@ -80,6 +418,17 @@ def print_results(results, domain):
 
 
 if __name__ == '__main__':
+    import json
+
+    sample = SubdomainTable()
+    sample.add('www.example.test', '192.0.2.1', position=0)
+    sample.add('v6.example.test', '2001:db8::1', position=1)
+    sample.add('api-dev.example.test', '192.0.2.7', source='permutation')
+    sample.add('wild.example.test', '192.0.2.9', status='wildcard', position=2)
+    sample.add('slow.example.test', status='error: timeout', position=3)
+    restored = SubdomainTable.from_compact(json.loads(json.dumps(sample.compact())))
+    print(f"[*] compact() round trip of {len(sample)} results: {'ok' if restored.to_dicts() == sample.to_dicts() else 'MISMATCH'}")
+
     target_domain_example = "google.com"
 
     print(f"[*] Example Subdomain Scan for: {target_domain_example}")
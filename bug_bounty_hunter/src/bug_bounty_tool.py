@@ -15,11 +15,17 @@ sys.path.append(modules_dir)
 
 try:
     import subdomain_scanner
+    import dns_resolver
+    import dns_cache
+    import subdomain_permutations
     import port_scanner
+    import banner_grabber
     import directory_bruteforcer
     import wayback_urls
     import header_analyzer
     import robots_sitemap_analyzer
+    import scan_budget
+    import scan_profiler
 except ImportError as e:
     print(f"[!] Error importing modules: {e}")
     print(f"    Ensure modules are present in: {modules_dir}")
@@ -55,6 +61,36 @@ def ensure_url_scheme(target_input):
             return "http://" + target_input
     return target_input
 
+# Keys under which each scan stores its results in the JSON report
+SCAN_RESULT_KEYS = {
+    'subdomain': 'subdomain_scan',
+    'port': 'port_scan',
+    'dir': 'directory_bruteforce',
+    'wayback': 'wayback_urls_scan',
+    'header': 'header_analysis',
+    'robots': 'robots_sitemap_analysis',
+}
+
+def budget_allows_scan(budget, scan, host, all_scan_results, skipped_scans, single_request=False):
+    """
+    Decides whether a scan may start under the run budget.
+
+    Wordlist scans check the budget per request themselves; scans that only send one or a
+    few requests (single_request=True) reserve a request here instead.
+    Scans that cannot start are recorded in the report instead of silently missing.
+    """
+    if budget is None:
+        return True
+    if single_request:
+        allowed = budget.allow(host, scan)
+    else:
+        allowed = not budget.run_exhausted()
+    if not allowed:
+        print(f"\n[!] Budget spent, skipping {scan} scan.")
+        skipped_scans.append(scan)
+        all_scan_results[SCAN_RESULT_KEYS[scan]] = {'error': 'Skipped: scan budget spent.', 'results': []}
+    return allowed
+
 def main():
     parser = argparse.ArgumentParser(description="Bug Bounty Automation Tool")
     parser.add_argument("target", help="Target domain or IP address. For 'dir' scan, a base URL is preferred (e.g., http://example.com).")
@@ -69,6 +105,29 @@ def main():
         "--subdomain_wordlist",
         help="Path to a custom wordlist for subdomain scanning."
     )
+    parser.add_argument("--subdomain_offset", type=int, default=0,
+                        help="Wordlist line (0-based) the subdomain scan starts at, to resume a scan stopped by a budget.")
+    parser.add_argument("--permutations", action="store_true",
+                        help="After the wordlist, resolve alterations of the found subdomains (dev-api, api2, api.staging, ...) in rounds.")
+    parser.add_argument("--permutation_rounds", type=int, default=3, help="Permutation rounds at most (default 3).")
+    parser.add_argument("--permutation_words", help="Wordlist of extra words for permutations (plain or gzip).")
+    parser.add_argument("--ports", help="Ports for the port scan: '22,80,8000-8100', 'top1000' or '-' for 1-65535 (default: 16 common ports).")
+    parser.add_argument("--port_targets", nargs='+', default=[],
+                        help="More hosts for the port scan: host names, IPs, CIDR ranges (10.0.0.0/24) or files listing those.")
+    parser.add_argument("--port_subdomains", action="store_true", help="Also port scan the subdomains found by the subdomain scan.")
+    parser.add_argument("--port_concurrency", type=int, default=1000, help="TCP connects in flight at once during port scans (default 1000).")
+    parser.add_argument("--port_timeout", type=float, default=1.0, help="Seconds to wait for each TCP connect until the host's RTT is measured (default 1.0).")
+    parser.add_argument("--port_retries", type=int, default=1, help="Retries of TCP connects that timed out (default 1).")
+    parser.add_argument("--banners", action="store_true",
+                        help="Grab the banner of every open port and identify the service and version from it.")
+    parser.add_argument("--banner_timeout", type=float, default=2.0, help="Seconds to wait for a banner (default 2.0).")
+    parser.add_argument("--nameservers", nargs='+', help="Recursive nameservers for subdomain resolution, 'ip' or 'ip:port' (default: /etc/resolv.conf).")
+    parser.add_argument("--dns_concurrency", type=int, default=500, help="DNS queries in flight at once during subdomain scans (default 500).")
+    parser.add_argument("--dns_rate", type=float, help="Maximum DNS queries per second per nameserver.")
+    parser.add_argument("--dns_cache",
+                        help="SQLite file caching DNS answers across runs until their TTL expires (default: in memory for this run).")
+    parser.add_argument("--no_dns_cache", action="store_true", help="Resolve every name again instead of using the DNS cache.")
+    parser.add_argument("--no_wildcard_filter", action="store_true", help="Report subdomains that only resolve through a wildcard DNS record as found.")
     parser.add_argument(
         "--dir_wordlist",
         help="Path to a custom wordlist for directory bruteforcing."
@@ -82,19 +141,55 @@ def main():
         "--json_output",
         help="File path to save all scan results in JSON format. If a filename without path is given, it's saved in --output_dir."
     )
+    parser.add_argument("--compact_report", action="store_true",
+                        help="Write subdomain and port results in a compact columnar form, without indentation.")
+
+    parser.add_argument("--max_time", type=float, help="Wall-clock budget of the run in seconds. Remaining work is skipped and the partial report is written.")
+    parser.add_argument("--max_requests", type=int, help="Budget of requests (DNS lookups, connects, HTTP requests) for the run.")
+    parser.add_argument("--max_bytes", type=int, help="Budget of HTTP response bytes for the run.")
+    parser.add_argument("--scan_max_time", type=float, help="Wall-clock budget of each scan type in seconds.")
+    parser.add_argument("--host_max_requests", type=int, help="Request budget of each target host.")
+    parser.add_argument("--profile", action="store_true", help="Profile every scan phase and write the profiles and a summary to --output_dir.")
+    parser.add_argument("--profile_mode", choices=scan_profiler.PROFILE_MODES, default='cprofile',
+                        help="'cprofile' (deterministic, default) or 'sample' (stack sampling, lower overhead).")
+    parser.add_argument("--profile_top", type=int, default=25, help="Functions and allocation sites listed per phase in the profile summary.")
 
     args = parser.parse_args()
+    if args.ports:
+        try:
+            port_scanner.parse_ports(args.ports)
+        except ValueError as e:
+            parser.error(f"--ports: {e}")
     target = args.target.strip()
     scans_to_run = args.scans
     json_output_file = args.json_output
 
     all_scan_results = {} # Initialize for JSON output
+    skipped_scans = [] # Scans that never started because the budget was spent
+
+    budget = scan_budget.ScanBudget(
+        run={'seconds': args.max_time, 'requests': args.max_requests, 'bytes': args.max_bytes},
+        per_host={'requests': args.host_max_requests},
+        per_scan={'seconds': args.scan_max_time}
+    )
+    if not budget.enabled:
+        budget = None
+    budget_host = get_domain_from_target(target) # Host budgets are keyed by host[:port]
+    profiler = scan_profiler.ScanProfiler(args.output_dir, mode=args.profile_mode, top_n=args.profile_top) if args.profile else None
 
     if not target:
         print("[!] Target cannot be empty.")
         parser.print_help()
         sys.exit(1)
 
+    # Every module resolves through the cache: the subdomain scan directly, the others via socket.
+    resolver_cache = None
+    if not args.no_dns_cache:
+        try:
+            resolver_cache = dns_cache.DNSCache(args.dns_cache or ':memory:').install()
+        except ValueError as e: # A cache file of another schema version
+            parser.error(f"--dns_cache: {e}")
+
     # Expand 'all' scan type
     if 'all' in scans_to_run:
         scans_to_run = ['subdomain', 'port', 'dir', 'wayback', 'header', 'robots']
@@ -116,99 +211,178 @@ def main():
         print(f"[*] JSON output will be saved to: {json_output_file}")
 
 
-    if 'subdomain' in scans_to_run:
-        # Informational header still useful for console, even if JSON is primary output
-        print("\n\n" + "="*20 + " Subdomain Scan Initiated " + "="*20)
-        domain_for_subdomain = get_domain_from_target(target)
-        if not domain_for_subdomain:
-            err_msg = f"[!] Could not reliably determine domain from target '{target}' for subdomain scan."
-            print(err_msg)
-            if json_output_file: all_scan_results['subdomain_scan'] = {'error': err_msg, 'domain': target, 'results': []}
-        else:
-            sub_results = subdomain_scanner.find_subdomains(domain_for_subdomain, wordlist_path=args.subdomain_wordlist)
-            if json_output_file: all_scan_results['subdomain_scan'] = {'domain': domain_for_subdomain, 'results': sub_results}
-            else: subdomain_scanner.print_results(sub_results, domain_for_subdomain)
-        if not json_output_file: print("="*20 + " Subdomain Scan Finished " + "="*21 + "\n")
-
-
-    if 'port' in scans_to_run:
-        print("\n\n" + "="*20 + " Port Scan Initiated " + "="*20)
-        host_for_portscan = get_domain_from_target(target)
-        if not host_for_portscan:
-            err_msg = f"[!] Could not reliably determine host from target '{target}' for port scan."
-            print(err_msg)
-            if json_output_file: all_scan_results['port_scan'] = {'target': target, 'error': err_msg, 'results': []}
-        else:
-            port_results = port_scanner.scan_ports(host_for_portscan) # Using default ports list in module
-            if json_output_file: all_scan_results['port_scan'] = {'target': host_for_portscan, 'results': port_results}
-            else: port_scanner.print_results(port_results, host_for_portscan)
-        if not json_output_file: print("="*20 + " Port Scan Finished " + "="*23 + "\n")
-
-    if 'dir' in scans_to_run:
-        print("\n\n" + "="*20 + " Directory Bruteforce Initiated " + "="*20)
-        url_for_dir = ensure_url_scheme(target)
-        if not url_for_dir:
-            err_msg = f"[!] Could not reliably determine URL from target '{target}' for directory bruteforce."
-            print(err_msg)
-            if json_output_file: all_scan_results['directory_bruteforce'] = {'target_url': target, 'error': err_msg, 'results': []}
-        else:
-            dir_results = directory_bruteforcer.find_directories(url_for_dir, wordlist_path=args.dir_wordlist)
-            if json_output_file: all_scan_results['directory_bruteforce'] = {'target_url': url_for_dir, 'results': dir_results}
-            else: directory_bruteforcer.print_results(dir_results, url_for_dir)
-        if not json_output_file: print("="*20 + " Directory Bruteforce Finished " + "="*19 + "\n")
-
-    if 'wayback' in scans_to_run:
-        print("\n\n" + "="*20 + " Wayback URLs Scan Initiated " + "="*20)
-        domain_for_wayback = get_domain_from_target(target)
-        if not domain_for_wayback:
-            err_msg = f"[!] Could not reliably determine domain from target '{target}' for Wayback URLs scan."
-            print(err_msg)
-            if json_output_file: all_scan_results['wayback_urls_scan'] = {'domain': target, 'error': err_msg, 'results': {}}
-        else:
-            wayback_results_dict = wayback_urls.get_wayback_urls(domain_for_wayback)
-            if json_output_file: all_scan_results['wayback_urls_scan'] = wayback_results_dict # Already a dict
-            else: wayback_urls.print_results(wayback_results_dict, domain_for_wayback) # Second arg unused
-        if not json_output_file: print("="*20 + " Wayback URLs Scan Finished " + "="*20 + "\n")
-
-    if 'header' in scans_to_run:
-        print("\n\n" + "="*20 + " HTTP Header Analysis Initiated " + "="*20)
-        url_for_header = ensure_url_scheme(target)
-        if not url_for_header:
-            err_msg = f"[!] Could not reliably determine URL from target '{target}' for Header Analysis."
-            print(err_msg)
-            if json_output_file: all_scan_results['header_analysis'] = {'target_url': target, 'error': err_msg, 'results': {}}
-        else:
-            header_results_dict = header_analyzer.analyze_headers(url_for_header)
-            if json_output_file: all_scan_results['header_analysis'] = header_results_dict # Already a dict
-            else: header_analyzer.print_results(header_results_dict, url_for_header) # Second arg unused
-        if not json_output_file: print("="*20 + " HTTP Header Analysis Finished " + "="*19 + "\n")
-
-    if 'robots' in scans_to_run:
-        print("\n\n" + "="*20 + " Robots.txt & Sitemap Analysis Initiated " + "="*20)
-        url_for_robots_base = ensure_url_scheme(target)
-        if not url_for_robots_base:
-            err_msg = f"[!] Could not reliably determine URL from target '{target}' for Robots/Sitemap Analysis."
-            print(err_msg)
-            if json_output_file: all_scan_results['robots_sitemap_analysis'] = {'target_url': target, 'error': err_msg, 'results': {}}
-        else:
-            parsed_url_for_robots = urlparse(url_for_robots_base)
-            base_url_for_robots = f"{parsed_url_for_robots.scheme}://{parsed_url_for_robots.netloc}"
-
-            robots_results_dict = robots_sitemap_analyzer.analyze_robots_sitemap(base_url_for_robots)
-            if json_output_file: all_scan_results['robots_sitemap_analysis'] = robots_results_dict # Already a dict
-            else: robots_sitemap_analyzer.print_results(robots_results_dict, base_url_for_robots) # Second arg unused
-        if not json_output_file: print("="*20 + " Robots.txt & Sitemap Analysis Finished " + "="*13 + "\n")
+    found_subdomains = [] # Port scanned too with --port_subdomains
+    # Shared by all port scans, so an address reached through several names is grabbed once
+    grabber = banner_grabber.BannerGrabber(timeout=args.banner_timeout, read_timeout=args.banner_timeout / 2) if args.banners else None
+    if 'subdomain' in scans_to_run and budget_allows_scan(budget, 'subdomain', budget_host, all_scan_results, skipped_scans):
+        with scan_profiler.profile_phase(profiler, 'subdomain'):
+            # Informational header still useful for console, even if JSON is primary output
+            print("\n\n" + "="*20 + " Subdomain Scan Initiated " + "="*20)
+            domain_for_subdomain = get_domain_from_target(target)
+            if not domain_for_subdomain:
+                err_msg = f"[!] Could not reliably determine domain from target '{target}' for subdomain scan."
+                print(err_msg)
+                if json_output_file: all_scan_results['subdomain_scan'] = {'error': err_msg, 'domain': target, 'results': []}
+            else:
+                wildcard_detector = None if args.no_wildcard_filter else dns_resolver.WildcardDetector()
+                # Only found subdomains are kept; misses, wildcard answers and errors are counted.
+                sub_results = subdomain_scanner.SubdomainTable()
+                sub_summary = subdomain_scanner.scan_subdomains(
+                    domain_for_subdomain, wordlist_path=args.subdomain_wordlist, on_hit=sub_results.add_hit,
+                    start=args.subdomain_offset, budget=budget, nameservers=args.nameservers,
+                    concurrency=args.dns_concurrency, rate_limit=args.dns_rate,
+                    wildcards=wildcard_detector or False, cache=resolver_cache
+                )
+                sub_results.sort()
+                permutation_summary = None
+                if sub_summary is not None:
+                    print(f"[*] {sub_summary['found']} found, {sub_summary['wildcard']} wildcard, "
+                          f"{sub_summary['not_resolved']} not resolved, {sub_summary['error']} error(s).")
+                    if sub_summary['resume_from'] is not None:
+                        print(f"[*] Continue with --subdomain_offset {sub_summary['resume_from']}")
+                    elif args.permutations and sub_results:
+                        words = subdomain_permutations.DEFAULT_WORDS
+                        if args.permutation_words:
+                            words += tuple(entry for _, entry in subdomain_scanner.iter_wordlist(args.permutation_words))
+                        permutation_summary = subdomain_scanner.scan_permutations(
+                            domain_for_subdomain, list(sub_results.names),
+                            generator=subdomain_permutations.PermutationGenerator(words=words),
+                            max_rounds=args.permutation_rounds, on_hit=lambda hit: sub_results.add_hit(hit, source='permutation'), budget=budget,
+                            nameservers=args.nameservers, concurrency=args.dns_concurrency, rate_limit=args.dns_rate,
+                            wildcards=wildcard_detector or False, cache=resolver_cache
+                        )
+                        print(f"[*] Permutations: {permutation_summary['found']} new subdomain(s) from "
+                              f"{permutation_summary['candidates']} candidate(s) in {len(permutation_summary['rounds'])} round(s).")
+                found_subdomains = sub_results.names
+                if json_output_file:
+                    all_scan_results['subdomain_scan'] = {'domain': domain_for_subdomain, 'results': sub_results,
+                                                          'summary': sub_summary}
+                    if permutation_summary is not None:
+                        all_scan_results['subdomain_scan']['permutations'] = permutation_summary
+                    if wildcard_detector is not None:
+                        all_scan_results['subdomain_scan']['wildcards'] = wildcard_detector.report()
+                else: subdomain_scanner.print_results(sub_results, domain_for_subdomain)
+            if not json_output_file: print("="*20 + " Subdomain Scan Finished " + "="*21 + "\n")
+
+
+    if 'port' in scans_to_run and budget_allows_scan(budget, 'port', budget_host, all_scan_results, skipped_scans):
+        with scan_profiler.profile_phase(profiler, 'port'):
+            print("\n\n" + "="*20 + " Port Scan Initiated " + "="*20)
+            host_for_portscan = get_domain_from_target(target)
+            if not host_for_portscan:
+                err_msg = f"[!] Could not reliably determine host from target '{target}' for port scan."
+                print(err_msg)
+                if json_output_file: all_scan_results['port_scan'] = {'target': target, 'error': err_msg, 'results': []}
+            elif args.port_targets or (args.port_subdomains and found_subdomains):
+                port_targets = [host_for_portscan] + args.port_targets + (found_subdomains if args.port_subdomains else [])
+                port_hosts = {} # Only hosts with open ports (or errors) are kept
+
+                def on_host(table):
+                    if table:
+                        key = table.host if table.host not in port_hosts else f"{table.host} ({table.address})"
+                        port_hosts[key] = {'address': table.address, 'results': table}
+                        if not json_output_file: port_scanner.print_results(table, f"{table.host} ({table.address})")
+                port_summary = port_scanner.scan_hosts(port_targets, provided_ports=args.ports, on_host=on_host, budget=budget,
+                                                       concurrency=args.port_concurrency, timeout=args.port_timeout,
+                                                       retries=args.port_retries, banners=grabber)
+                if json_output_file:
+                    all_scan_results['port_scan'] = {'targets': port_targets, 'hosts': port_hosts, 'summary': port_summary}
+            else:
+                port_results = port_scanner.scan_ports(host_for_portscan, provided_ports=args.ports, budget=budget,
+                                                       concurrency=args.port_concurrency, timeout=args.port_timeout,
+                                                       retries=args.port_retries, banners=grabber)
+                if json_output_file: all_scan_results['port_scan'] = {'target': host_for_portscan, 'results': port_results}
+                else: port_scanner.print_results(port_results, host_for_portscan)
+            if not json_output_file: print("="*20 + " Port Scan Finished " + "="*23 + "\n")
+
+    if 'dir' in scans_to_run and budget_allows_scan(budget, 'dir', budget_host, all_scan_results, skipped_scans):
+        with scan_profiler.profile_phase(profiler, 'dir'):
+            print("\n\n" + "="*20 + " Directory Bruteforce Initiated " + "="*20)
+            url_for_dir = ensure_url_scheme(target)
+            if not url_for_dir:
+                err_msg = f"[!] Could not reliably determine URL from target '{target}' for directory bruteforce."
+                print(err_msg)
+                if json_output_file: all_scan_results['directory_bruteforce'] = {'target_url': target, 'error': err_msg, 'results': []}
+            else:
+                dir_results = directory_bruteforcer.find_directories(url_for_dir, wordlist_path=args.dir_wordlist, budget=budget)
+                if json_output_file: all_scan_results['directory_bruteforce'] = {'target_url': url_for_dir, 'results': dir_results}
+                else: directory_bruteforcer.print_results(dir_results, url_for_dir)
+            if not json_output_file: print("="*20 + " Directory Bruteforce Finished " + "="*19 + "\n")
+
+    if 'wayback' in scans_to_run and budget_allows_scan(budget, 'wayback', budget_host, all_scan_results, skipped_scans, single_request=True):
+        with scan_profiler.profile_phase(profiler, 'wayback'):
+            print("\n\n" + "="*20 + " Wayback URLs Scan Initiated " + "="*20)
+            domain_for_wayback = get_domain_from_target(target)
+            if not domain_for_wayback:
+                err_msg = f"[!] Could not reliably determine domain from target '{target}' for Wayback URLs scan."
+                print(err_msg)
+                if json_output_file: all_scan_results['wayback_urls_scan'] = {'domain': target, 'error': err_msg, 'results': {}}
+            else:
+                wayback_results_dict = wayback_urls.get_wayback_urls(domain_for_wayback)
+                if json_output_file: all_scan_results['wayback_urls_scan'] = wayback_results_dict # Already a dict
+                else: wayback_urls.print_results(wayback_results_dict, domain_for_wayback) # Second arg unused
+            if not json_output_file: print("="*20 + " Wayback URLs Scan Finished " + "="*20 + "\n")
+
+    if 'header' in scans_to_run and budget_allows_scan(budget, 'header', budget_host, all_scan_results, skipped_scans, single_request=True):
+        with scan_profiler.profile_phase(profiler, 'header'):
+            print("\n\n" + "="*20 + " HTTP Header Analysis Initiated " + "="*20)
+            url_for_header = ensure_url_scheme(target)
+            if not url_for_header:
+                err_msg = f"[!] Could not reliably determine URL from target '{target}' for Header Analysis."
+                print(err_msg)
+                if json_output_file: all_scan_results['header_analysis'] = {'target_url': target, 'error': err_msg, 'results': {}}
+            else:
+                header_results_dict = header_analyzer.analyze_headers(url_for_header)
+                if json_output_file: all_scan_results['header_analysis'] = header_results_dict # Already a dict
+                else: header_analyzer.print_results(header_results_dict, url_for_header) # Second arg unused
+            if not json_output_file: print("="*20 + " HTTP Header Analysis Finished " + "="*19 + "\n")
+
+    if 'robots' in scans_to_run and budget_allows_scan(budget, 'robots', budget_host, all_scan_results, skipped_scans, single_request=True):
+        with scan_profiler.profile_phase(profiler, 'robots'):
+            print("\n\n" + "="*20 + " Robots.txt & Sitemap Analysis Initiated " + "="*20)
+            url_for_robots_base = ensure_url_scheme(target)
+            if not url_for_robots_base:
+                err_msg = f"[!] Could not reliably determine URL from target '{target}' for Robots/Sitemap Analysis."
+                print(err_msg)
+                if json_output_file: all_scan_results['robots_sitemap_analysis'] = {'target_url': target, 'error': err_msg, 'results': {}}
+            else:
+                parsed_url_for_robots = urlparse(url_for_robots_base)
+                base_url_for_robots = f"{parsed_url_for_robots.scheme}://{parsed_url_for_robots.netloc}"
+
+                robots_results_dict = robots_sitemap_analyzer.analyze_robots_sitemap(base_url_for_robots)
+                if json_output_file: all_scan_results['robots_sitemap_analysis'] = robots_results_dict # Already a dict
+                else: robots_sitemap_analyzer.print_results(robots_results_dict, base_url_for_robots) # Second arg unused
+            if not json_output_file: print("="*20 + " Robots.txt & Sitemap Analysis Finished " + "="*13 + "\n")
+
+    if budget is not None:
+        budget_report = budget.report()
+        budget_report['skipped_scans'] = skipped_scans
+        budget_report['partial'] = budget_report['partial'] or bool(skipped_scans)
+        all_scan_results['budget'] = budget_report
+        scan_budget.print_report(budget_report)
 
     # Save all results to JSON if path specified
     if json_output_file:
         try:
             import json # Ensure json is imported
             with open(json_output_file, 'w') as f:
-                json.dump(all_scan_results, f, indent=4)
+                if args.compact_report: # Result tables as columns and port lists, no indentation
+                    json.dump(all_scan_results, f, separators=(',', ':'), default=lambda table: table.compact())
+                else:
+                    json.dump(all_scan_results, f, indent=4, default=lambda table: table.to_dicts())
             print(f"\n[+] All scan results saved to {json_output_file}")
         except Exception as e:
             print(f"\n[!] Error saving JSON output to {json_output_file}: {e}")
 
+    if resolver_cache is not None:
+        stats = resolver_cache.report()
+        print(f"[*] DNS cache: {stats['hits'] + stats['negative_hits']} hit(s), {stats['misses']} miss(es), "
+              f"{stats['entries']} name(s) cached {'in ' + args.dns_cache if args.dns_cache else 'for this run'}")
+        resolver_cache.close()
+
+    if profiler:
+        print(f"[+] Profile written to {profiler.close()} (see summary.txt)")
+
     print("\n[*] All selected scans completed.")
 
 if __name__ == "__main__":